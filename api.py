@@ -1,21 +1,105 @@
 """
 FastAPI web service for the brand analysis pipeline.
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import itertools
+import json
+import logging
+
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Iterator, List, Optional
 import uvicorn
 
-from src.pipeline import BrandAnalysisPipeline
-from src.graphrag.neo4j_client import get_neo4j_client
+from src.pipeline import BrandAnalysisPipeline, AsyncBrandAnalysisPipeline
+from src.graphrag.neo4j_client import get_neo4j_client, close_neo4j_client
+from src.cache import get_llm_cache, get_search_cache
+from src.graphrag.relationship_cache import get_relationship_cache
+from src.config import settings
 from src.models import AnalysisResult
+from src.utils import setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def _build_pipeline():
+    """Create the pipeline for the configured API mode."""
+    if settings.api_pipeline_mode == "async":
+        return AsyncBrandAnalysisPipeline(configure_logging=False)
+    return BrandAnalysisPipeline(configure_logging=False)
+
+
+async def _get_pipeline():
+    """
+    The shared pipeline, built on first use if startup couldn't build it.
+    
+    Raises:
+        HTTPException: 503 if the pipeline still can't be built (e.g. the graph is down)
+    """
+    if app.state.pipeline is not None:
+        return app.state.pipeline
+    async with app.state.pipeline_lock:
+        if app.state.pipeline is None:
+            try:
+                app.state.pipeline = await asyncio.to_thread(_build_pipeline)
+                logger.info("Pipeline initialized")
+            except Exception as e:
+                logger.error(f"Failed to initialize pipeline: {e}")
+                app.state.pipeline_error = str(e)
+                raise HTTPException(status_code=503, detail=f"Pipeline unavailable: {e}")
+    return app.state.pipeline
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the pipeline, its agents and clients once for the whole service."""
+    setup_logging(settings.log_level)
+    app.state.pipeline_lock = asyncio.Lock()
+    try:
+        app.state.pipeline = _build_pipeline()
+    except Exception as e:
+        # Keep serving /health and graph endpoints; /analyze retries the build
+        logger.error(f"Failed to initialize pipeline: {e}")
+        app.state.pipeline = None
+        app.state.pipeline_error = str(e)
+    
+    if settings.neo4j_schema_check:
+        try:
+            get_neo4j_client().check_schema()
+        except Exception as e:
+            logger.warning(f"Graph schema check failed: {e}")
+    
+    # The pipeline is synchronous: run it in a bounded worker pool so the
+    # event loop keeps serving other endpoints. Requests beyond the workers
+    # wait in a bounded queue; past that they are rejected with 429.
+    workers = max(1, settings.api_max_concurrent_analyses)
+    app.state.analysis_executor = ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="analysis"
+    )
+    if settings.api_pipeline_mode == "async":
+        # Analyses are coroutines on the event loop, not bounded by the pool
+        app.state.analysis_slots = asyncio.Semaphore(max(1, settings.api_max_async_analyses))
+    else:
+        app.state.analysis_slots = asyncio.Semaphore(workers + max(0, settings.api_max_queued_analyses))
+    
+    yield
+    
+    app.state.analysis_executor.shutdown(wait=True)
+    if isinstance(app.state.pipeline, AsyncBrandAnalysisPipeline):
+        await app.state.pipeline.aclose()
+    close_neo4j_client()
 
 
 app = FastAPI(
     title="Brand Analysis Pipeline API",
     description="Multi-agent system for brand and citation analysis with GraphRAG",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 
@@ -28,6 +112,12 @@ class AnalysisRequest(BaseModel):
 class VisualizationRequest(BaseModel):
     """Request model for graph visualization."""
     category: Optional[str] = None
+    view: str = "auto"  # auto, raw, top_brands, ego or categories
+    brand: Optional[str] = None  # Center of the ego view
+    hops: int = 1
+    top_k: Optional[int] = None
+    max_nodes: Optional[int] = None
+    max_edges: Optional[int] = None
 
 
 @app.get("/")
@@ -39,6 +129,8 @@ async def root():
         "endpoints": {
             "analyze": "/analyze",
             "visualize": "/visualize",
+            "export": "/export",
+            "export_stream": "/export/stream",
             "stats": "/stats",
             "health": "/health"
         }
@@ -49,8 +141,7 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     try:
-        client = get_neo4j_client()
-        stats = client.get_stats()
+        stats = await asyncio.to_thread(lambda: get_neo4j_client().get_stats())
         return {
             "status": "healthy",
             "neo4j": "connected",
@@ -77,14 +168,31 @@ async def analyze(request: AnalysisRequest):
     Returns:
         Analysis results
     """
-    try:
-        pipeline = BrandAnalysisPipeline(subject_brand=request.subject_brand)
-        result = pipeline.analyze(request.text)
-        
-        return result.model_dump()
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    pipeline = await _get_pipeline()
+    
+    slots = app.state.analysis_slots
+    if slots.locked():
+        raise HTTPException(
+            status_code=429,
+            detail="Too many analyses in progress, retry later",
+            headers={"Retry-After": "5"}
+        )
+    
+    async with slots:
+        try:
+            if isinstance(pipeline, AsyncBrandAnalysisPipeline):
+                result = await pipeline.analyze(request.text, subject_brand=request.subject_brand)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    app.state.analysis_executor,
+                    lambda: pipeline.analyze(request.text, subject_brand=request.subject_brand)
+                )
+            
+            return result.model_dump()
+            
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/visualize")
@@ -92,20 +200,36 @@ async def visualize(request: VisualizationRequest):
     """
     Get graph data for visualization.
     
+    Views are aggregated server-side from a cached snapshot of the graph and
+    trimmed to the node and edge budget; "auto" returns the raw graph when
+    it fits and the best-connected brands otherwise.
+    
     Args:
-        request: Visualization request with optional category filter
+        request: Visualization request with view, optional category filter and budget
         
     Returns:
-        Graph data with nodes and edges
+        Graph data with nodes, edges, truncated, the view used and the graph totals
     """
     try:
         from src.graphrag.graph_operations import GraphOperations
+        from src.graphrag.graph_views import build_view, get_graph_snapshot
         
-        graph_ops = GraphOperations()
-        graph_data = graph_ops.get_graph_data(category=request.category)
-        
-        return graph_data
+        snapshot = await asyncio.to_thread(get_graph_snapshot, GraphOperations())
+        return await asyncio.to_thread(
+            build_view,
+            snapshot,
+            view=request.view,
+            category=request.category,
+            brand=request.brand,
+            hops=request.hops,
+            top_k=request.top_k,
+            # Requests may shrink the budgets, never exceed them
+            max_nodes=min(request.max_nodes or settings.visualize_max_nodes, settings.visualize_max_nodes),
+            max_edges=min(request.max_edges or settings.visualize_max_edges, settings.visualize_max_edges)
+        )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -119,18 +243,36 @@ async def get_stats():
         Database statistics
     """
     try:
-        client = get_neo4j_client()
-        stats = client.get_stats()
-        
-        return {
-            "brands": stats["brands"],
-            "relationships": stats["relationships"]
-        }
+        return await asyncio.to_thread(_collect_stats)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _collect_stats() -> dict:
+    """Graph counts and cache statistics (blocking: graph query and SQLite counts)."""
+    stats = get_neo4j_client().get_stats()
+    
+    response = {
+        "brands": stats["brands"],
+        "relationships": stats["relationships"]
+    }
+    
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        response["llm_cache"] = llm_cache.stats()
+    
+    search_cache = get_search_cache()
+    if search_cache is not None:
+        response["search_cache"] = search_cache.stats()
+    
+    graph_cache = get_relationship_cache()
+    if graph_cache is not None:
+        response["graph_cache"] = graph_cache.stats()
+    
+    return response
+
+
 @app.get("/categories")
 async def get_categories():
     """
@@ -140,16 +282,7 @@ async def get_categories():
         List of categories
     """
     try:
-        client = get_neo4j_client()
-        
-        query = """
-        MATCH ()-[r:RELATES_TO]->()
-        RETURN DISTINCT r.category as category
-        ORDER BY category
-        """
-        
-        results = client.execute_query(query)
-        categories = [r["category"] for r in results if r.get("category")]
+        categories = await asyncio.to_thread(lambda: get_neo4j_client().get_categories())
         
         return {"categories": categories}
         
@@ -157,6 +290,112 @@ async def get_categories():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/export")
+async def export_relationships(
+    cursor: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    category: Optional[str] = None,
+    relationship_type: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    updated_after: Optional[str] = None,
+    updated_before: Optional[str] = None
+):
+    """
+    Get one page of graph edges.
+    
+    Pass the returned next_cursor back as cursor for the next page; it is
+    null on the last page.
+    
+    Returns:
+        Edges and next_cursor
+    """
+    from src.graphrag.graph_operations import GraphOperations
+    
+    try:
+        return await asyncio.to_thread(
+            GraphOperations().export_relationships,
+            cursor=cursor,
+            limit=limit,
+            category=category,
+            relationship_type=relationship_type,
+            min_confidence=min_confidence,
+            updated_after=updated_after,
+            updated_before=updated_before
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _ndjson_graph(first_page: List[dict], pages: Iterator[List[dict]]) -> Iterator[str]:
+    """NDJSON lines: each node once, before the first edge that uses it, then the edge."""
+    seen = set()
+    try:
+        for page in itertools.chain([first_page], pages):
+            if page:
+                yield _ndjson_page(page, seen)
+    except Exception as e:
+        # Headers are already sent: tell the client the export is incomplete
+        logger.error(f"Graph export stream failed: {e}")
+        yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        return
+    yield json.dumps({"type": "end", "nodes": len(seen)}) + "\n"
+
+
+def _ndjson_page(page: List[dict], seen: set) -> str:
+    """One page of edges as NDJSON, adding its new nodes to seen."""
+    lines = []
+    for edge in page:
+        for name in (edge["source"], edge["target"]):
+            if name not in seen:
+                seen.add(name)
+                lines.append(json.dumps({"type": "node", "id": name}))
+        lines.append(json.dumps({"type": "edge", **edge}))
+    return "\n".join(lines) + "\n"
+
+
+@app.get("/export/stream")
+async def export_stream(
+    batch_size: int = Query(1000, ge=1, le=10000),
+    category: Optional[str] = None,
+    relationship_type: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    updated_after: Optional[str] = None,
+    updated_before: Optional[str] = None
+):
+    """
+    Stream the whole (filtered) graph as NDJSON.
+    
+    Lines are {"type": "node"}, {"type": "edge"} and a final {"type": "end"}
+    (or {"type": "error"} if the export failed midway). Edges are read page by
+    page, so memory stays bounded by the page size and the set of node names.
+    
+    Returns:
+        application/x-ndjson stream
+    """
+    from src.graphrag.graph_operations import GraphOperations
+    
+    pages = GraphOperations().iter_relationship_pages(
+        batch_size=batch_size,
+        category=category,
+        relationship_type=relationship_type,
+        min_confidence=min_confidence,
+        updated_after=updated_after,
+        updated_before=updated_before
+    )
+    # Fetch the first page before responding, so bad filters get a proper status
+    try:
+        first_page = await asyncio.to_thread(next, pages, [])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    # A sync iterator: Starlette pulls it in a worker thread
+    return StreamingResponse(_ndjson_graph(first_page, pages), media_type="application/x-ndjson")
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
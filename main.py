@@ -2,10 +2,14 @@
 Command-line interface for the brand analysis pipeline.
 """
 import argparse
+import glob
 import json
 import sys
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
 
 from src.pipeline import BrandAnalysisPipeline
 from src.graphrag.neo4j_client import close_neo4j_client
@@ -66,6 +70,189 @@ def analyze_command(args):
     logger.info("")
 
 
+def _iter_jsonl_records(
+    path: Path,
+    subject_brand: Optional[str],
+    id_prefix: str = ''
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read the records of one JSONL file lazily.
+    
+    Args:
+        path: JSONL file of {text, subject_brand, id} records
+        subject_brand: Subject brand for records that don't set one
+        id_prefix: Prefix of the line-number ids of records without an id
+        
+    Yields:
+        Record dicts, or error dicts for lines that can't be read
+    """
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("record is not a JSON object")
+                if not isinstance(record.get('text'), str) or not record['text'].strip():
+                    raise ValueError("record has no text")
+            except ValueError as e:
+                yield {'id': f"{id_prefix}{line_number}", 'error': f"Invalid record on line {line_number}: {e}"}
+                continue
+            yield {
+                'id': str(record.get('id', f"{id_prefix}{line_number}")),
+                'text': record['text'],
+                'subject_brand': record.get('subject_brand') or subject_brand
+            }
+
+
+def iter_batch_records(source: str, subject_brand: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Read batch input records lazily.
+    
+    Every matched .jsonl file is read as records; other files are one
+    document each.
+    
+    Args:
+        source: Directory, glob pattern, or file (.jsonl of {text, subject_brand, id}
+            records, or a text document)
+        subject_brand: Subject brand for records that don't set one
+        
+    Yields:
+        Dicts with id, text and subject_brand, or with id and error for
+        records that can't be read (malformed JSON, missing text)
+    """
+    path = Path(source)
+    
+    if path.is_dir():
+        files = sorted(p for p in path.iterdir() if p.is_file() and p.suffix in ('.txt', '.md', '.jsonl'))
+    else:
+        files = sorted(Path(p) for p in glob.glob(source, recursive=True) if Path(p).is_file())
+    
+    for file_path in files:
+        try:
+            if file_path.suffix == '.jsonl':
+                # Line numbers repeat across files, so they're qualified by the file
+                id_prefix = '' if len(files) == 1 else f"{file_path}:"
+                yield from _iter_jsonl_records(file_path, subject_brand, id_prefix)
+                continue
+            text = file_path.read_text()
+        except (OSError, UnicodeDecodeError) as e:
+            yield {'id': str(file_path), 'error': f"Unreadable file: {e}"}
+            continue
+        yield {
+            'id': str(file_path),
+            'text': text,
+            'subject_brand': subject_brand
+        }
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def analyze_batch_command(args):
+    """Execute batch analysis command."""
+    pipeline = BrandAnalysisPipeline(log_level=args.log_level)
+    
+    def analyze_record(record):
+        started = time.perf_counter()
+        try:
+            if 'error' in record:
+                raise ValueError(record['error'])
+            if not record['subject_brand']:
+                raise ValueError("subject_brand is required (set it per record or pass --subject-brand)")
+            result = pipeline.analyze(record['text'], subject_brand=record['subject_brand'])
+            output = {'id': record['id'], 'status': 'ok', 'result': result.model_dump()}
+        except Exception as e:
+            logger.error(f"Document {record['id']} failed: {e}")
+            output = {'id': record['id'], 'status': 'error', 'error': str(e)}
+        output['latency_seconds'] = round(time.perf_counter() - started, 3)
+        return output
+    
+    records = iter_batch_records(args.input, args.subject_brand)
+    # Keep a bounded number of documents in memory; the rest stay unread
+    max_in_flight = args.workers * 2
+    latencies = []
+    failed = 0
+    started = time.perf_counter()
+    
+    with open(args.output, 'w') as out, ThreadPoolExecutor(max_workers=args.workers) as executor:
+        pending = set()
+        exhausted = False
+        
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_in_flight:
+                record = next(records, None)
+                if record is None:
+                    exhausted = True
+                else:
+                    pending.add(executor.submit(analyze_record, record))
+            
+            if not pending:
+                break
+            
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                output = future.result()
+                out.write(json.dumps(output, default=str) + "\n")
+                out.flush()
+                latencies.append(output['latency_seconds'])
+                if output['status'] != 'ok':
+                    failed += 1
+    
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    total = len(latencies)
+    
+    logger.info("\n" + "-" * 80)
+    logger.info("BATCH SUMMARY")
+    logger.info("-" * 80)
+    logger.info(f"Documents: {total} ({total - failed} succeeded, {failed} failed)")
+    logger.info(f"Workers: {args.workers}")
+    logger.info(f"Wall time: {elapsed:.1f}s")
+    if total:
+        logger.info(f"Throughput: {total / elapsed:.2f} docs/s")
+        logger.info(
+            f"Latency: mean {sum(latencies) / total:.2f}s, "
+            f"p50 {_percentile(latencies, 0.5):.2f}s, "
+            f"p95 {_percentile(latencies, 0.95):.2f}s, "
+            f"max {latencies[-1]:.2f}s"
+        )
+    logger.info(f"✓ Results saved to {args.output}")
+    logger.info("")
+
+
+def index_search_command(args):
+    """Bulk index archived documents into the local search index."""
+    from src.web_search.local_index import LocalSearchIndex
+    
+    index_path = args.index or settings.local_search_index_path
+    if not index_path:
+        raise ValueError("No index path: pass --index or set LOCAL_SEARCH_INDEX_PATH")
+    
+    index = LocalSearchIndex(index_path)
+    try:
+        added = 0
+        for input_path in args.input:
+            added += index.index_jsonl(input_path, batch_size=args.batch_size)
+        logger.info(f"\n✓ Indexed {added} new documents ({len(index)} total) in {index_path}")
+    finally:
+        index.close()
+
+
 def visualize_command(args):
     """Execute visualization command."""
     from scripts.visualize_graph import main as viz_main
@@ -77,6 +264,10 @@ def visualize_command(args):
         sys.argv.extend(['--output', args.output])
     if args.text_only:
         sys.argv.append('--text-only')
+    if args.max_edges:
+        sys.argv.extend(['--max-edges', str(args.max_edges)])
+    if args.layout:
+        sys.argv.extend(['--layout', args.layout])
     
     viz_main()
 
@@ -113,11 +304,31 @@ def main():
                                choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                                help='Logging level')
     
+    # Batch analyze command
+    batch_parser = subparsers.add_parser('analyze-batch', help='Analyze many documents with one pipeline')
+    batch_parser.add_argument('--input', '-i', required=True,
+                              help='Directory, glob pattern or file; .jsonl files hold {text, subject_brand, id} records, others one document each')
+    batch_parser.add_argument('--subject-brand', '-s', help='Subject brand for records that do not set one')
+    batch_parser.add_argument('--output', '-o', required=True, help='Output JSONL file (one result per line)')
+    batch_parser.add_argument('--workers', '-w', type=_positive_int, default=4, help='Documents analyzed in parallel')
+    batch_parser.add_argument('--log-level', default='INFO',
+                              choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                              help='Logging level')
+    
+    # Local search index command
+    index_parser = subparsers.add_parser('index-search', help='Build the offline search index from JSONL')
+    index_parser.add_argument('--input', '-i', required=True, nargs='+',
+                              help='JSONL file(s) with {url, title, text, source} per line')
+    index_parser.add_argument('--index', help='Index file (default: LOCAL_SEARCH_INDEX_PATH)')
+    index_parser.add_argument('--batch-size', type=int, default=1000, help='Documents per transaction')
+    
     # Visualize command
     viz_parser = subparsers.add_parser('visualize', help='Visualize relationship graph')
     viz_parser.add_argument('--category', '-c', help='Filter by category')
     viz_parser.add_argument('--output', '-o', default='graph.html', help='Output HTML file')
     viz_parser.add_argument('--text-only', '-t', action='store_true', help='Text-only visualization')
+    viz_parser.add_argument('--max-edges', type=int, help='Stop after this many edges (default: whole graph)')
+    viz_parser.add_argument('--layout', choices=['physics', 'force', 'spectral'], help='Precompute node positions for a static render')
     
     # Stats command
     stats_parser = subparsers.add_parser('stats', help='Show GraphRAG statistics')
@@ -131,6 +342,10 @@ def main():
     try:
         if args.command == 'analyze':
             analyze_command(args)
+        elif args.command == 'analyze-batch':
+            analyze_batch_command(args)
+        elif args.command == 'index-search':
+            index_search_command(args)
         elif args.command == 'visualize':
             visualize_command(args)
         elif args.command == 'stats':
@@ -29,6 +29,11 @@ def main():
         logger.info("\nCreating constraints and indexes...")
         client.create_constraints()
         
+        # Verify the indexes exist and the hot queries use them
+        report = client.check_schema()
+        if not report["missing_indexes"] and not report["scans"]:
+            logger.info("All indexes online; hot queries use index seeks")
+        
         # Get stats
         stats = client.get_stats()
         logger.info("\nDatabase initialized successfully!")
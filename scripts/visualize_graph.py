@@ -9,6 +9,7 @@ import logging
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.graphrag.graph_layout import LAYOUTS, get_layout
 from src.graphrag.graph_operations import GraphOperations
 from src.graphrag.neo4j_client import close_neo4j_client
 from src.utils import setup_logging
@@ -22,13 +23,15 @@ except ImportError:
     PYVIS_AVAILABLE = False
 
 
-def visualize_with_pyvis(graph_data: dict, output_file: str = "graph.html"):
+def visualize_with_pyvis(graph_data: dict, output_file: str = "graph.html", positions: dict = None):
     """
     Create interactive visualization using pyvis.
     
     Args:
         graph_data: Graph data with nodes and edges
         output_file: Output HTML file
+        positions: Precomputed node id to (x, y); nodes are pinned there and
+            physics is disabled, so the browser doesn't simulate the layout
     """
     if not PYVIS_AVAILABLE:
         logger.error("Error: pyvis not installed. Run: pip install pyvis")
@@ -51,7 +54,11 @@ def visualize_with_pyvis(graph_data: dict, output_file: str = "graph.html"):
     
     # Add nodes
     for node in graph_data["nodes"]:
-        net.add_node(node["id"], label=node["label"], title=node["label"])
+        if positions and node["id"] in positions:
+            x, y = positions[node["id"]]
+            net.add_node(node["id"], label=node["label"], title=node["label"], x=x, y=y, physics=False)
+        else:
+            net.add_node(node["id"], label=node["label"], title=node["label"])
     
     # Add edges
     for edge in graph_data["edges"]:
@@ -65,7 +72,25 @@ def visualize_with_pyvis(graph_data: dict, output_file: str = "graph.html"):
         )
     
     # Configure physics
-    net.set_options("""
+    if positions:
+        net.set_options("""
+    {
+      "physics": {
+        "enabled": false
+      },
+      "edges": {
+        "arrows": {
+          "to": {
+            "enabled": true,
+            "scaleFactor": 0.5
+          }
+        },
+        "smooth": false
+      }
+    }
+    """)
+    else:
+        net.set_options("""
     {
       "physics": {
         "enabled": true,
@@ -126,6 +151,10 @@ def main():
     parser.add_argument("--category", "-c", help="Filter by category")
     parser.add_argument("--output", "-o", default="graph.html", help="Output file for interactive visualization")
     parser.add_argument("--text-only", "-t", action="store_true", help="Text-only visualization")
+    parser.add_argument("--max-edges", type=int, help="Stop after this many edges (default: whole graph)")
+    parser.add_argument("--layout", choices=("physics",) + LAYOUTS, default="physics",
+                        help="Precompute node positions (force, spectral) for a static render, or let the browser simulate them")
+    parser.add_argument("--layout-iterations", type=int, default=50, help="Steps of the force layout")
     
     args = parser.parse_args()
     
@@ -133,7 +162,9 @@ def main():
     
     try:
         graph_ops = GraphOperations()
-        graph_data = graph_ops.get_graph_data(category=args.category)
+        graph_data = graph_ops.get_graph_data(category=args.category, max_edges=args.max_edges)
+        if graph_data["truncated"]:
+            logger.warning(f"Showing the first {args.max_edges} edges only")
         
         if not graph_data["nodes"]:
             logger.warning("No graph data found. Analyze some text first!")
@@ -144,7 +175,10 @@ def main():
         
         # Interactive visualization
         if not args.text_only:
-            visualize_with_pyvis(graph_data, args.output)
+            positions = None
+            if args.layout != "physics" and PYVIS_AVAILABLE:
+                positions = get_layout(graph_data, args.layout, args.layout_iterations)
+            visualize_with_pyvis(graph_data, args.output, positions)
         
     except Exception as e:
         logger.error(f"Error: {e}")
@@ -3,54 +3,224 @@ Base agent class for all agents in the pipeline.
 """
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 from abc import ABC, abstractmethod
 
-from openai import OpenAI
-from anthropic import Anthropic
+from openai import OpenAI, AsyncOpenAI
+from anthropic import Anthropic, AsyncAnthropic
 
 from ..config import settings
+from ..cache import ResponseCache, get_llm_cache, make_cache_key
+from ..single_flight import SingleFlight
+from ..rate_limit import acall_with_retry, call_with_retry, estimate_tokens, get_llm_rate_limiter
 from ..utils import extract_json_from_response
 
 
 logger = logging.getLogger(__name__)
 
+# Identical prompts issued concurrently (e.g. the same brand pair in several
+# documents) share one provider call
+_llm_flights = SingleFlight()
+
+# Returned by _cached_response when the cache can't answer
+_MISS = object()
+
+
+def _identity(response: str) -> str:
+    return response
+
+
+def create_llm_client(provider: str):
+    """
+    Create an LLM client for the provider.
+    
+    Args:
+        provider: "openai" or "anthropic"
+        
+    Returns:
+        OpenAI or Anthropic client
+    """
+    if provider == "openai":
+        if not settings.openai_api_key:
+            raise ValueError("OpenAI API key not configured")
+        # Support custom base URL (e.g., OpenRouter); retries are handled by call_with_retry
+        client_kwargs = {"api_key": settings.openai_api_key, "max_retries": 0}
+        if settings.openai_base_url:
+            client_kwargs["base_url"] = settings.openai_base_url
+        return OpenAI(**client_kwargs)
+    elif provider == "anthropic":
+        if not settings.anthropic_api_key:
+            raise ValueError("Anthropic API key not configured")
+        return Anthropic(api_key=settings.anthropic_api_key, max_retries=0)
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+def create_async_llm_client(provider: str):
+    """
+    Create an asyncio LLM client for the provider.
+    
+    Args:
+        provider: "openai" or "anthropic"
+        
+    Returns:
+        AsyncOpenAI or AsyncAnthropic client
+    """
+    if provider == "openai":
+        if not settings.openai_api_key:
+            raise ValueError("OpenAI API key not configured")
+        client_kwargs = {"api_key": settings.openai_api_key, "max_retries": 0}
+        if settings.openai_base_url:
+            client_kwargs["base_url"] = settings.openai_base_url
+        return AsyncOpenAI(**client_kwargs)
+    elif provider == "anthropic":
+        if not settings.anthropic_api_key:
+            raise ValueError("Anthropic API key not configured")
+        return AsyncAnthropic(api_key=settings.anthropic_api_key, max_retries=0)
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
 
 class BaseAgent(ABC):
     """Base class for all agents."""
     
-    def __init__(self, model: Optional[str] = None, temperature: float = 0.0):
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        temperature: float = 0.0,
+        cache: Optional[ResponseCache] = None,
+        use_cache: bool = True,
+        client: Optional[Any] = None,
+        async_client: Optional[Any] = None
+    ):
         """
         Initialize base agent.
         
         Args:
             model: LLM model to use
             temperature: Temperature for LLM responses
+            cache: Response cache (default: shared cache from settings, if enabled)
+            use_cache: Set False to bypass the response cache for this agent
+            client: Existing OpenAI/Anthropic client to share between agents
+            async_client: Existing AsyncOpenAI/AsyncAnthropic client (default: created on first async call)
         """
         self.model = model or settings.llm_model
         self.temperature = temperature
         self.provider = settings.llm_provider
-        
-        # Initialize LLM client
-        if self.provider == "openai":
-            if not settings.openai_api_key:
-                raise ValueError("OpenAI API key not configured")
-            # Support custom base URL (e.g., OpenRouter)
-            client_kwargs = {"api_key": settings.openai_api_key}
-            if settings.openai_base_url:
-                client_kwargs["base_url"] = settings.openai_base_url
-            self.client = OpenAI(**client_kwargs)
-        elif self.provider == "anthropic":
-            if not settings.anthropic_api_key:
-                raise ValueError("Anthropic API key not configured")
-            self.client = Anthropic(api_key=settings.anthropic_api_key)
+        if not use_cache:
+            self.cache = None
         else:
-            raise ValueError(f"Unsupported LLM provider: {self.provider}")
+            self.cache = cache if cache is not None else get_llm_cache()
+        
+        self.client = client or create_llm_client(self.provider)
+        self._async_client = async_client
+        # Shared by every agent using the same provider/model
+        self.rate_limiter = get_llm_rate_limiter(self.provider, self.model)
     
-    def _call_llm(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+    @property
+    def async_client(self):
+        """Asyncio LLM client, created lazily since sync-only callers never need it."""
+        if self._async_client is None:
+            self._async_client = create_async_llm_client(self.provider)
+        return self._async_client
+    
+    def _call_llm(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        parse: Optional[Callable[[str], Any]] = None
+    ) -> Any:
         """
         Call LLM with prompt.
         
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            parse: Parser of the response text. A response is cached only once
+                it parses, so malformed or truncated replies are retried
+            
+        Returns:
+            Parsed response, or the LLM response text without parse
+            
+        Raises:
+            Exception: Whatever parse raises on a fresh response
+        """
+        parse = parse or _identity
+        request_key = self._request_key(prompt, system_prompt)
+        cached = self._cached_response(request_key, parse)
+        if cached is not _MISS:
+            return cached
+        
+        response_text = _llm_flights.do(
+            request_key,
+            lambda: self._invoke_llm(prompt, system_prompt)
+        )
+        
+        result = parse(response_text)
+        if self.cache is not None and response_text is not None:
+            self.cache.set(request_key, response_text)
+        
+        return result
+    
+    async def _acall_llm(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        parse: Optional[Callable[[str], Any]] = None
+    ) -> Any:
+        """
+        Call LLM with prompt using the asyncio client.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            parse: Parser of the response text (see _call_llm)
+            
+        Returns:
+            Parsed response, or the LLM response text without parse
+        """
+        parse = parse or _identity
+        request_key = self._request_key(prompt, system_prompt)
+        cached = self._cached_response(request_key, parse)
+        if cached is not _MISS:
+            return cached
+        
+        response_text = await _llm_flights.ado(
+            request_key,
+            lambda: self._ainvoke_llm(prompt, system_prompt)
+        )
+        
+        result = parse(response_text)
+        if self.cache is not None and response_text is not None:
+            self.cache.set(request_key, response_text)
+        
+        return result
+    
+    def _cached_response(self, request_key: str, parse: Callable[[str], Any]) -> Any:
+        """Parsed cached response, or _MISS if absent or no longer parseable."""
+        if self.cache is None:
+            return _MISS
+        cached = self.cache.get(request_key)
+        if cached is None:
+            return _MISS
+        try:
+            result = parse(cached)
+        except Exception as e:
+            logger.warning(f"Ignoring unparseable cached LLM response ({type(self).__name__}): {e}")
+            return _MISS
+        logger.debug(f"LLM cache hit ({type(self).__name__})")
+        return result
+    
+    def _request_key(self, prompt: str, system_prompt: Optional[str]) -> str:
+        """Identity of an LLM request, for the response cache and call coalescing."""
+        return make_cache_key(
+            self.provider, self.model, self.temperature, system_prompt or "", prompt
+        )
+    
+    def _invoke_llm(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Send the prompt to the configured provider.
+        
         Args:
             prompt: User prompt
             system_prompt: Optional system prompt
@@ -58,35 +228,91 @@ class BaseAgent(ABC):
         Returns:
             LLM response text
         """
+        tokens = estimate_tokens(system_prompt, prompt)
         try:
             if self.provider == "openai":
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                messages.append({"role": "user", "content": prompt})
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=self.temperature,
-                    response_format={"type": "json_object"}
+                request = self._openai_request(prompt, system_prompt)
+                response = call_with_retry(
+                    lambda: self.client.chat.completions.create(**request),
+                    self.rate_limiter,
+                    tokens
+                )
+            else:
+                request = self._anthropic_request(prompt, system_prompt)
+                response = call_with_retry(
+                    lambda: self.client.messages.create(**request),
+                    self.rate_limiter,
+                    tokens
                 )
-                return response.choices[0].message.content
+            return self._response_text(response)
                 
-            elif self.provider == "anthropic":
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=4096,
-                    temperature=self.temperature,
-                    system=system_prompt or "",
-                    messages=[{"role": "user", "content": prompt}]
+        except Exception as e:
+            logger.error(f"LLM call failed: {e}")
+            raise
+    
+    async def _ainvoke_llm(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Send the prompt to the configured provider using the asyncio client.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            
+        Returns:
+            LLM response text
+        """
+        tokens = estimate_tokens(system_prompt, prompt)
+        try:
+            if self.provider == "openai":
+                request = self._openai_request(prompt, system_prompt)
+                response = await acall_with_retry(
+                    lambda: self.async_client.chat.completions.create(**request),
+                    self.rate_limiter,
+                    tokens
                 )
-                return response.content[0].text
+            else:
+                request = self._anthropic_request(prompt, system_prompt)
+                response = await acall_with_retry(
+                    lambda: self.async_client.messages.create(**request),
+                    self.rate_limiter,
+                    tokens
+                )
+            return self._response_text(response)
                 
         except Exception as e:
             logger.error(f"LLM call failed: {e}")
             raise
     
+    def _openai_request(self, prompt: str, system_prompt: Optional[str]) -> Dict[str, Any]:
+        """Keyword arguments for an OpenAI chat completion."""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "response_format": {"type": "json_object"}
+        }
+    
+    def _anthropic_request(self, prompt: str, system_prompt: Optional[str]) -> Dict[str, Any]:
+        """Keyword arguments for an Anthropic message."""
+        return {
+            "model": self.model,
+            "max_tokens": 4096,
+            "temperature": self.temperature,
+            "system": system_prompt or "",
+            "messages": [{"role": "user", "content": prompt}]
+        }
+    
+    def _response_text(self, response) -> str:
+        """Extract the text from a provider response."""
+        if self.provider == "openai":
+            return response.choices[0].message.content
+        return response.content[0].text
+    
     def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """Parse JSON from LLM response."""
         return extract_json_from_response(response)
@@ -32,9 +32,42 @@ Also identify common aliases or abbreviations used for brands."""
         """
         logger.info("Starting brand extraction...")
         
+        prompt = self._build_prompt(text)
+        
+        try:
+            return self._call_llm(prompt, self.SYSTEM_PROMPT, parse=self._parse_output)
+            
+        except Exception as e:
+            logger.error(f"Brand extraction failed: {e}")
+            # Return empty result on failure
+            return BrandExtractionOutput(brands=[], confidence=0.0)
+    
+    async def arun(self, text: str) -> BrandExtractionOutput:
+        """
+        Extract brands from text using the asyncio LLM client.
+        
+        Args:
+            text: Input text to analyze
+            
+        Returns:
+            BrandExtractionOutput with extracted brands
+        """
+        logger.info("Starting brand extraction...")
+        
+        prompt = self._build_prompt(text)
+        
+        try:
+            return await self._acall_llm(prompt, self.SYSTEM_PROMPT, parse=self._parse_output)
+            
+        except Exception as e:
+            logger.error(f"Brand extraction failed: {e}")
+            return BrandExtractionOutput(brands=[], confidence=0.0)
+    
+    def _build_prompt(self, text: str) -> str:
+        """Build the extraction prompt for text."""
         cleaned_text = clean_text(text)
         
-        prompt = f"""Extract all brand, company, and organization names from the following text.
+        return f"""Extract all brand, company, and organization names from the following text.
 
 For each brand found, provide:
 - name: The primary brand/company name
@@ -60,31 +93,25 @@ Return your response as JSON in this exact format:
 
 Confidence should be between 0 and 1, representing how confident you are in the extraction quality.
 """
+    
+    def _parse_output(self, response: str) -> BrandExtractionOutput:
+        """Parse the LLM response into a BrandExtractionOutput."""
+        data = self._parse_json_response(response)
         
-        try:
-            response = self._call_llm(prompt, self.SYSTEM_PROMPT)
-            data = self._parse_json_response(response)
-            
-            # Parse brands and normalize names
-            brands = [Brand(**brand_data) for brand_data in data.get("brands", [])]
-            
-            # Deduplicate and normalize (deduplication now normalizes names automatically)
-            brands = deduplicate_brands(brands)
-            
-            logger.debug(f"After normalization and deduplication: {len(brands)} unique brands")
-            
-            confidence = data.get("confidence", 0.8)
-            
-            result = BrandExtractionOutput(
-                brands=brands,
-                confidence=confidence
-            )
-            
-            logger.info(f"Extracted {len(result.brands)} brands with confidence {confidence:.2f}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Brand extraction failed: {e}")
-            # Return empty result on failure
-            return BrandExtractionOutput(brands=[], confidence=0.0)
-
+        # Parse brands and normalize names
+        brands = [Brand(**brand_data) for brand_data in data.get("brands", [])]
+        
+        # Deduplicate and normalize (deduplication now normalizes names automatically)
+        brands = deduplicate_brands(brands)
+        
+        logger.debug(f"After normalization and deduplication: {len(brands)} unique brands")
+        
+        confidence = data.get("confidence", 0.8)
+        
+        result = BrandExtractionOutput(
+            brands=brands,
+            confidence=confidence
+        )
+        
+        logger.info(f"Extracted {len(result.brands)} brands with confidence {confidence:.2f}")
+        return result
@@ -31,11 +31,44 @@ Categories should be specific and hierarchical (e.g., "technology/artificial_int
         """
         logger.info("Starting category identification...")
         
+        prompt = self._build_prompt(text, subject_brand)
+        
+        try:
+            return self._call_llm(prompt, self.SYSTEM_PROMPT, parse=self._parse_output)
+            
+        except Exception as e:
+            logger.error(f"Category identification failed: {e}")
+            return self._fallback_output()
+    
+    async def arun(self, text: str, subject_brand: str = None) -> CategoryOutput:
+        """
+        Identify categories from text using the asyncio LLM client.
+        
+        Args:
+            text: Input text to analyze
+            subject_brand: Optional subject brand for context
+            
+        Returns:
+            CategoryOutput with identified categories
+        """
+        logger.info("Starting category identification...")
+        
+        prompt = self._build_prompt(text, subject_brand)
+        
+        try:
+            return await self._acall_llm(prompt, self.SYSTEM_PROMPT, parse=self._parse_output)
+            
+        except Exception as e:
+            logger.error(f"Category identification failed: {e}")
+            return self._fallback_output()
+    
+    def _build_prompt(self, text: str, subject_brand: str = None) -> str:
+        """Build the categorization prompt for text."""
         cleaned_text = clean_text(text)
         
         subject_context = f"\nSubject Brand Context: {subject_brand}" if subject_brand else ""
         
-        prompt = f"""Analyze the following text and identify the primary business category/industry being discussed.
+        return f"""Analyze the following text and identify the primary business category/industry being discussed.
 {subject_context}
 
 Provide:
@@ -61,25 +94,24 @@ Examples of good categories:
 - healthcare/pharmaceuticals
 - retail/e_commerce
 """
+    
+    def _parse_output(self, response: str) -> CategoryOutput:
+        """Parse the LLM response into a CategoryOutput."""
+        data = self._parse_json_response(response)
         
-        try:
-            response = self._call_llm(prompt, self.SYSTEM_PROMPT)
-            data = self._parse_json_response(response)
-            
-            result = CategoryOutput(
-                primary_category=data.get("primary_category", "general/business"),
-                secondary_categories=data.get("secondary_categories", []),
-                confidence=data.get("confidence", 0.8)
-            )
-            
-            logger.info(f"Identified category: {result.primary_category} (confidence: {result.confidence:.2f})")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Category identification failed: {e}")
-            return CategoryOutput(
-                primary_category="general/business",
-                secondary_categories=[],
-                confidence=0.0
-            )
-
+        result = CategoryOutput(
+            primary_category=data.get("primary_category", "general/business"),
+            secondary_categories=data.get("secondary_categories", []),
+            confidence=data.get("confidence", 0.8)
+        )
+        
+        logger.info(f"Identified category: {result.primary_category} (confidence: {result.confidence:.2f})")
+        return result
+    
+    def _fallback_output(self) -> CategoryOutput:
+        """Output used when identification fails."""
+        return CategoryOutput(
+            primary_category="general/business",
+            secondary_categories=[],
+            confidence=0.0
+        )
@@ -2,12 +2,12 @@
 Citation Extraction Agent - Extracts citations and sources from text.
 """
 import logging
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import re
 
 from .base_agent import BaseAgent
 from ..models import Citation, CitationExtractionOutput, CitationType
-from ..utils import clean_text, extract_urls_from_text, extract_domain_from_url
+from ..utils import clean_text, extract_urls_from_text, extract_domain_from_url, match_url_to_brand
 
 
 logger = logging.getLogger(__name__)
@@ -33,8 +33,93 @@ Identify both explicit citations (e.g., "according to Reuters") and implicit ref
         """
         logger.info("Starting citation extraction...")
         
-        cleaned_text = clean_text(text)
+        urls, url_contexts = self._find_urls(text)
+        prompt = self._build_prompt(text, urls)
+        
+        try:
+            output = self._call_llm(
+                prompt, self.SYSTEM_PROMPT,
+                parse=lambda response: self._parse_output(response, urls, url_contexts)
+            )
+            
+        except Exception as e:
+            logger.error(f"Citation extraction failed: {e}")
+            output = self._fallback_output(urls, url_contexts)
+        
+        return self.enrich_with_brands(output, extracted_brands)
+    
+    async def arun(self, text: str, extracted_brands: List[str] = None) -> CitationExtractionOutput:
+        """
+        Extract citations from text using the asyncio LLM client.
+        
+        Args:
+            text: Input text to analyze
+            extracted_brands: Optional list of already extracted brand names for URL matching
+            
+        Returns:
+            CitationExtractionOutput with extracted citations
+        """
+        logger.info("Starting citation extraction...")
+        
+        urls, url_contexts = self._find_urls(text)
+        prompt = self._build_prompt(text, urls)
+        
+        try:
+            output = await self._acall_llm(
+                prompt, self.SYSTEM_PROMPT,
+                parse=lambda response: self._parse_output(response, urls, url_contexts)
+            )
+            
+        except Exception as e:
+            logger.error(f"Citation extraction failed: {e}")
+            output = self._fallback_output(urls, url_contexts)
+        
+        return self.enrich_with_brands(output, extracted_brands)
+    
+    def enrich_with_brands(
+        self,
+        output: CitationExtractionOutput,
+        brands: Optional[List[str]]
+    ) -> CitationExtractionOutput:
+        """
+        Attribute URL citations to extracted brands.
+        
+        Citations whose source was only guessed from the URL's domain (or is
+        unknown) get the canonical brand name when the domain matches one of
+        the brands. This needs no LLM call, so citation extraction can run
+        before brand extraction has finished.
+        
+        Args:
+            output: Citation extraction output
+            brands: Extracted brand names
+            
+        Returns:
+            The same output, with sources updated in place
+        """
+        if not brands:
+            return output
         
+        for citation in output.citations:
+            if not citation.url:
+                continue
+            
+            brand = match_url_to_brand(citation.url, brands)
+            if brand and citation.source in ("Unknown", self._source_from_url(citation.url)):
+                logger.debug(f"Attributed citation {citation.url} to {brand}")
+                citation.source = brand
+        
+        return output
+    
+    def _find_urls(self, text: str) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Find URLs in text and the sentence each appears in.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Tuple of (URLs, URL -> surrounding sentence)
+        """
         # Extract URLs from text
         urls = extract_urls_from_text(text)
         logger.info(f"Found {len(urls)} URLs in text")
@@ -48,10 +133,21 @@ Identify both explicit citations (e.g., "according to Reuters") and implicit ref
             if matches:
                 url_contexts[url] = matches[0].strip()
         
+        return urls, url_contexts
+    
+    def _source_from_url(self, url: str) -> str:
+        """Best-effort source name derived from a URL's domain."""
+        domain = extract_domain_from_url(url)
+        return domain.split('.')[0].title() if domain else "Unknown"
+    
+    def _build_prompt(self, text: str, urls: List[str]) -> str:
+        """Build the extraction prompt for text and its URLs."""
+        cleaned_text = clean_text(text)
+        
         # Build URL list string for the prompt
         urls_str = "\n".join([f"- {url}" for url in urls]) if urls else "No URLs found"
         
-        prompt = f"""Extract all citations, sources, and references from the following text.
+        return f"""Extract all citations, sources, and references from the following text.
 
 IMPORTANT: The text contains {len(urls)} URLs. Use these URLs to enrich the citations.
 
@@ -94,71 +190,72 @@ Guidelines:
 Valid citation_type values: report, article, statement, study, case_study, whitepaper, announcement, blog_post, social_media, other
 Confidence should be between 0 and 1.
 """
+    
+    def _parse_output(
+        self,
+        response: str,
+        urls: List[str],
+        url_contexts: Dict[str, str]
+    ) -> CitationExtractionOutput:
+        """Parse the LLM response, adding citations for URLs the model missed."""
+        data = self._parse_json_response(response)
         
-        try:
-            response = self._call_llm(prompt, self.SYSTEM_PROMPT)
-            data = self._parse_json_response(response)
-            
-            # Parse citations
-            citations = []
-            for citation_data in data.get("citations", []):
-                # Convert citation_type string to enum
-                ctype = citation_data.get("citation_type", "other")
-                try:
-                    citation_data["citation_type"] = CitationType(ctype)
-                except ValueError:
-                    logger.warning(f"Invalid citation type '{ctype}', using 'other'")
-                    citation_data["citation_type"] = CitationType.OTHER
-                
-                citations.append(Citation(**citation_data))
-            
-            # If LLM missed some URLs, try to add them as citations
-            llm_urls = {c.url for c in citations if c.url}
-            for url in urls:
-                if url not in llm_urls:
-                    # Try to create a citation for this URL
-                    domain = extract_domain_from_url(url)
-                    source = domain.split('.')[0].title() if domain else "Unknown"
-                    context = url_contexts.get(url, "URL reference")
-                    
-                    citations.append(Citation(
-                        source=source,
-                        text=context[:200],  # Limited context
-                        citation_type=CitationType.OTHER,
-                        url=url
-                    ))
-                    logger.debug(f"Added missing URL citation: {url}")
+        # Parse citations
+        citations = []
+        for citation_data in data.get("citations", []):
+            # Convert citation_type string to enum
+            ctype = citation_data.get("citation_type", "other")
+            try:
+                citation_data["citation_type"] = CitationType(ctype)
+            except ValueError:
+                logger.warning(f"Invalid citation type '{ctype}', using 'other'")
+                citation_data["citation_type"] = CitationType.OTHER
             
-            confidence = data.get("confidence", 0.8)
-            
-            # Adjust confidence if we had to supplement URLs
-            if len(citations) > len(data.get("citations", [])):
-                confidence = min(confidence, 0.85)  # Slightly lower since we supplemented
-            
-            result = CitationExtractionOutput(
-                citations=citations,
-                confidence=confidence
-            )
-            
-            logger.info(f"Extracted {len(result.citations)} citations with confidence {confidence:.2f}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Citation extraction failed: {e}")
-            # Fallback: At least extract URLs
-            citations = []
-            for url in urls:
-                domain = extract_domain_from_url(url)
-                source = domain.split('.')[0].title() if domain else "Unknown"
+            citations.append(Citation(**citation_data))
+        
+        # If LLM missed some URLs, try to add them as citations
+        llm_urls = {c.url for c in citations if c.url}
+        for url in urls:
+            if url not in llm_urls:
+                # Try to create a citation for this URL
+                source = self._source_from_url(url)
                 context = url_contexts.get(url, "URL reference")
                 
                 citations.append(Citation(
                     source=source,
-                    text=context[:200],
+                    text=context[:200],  # Limited context
                     citation_type=CitationType.OTHER,
                     url=url
                 ))
+                logger.debug(f"Added missing URL citation: {url}")
+        
+        confidence = data.get("confidence", 0.8)
+        
+        # Adjust confidence if we had to supplement URLs
+        if len(citations) > len(data.get("citations", [])):
+            confidence = min(confidence, 0.85)  # Slightly lower since we supplemented
+        
+        result = CitationExtractionOutput(
+            citations=citations,
+            confidence=confidence
+        )
+        
+        logger.info(f"Extracted {len(result.citations)} citations with confidence {confidence:.2f}")
+        return result
+    
+    def _fallback_output(self, urls: List[str], url_contexts: Dict[str, str]) -> CitationExtractionOutput:
+        """Fallback when the LLM call fails: at least extract URLs."""
+        citations = []
+        for url in urls:
+            source = self._source_from_url(url)
+            context = url_contexts.get(url, "URL reference")
             
-            confidence = 0.5 if citations else 0.0
-            return CitationExtractionOutput(citations=citations, confidence=confidence)
-
+            citations.append(Citation(
+                source=source,
+                text=context[:200],
+                citation_type=CitationType.OTHER,
+                url=url
+            ))
+        
+        confidence = 0.5 if citations else 0.0
+        return CitationExtractionOutput(citations=citations, confidence=confidence)
@@ -1,21 +1,32 @@
 """
 Relationship Classification Agent - Classifies brand relationships with confidence scoring.
 """
+import asyncio
+import itertools
 import logging
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from concurrent.futures import ThreadPoolExecutor
 
 from .base_agent import BaseAgent
+from .relationship_memo import RelationshipMemo
 from ..models import (
     Brand, Relationship, RelationshipType, RelationshipOutput,
     SourceType, WebSearchResult
 )
-from ..graphrag.graph_operations import GraphOperations
+from ..graphrag.graph_operations import GraphOperations, AsyncGraphOperations
 from ..web_search.search_agent import WebSearchAgent
 from ..config import settings
 
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Evidence marker for relationships whose classification errored; these are
+# returned to the caller but never stored in the graph.
+CLASSIFICATION_FAILED_EVIDENCE = "Classification failed"
+
 
 class RelationshipAgent(BaseAgent):
     """Agent for classifying brand relationships."""
@@ -50,23 +61,52 @@ Consider:
 - Temporal aspects (relationships change over time)
 - Domain-specific nuances (technical vs business relationship)"""
     
-    def __init__(self, subject_brand: str, *args, **kwargs):
+    def __init__(
+        self,
+        subject_brand: Optional[str] = None,
+        *args,
+        web_search: Optional[WebSearchAgent] = None,
+        graph_ops: Optional[GraphOperations] = None,
+        async_graph_ops: Optional[AsyncGraphOperations] = None,
+        max_workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        memo: Optional[RelationshipMemo] = None,
+        **kwargs
+    ):
         """
         Initialize relationship agent.
         
         Args:
-            subject_brand: The main brand being analyzed
+            subject_brand: Default subject brand (can be overridden per run)
+            web_search: Shared web search agent (default: a new one)
+            graph_ops: Shared graph operations (default: a new one, unless async_graph_ops is given)
+            async_graph_ops: Graph operations used by arun() (default: graph_ops in a worker thread)
+            max_workers: Max brand pairs classified concurrently (default from settings, 1 = sequential)
+            batch_size: Brand pairs classified per LLM call (default from settings, 1 = one call per pair)
+            memo: Pair memo shared across runs (default: a new one, if enabled in settings)
         """
         super().__init__(*args, **kwargs)
         self.subject_brand = subject_brand
-        self.graph_ops = GraphOperations()
-        self.web_search = WebSearchAgent()
+        self.max_workers = max(1, max_workers or settings.relationship_max_workers)
+        self.batch_size = max(1, batch_size or settings.relationship_batch_size)
+        if graph_ops is None and async_graph_ops is None:
+            graph_ops = GraphOperations()
+        self.graph_ops = graph_ops
+        self.async_graph_ops = async_graph_ops
+        self.web_search = web_search or WebSearchAgent()
+        if memo is None and settings.relationship_memo_enabled:
+            memo = RelationshipMemo(
+                max_entries=settings.relationship_memo_max_entries,
+                ttl_seconds=settings.relationship_memo_ttl_seconds
+            )
+        self.memo = memo
     
     def run(
         self,
         brands: List[Brand],
         category: str,
-        text_context: str
+        text_context: str,
+        subject_brand: Optional[str] = None
     ) -> RelationshipOutput:
         """
         Classify relationships between subject brand and other brands.
@@ -75,83 +115,577 @@ Consider:
             brands: List of extracted brands
             category: Primary category
             text_context: Original text for context
+            subject_brand: Subject brand for this run (default: the agent's)
             
         Returns:
-            RelationshipOutput with classified relationships
+            RelationshipOutput with classified relationships; newly classified
+            ones are listed in new_relationships for the caller to store
         """
+        subject_brand = subject_brand or self.subject_brand
+        if not subject_brand:
+            raise ValueError("subject_brand is required")
+        
         logger.info(f"Starting relationship classification for {len(brands)} brands...")
         
-        relationships = []
+        # Skip self-relationship
+        targets = [b for b in brands if b.name.lower() != subject_brand.lower()]
+        
+        # Partition upfront: one graph query finds the pairs already known
+        results = self._lookup_graph_many(subject_brand, targets, category, text_context)
+        self._remember(results)
+        
+        # Pairs classified earlier (in either direction) come from the memo
+        pending = [brand for brand, rel in zip(targets, results) if rel is None]
+        memoized = self._recall(subject_brand, pending, category)
+        unresolved = [brand for brand, rel in zip(pending, memoized) if rel is None]
+        logger.info(f"{len(targets) - len(pending)} relationships found in graph, "
+                    f"{len(pending) - len(unresolved)} classified earlier, "
+                    f"{len(unresolved)} need web search and LLM classification")
+        
+        if self.batch_size > 1:
+            classified, fresh = self._classify_reserved(subject_brand, unresolved, category, text_context)
+        else:
+            outcomes = self._map(
+                lambda brand: self._memoized(
+                    subject_brand,
+                    brand,
+                    category,
+                    lambda: self._search_and_classify(
+                        subject_brand=subject_brand,
+                        brand=brand,
+                        category=category,
+                        text_context=text_context
+                    )
+                ),
+                unresolved
+            )
+            classified = [relationship for relationship, _ in outcomes]
+            fresh = [relationship for relationship, is_fresh in outcomes if is_fresh]
+        
+        return self._build_output(results, self._fill(memoized, classified), fresh)
+    
+    async def arun(
+        self,
+        brands: List[Brand],
+        category: str,
+        text_context: str,
+        subject_brand: Optional[str] = None
+    ) -> RelationshipOutput:
+        """
+        Async variant of run().
         
-        for brand in brands:
-            if brand.name.lower() == self.subject_brand.lower():
-                continue  # Skip self-relationship
+        Pairs are classified concurrently on the event loop, at most
+        max_workers at a time.
+        
+        Args:
+            brands: List of extracted brands
+            category: Primary category
+            text_context: Original text for context
+            subject_brand: Subject brand for this run (default: the agent's)
             
-            relationship = self._classify_relationship(
-                brand=brand,
-                category=category,
-                text_context=text_context
+        Returns:
+            RelationshipOutput with classified relationships
+        """
+        subject_brand = subject_brand or self.subject_brand
+        if not subject_brand:
+            raise ValueError("subject_brand is required")
+        
+        logger.info(f"Starting relationship classification for {len(brands)} brands...")
+        
+        targets = [b for b in brands if b.name.lower() != subject_brand.lower()]
+        
+        results = await self._alookup_graph_many(subject_brand, targets, category, text_context)
+        self._remember(results)
+        
+        pending = [brand for brand, rel in zip(targets, results) if rel is None]
+        memoized = self._recall(subject_brand, pending, category)
+        unresolved = [brand for brand, rel in zip(pending, memoized) if rel is None]
+        logger.info(f"{len(targets) - len(pending)} relationships found in graph, "
+                    f"{len(pending) - len(unresolved)} classified earlier, "
+                    f"{len(unresolved)} need web search and LLM classification")
+        
+        if self.batch_size > 1:
+            classified, fresh = await self._aclassify_reserved(subject_brand, unresolved, category, text_context)
+        else:
+            outcomes = await self._amap(
+                lambda brand: self._amemoized(
+                    subject_brand,
+                    brand,
+                    category,
+                    lambda: self._asearch_and_classify(
+                        subject_brand=subject_brand,
+                        brand=brand,
+                        category=category,
+                        text_context=text_context
+                    )
+                ),
+                unresolved
             )
+            classified = [relationship for relationship, _ in outcomes]
+            fresh = [relationship for relationship, is_fresh in outcomes if is_fresh]
+        
+        return self._build_output(results, self._fill(memoized, classified), fresh)
+    
+    def _build_output(
+        self,
+        results: List[Optional[Relationship]],
+        classified: List[Optional[Relationship]],
+        fresh: List[Relationship]
+    ) -> RelationshipOutput:
+        """
+        Merge graph hits with newly classified pairs into the run output.
+        
+        Args:
+            results: Graph lookup results per target, None where not stored
+            classified: Classifications for the None entries, in order
+            fresh: The classifications this run made itself; memo hits (including
+                inverted reverse pairs) were stored by the run that classified them
             
-            if relationship:
-                relationships.append(relationship)
+        Returns:
+            RelationshipOutput
+        """
+        results = self._fill(results, classified)
+        fresh_ids = {id(r) for r in fresh}
+        
+        relationships = [r for r in results if r]
+        new_relationships = [
+            r for r in relationships
+            if id(r) in fresh_ids
+            and r.source_type != SourceType.GRAPH_DB
+            and r.evidence != CLASSIFICATION_FAILED_EVIDENCE
+        ]
+        
+        logger.info(f"Classified {len(relationships)} relationships ({len(new_relationships)} new)")
+        return RelationshipOutput(relationships=relationships, new_relationships=new_relationships)
+    
+    def _recall(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str
+    ) -> List[Optional[Relationship]]:
+        """Memoized relationships aligned with brands, None where the pair is new."""
+        if self.memo is None:
+            return [None] * len(brands)
+        return [self.memo.get(subject_brand, brand.name, category) for brand in brands]
+    
+    def _remember(self, relationships: List[Optional[Relationship]]):
+        """Add classified relationships to the memo."""
+        if self.memo is None:
+            return
+        for relationship in relationships:
+            if relationship is not None:
+                self.memo.put(relationship)
+    
+    @staticmethod
+    def _fill(
+        results: List[Optional[Relationship]],
+        classified: List[Optional[Relationship]]
+    ) -> List[Optional[Relationship]]:
+        """Replace the None entries of results with classified, in order."""
+        classified_iter = iter(classified)
+        return [rel if rel is not None else next(classified_iter) for rel in results]
+    
+    def _memoized(
+        self,
+        subject_brand: str,
+        brand: Brand,
+        category: str,
+        classify: Callable[[], Relationship]
+    ) -> Tuple[Relationship, bool]:
+        """
+        Classify a pair through the memo, so concurrent runs share one classification.
+        
+        Returns:
+            The relationship, and whether this run should store it (False when
+            it came from the memo or another run claimed the classification)
+        """
+        if self.memo is None:
+            return classify(), True
+        return self.memo.resolve(subject_brand, brand.name, category, classify)
+    
+    async def _amemoized(
+        self,
+        subject_brand: str,
+        brand: Brand,
+        category: str,
+        classify: Callable[[], Awaitable[Relationship]]
+    ) -> Tuple[Relationship, bool]:
+        """Async variant of _memoized."""
+        if self.memo is None:
+            return await classify(), True
+        return await self.memo.aresolve(subject_brand, brand.name, category, classify)
+    
+    def _map(self, func: Callable[[T], R], items: List[T]) -> List[R]:
+        """
+        Apply func to every item, concurrently up to max_workers.
+        
+        Graph lookups, web searches and LLM calls are I/O bound, so a thread
+        pool overlaps them. Results keep the order of items.
+        """
+        workers = min(self.max_workers, len(items))
+        if workers <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items))
+    
+    async def _amap(self, func: Callable[[T], Awaitable[R]], items: List[T]) -> List[R]:
+        """Await func for every item, at most max_workers at a time. Results keep the order of items."""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        
+        async def bounded(item: T) -> R:
+            async with semaphore:
+                return await func(item)
         
-        logger.info(f"Classified {len(relationships)} relationships")
-        return RelationshipOutput(relationships=relationships)
+        return list(await asyncio.gather(*(bounded(item) for item in items)))
     
-    def _classify_relationship(
+    def _search_and_classify(
         self,
+        subject_brand: str,
         brand: Brand,
         category: str,
         text_context: str
-    ) -> Optional[Relationship]:
+    ) -> Relationship:
         """
-        Classify relationship for a single brand.
+        Classify a relationship that is not in the graph.
         
         Args:
+            subject_brand: The main brand being analyzed
             brand: Brand to classify relationship with
             category: Category context
             text_context: Text context
             
         Returns:
-            Relationship or None
+            Relationship
         """
-        logger.info(f"Classifying relationship: {self.subject_brand} <-> {brand.name}")
+        # Step 2: No existing relationship - perform web search
+        search_results = self._search(subject_brand, brand, category)
         
-        # Step 1: Check GraphRAG for existing relationship
-        existing_rel = self.graph_ops.get_relationship(
-            source_brand=self.subject_brand,
-            target_brand=brand.name,
+        # Step 3: Classify using LLM with all available context
+        return self._classify_with_llm(
+            subject_brand=subject_brand,
+            brand=brand,
+            category=category,
+            text_context=text_context,
+            search_results=search_results
+        )
+    
+    def _lookup_graph_many(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        text_context: str
+    ) -> List[Optional[Relationship]]:
+        """
+        Look up existing relationships for many brands with one graph query.
+        
+        Args:
+            subject_brand: The main brand being analyzed
+            brands: Brands to look up
+            category: Category context
+            text_context: Text context
+            
+        Returns:
+            Relationships aligned with brands, None where not stored
+        """
+        if not brands:
+            return []
+        
+        existing = self.graph_ops.get_relationships_for_targets(
+            source_brand=subject_brand,
+            target_brands=[brand.name for brand in brands],
             category=category
         )
         
-        if existing_rel:
-            logger.info(f"Found existing relationship in graph: {existing_rel.get('relationship_type')}")
-            return self._relationship_from_graph(
+        return self._relationships_from_lookup(subject_brand, brands, category, text_context, existing)
+    
+    async def _alookup_graph_many(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        text_context: str
+    ) -> List[Optional[Relationship]]:
+        """Async variant of _lookup_graph_many."""
+        if not brands:
+            return []
+        
+        target_names = [brand.name for brand in brands]
+        if self.async_graph_ops is not None:
+            existing = await self.async_graph_ops.get_relationships_for_targets(
+                source_brand=subject_brand,
+                target_brands=target_names,
+                category=category
+            )
+        else:
+            existing = await asyncio.to_thread(
+                self.graph_ops.get_relationships_for_targets,
+                subject_brand,
+                target_names,
+                category
+            )
+        
+        return self._relationships_from_lookup(subject_brand, brands, category, text_context, existing)
+    
+    def _relationships_from_lookup(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        text_context: str,
+        existing: Dict[str, dict]
+    ) -> List[Optional[Relationship]]:
+        """Build graph relationships for the brands found by a bulk lookup."""
+        return [
+            self._relationship_from_graph(
+                subject_brand=subject_brand,
                 brand=brand,
                 category=category,
-                graph_data=existing_rel,
+                graph_data=existing[brand.name],
                 text_context=text_context
-            )
-        
-        # Step 2: No existing relationship - perform web search
-        logger.info(f"No relationship in graph, performing web search...")
-        search_results = self.web_search.search_brand_relationship(
-            brand1=self.subject_brand,
+            ) if brand.name in existing else None
+            for brand in brands
+        ]
+    
+    def _search(self, subject_brand: str, brand: Brand, category: str) -> List[WebSearchResult]:
+        """Search the web for the subject brand <-> brand relationship."""
+        logger.info(f"No relationship in graph for {brand.name}, performing web search...")
+        return self.web_search.search_brand_relationship(
+            brand1=subject_brand,
             brand2=brand.name,
             category=category
         )
-        
-        # Step 3: Classify using LLM with all available context
-        return self._classify_with_llm(
+    
+    async def _asearch(self, subject_brand: str, brand: Brand, category: str) -> List[WebSearchResult]:
+        """Async variant of _search."""
+        logger.info(f"No relationship in graph for {brand.name}, performing web search...")
+        return await self.web_search.asearch_brand_relationship(
+            brand1=subject_brand,
+            brand2=brand.name,
+            category=category
+        )
+    
+    async def _asearch_and_classify(
+        self,
+        subject_brand: str,
+        brand: Brand,
+        category: str,
+        text_context: str
+    ) -> Relationship:
+        """Async variant of _search_and_classify."""
+        search_results = await self._asearch(subject_brand, brand, category)
+        return await self._aclassify_with_llm(
+            subject_brand=subject_brand,
             brand=brand,
             category=category,
             text_context=text_context,
             search_results=search_results
         )
     
+    def _classify_reserved(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        text_context: str
+    ) -> Tuple[List[Optional[Relationship]], List[Relationship]]:
+        """
+        Classify pairs in batches, reserving them in the memo first.
+        
+        Pairs another run has reserved are waited for instead of being sent
+        to the LLM again; if that run fails, they are classified here.
+        
+        Args:
+            subject_brand: The main brand being analyzed
+            brands: Brands to classify (not found in the graph or the memo)
+            category: Category context
+            text_context: Text context
+            
+        Returns:
+            Relationships in the same order as brands, and the ones this run
+            classified itself (see _memoized)
+        """
+        if self.memo is None:
+            classified = self._classify_batched(subject_brand, brands, category, text_context)
+            return classified, [r for r in classified if r is not None]
+        
+        reservations = [self.memo.reserve(subject_brand, brand.name, category) for brand in brands]
+        owned = [brand for brand, (_, owns) in zip(brands, reservations) if owns]
+        owned_classified = []
+        try:
+            owned_classified = self._classify_batched(subject_brand, owned, category, text_context)
+        finally:
+            # Always end the reservations, so waiters don't block on a failed run
+            for brand, relationship in itertools.zip_longest(owned, owned_classified):
+                self.memo.fulfill(subject_brand, brand.name, category, relationship)
+        
+        owned_iter = iter(owned_classified)
+        classified, fresh = [], []
+        for brand, (future, owns) in zip(brands, reservations):
+            if owns:
+                relationship = next(owned_iter)
+            else:
+                relationship = self.memo.wait(future, subject_brand, brand.name)
+                if relationship is not None:
+                    classified.append(relationship)
+                    continue
+                relationship = self._search_and_classify(subject_brand, brand, category, text_context)
+                self.memo.put(relationship)
+            classified.append(relationship)
+            if relationship is not None:
+                fresh.append(relationship)
+        return classified, fresh
+    
+    async def _aclassify_reserved(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        text_context: str
+    ) -> Tuple[List[Optional[Relationship]], List[Relationship]]:
+        """Async variant of _classify_reserved."""
+        if self.memo is None:
+            classified = await self._aclassify_batched(subject_brand, brands, category, text_context)
+            return classified, [r for r in classified if r is not None]
+        
+        reservations = [self.memo.reserve(subject_brand, brand.name, category) for brand in brands]
+        owned = [brand for brand, (_, owns) in zip(brands, reservations) if owns]
+        owned_classified = []
+        try:
+            owned_classified = await self._aclassify_batched(subject_brand, owned, category, text_context)
+        finally:
+            for brand, relationship in itertools.zip_longest(owned, owned_classified):
+                self.memo.fulfill(subject_brand, brand.name, category, relationship)
+        
+        owned_iter = iter(owned_classified)
+        classified, fresh = [], []
+        for brand, (future, owns) in zip(brands, reservations):
+            if owns:
+                relationship = next(owned_iter)
+            else:
+                relationship = await self.memo.await_reserved(future, subject_brand, brand.name)
+                if relationship is not None:
+                    classified.append(relationship)
+                    continue
+                relationship = await self._asearch_and_classify(subject_brand, brand, category, text_context)
+                self.memo.put(relationship)
+            classified.append(relationship)
+            if relationship is not None:
+                fresh.append(relationship)
+        return classified, fresh
+    
+    def _classify_batched(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        text_context: str
+    ) -> List[Optional[Relationship]]:
+        """
+        Classify relationships sending several brand pairs per LLM call.
+        
+        Web searches still run per pair; the pairs are then grouped into
+        batches of batch_size, so the text context is sent once per batch
+        instead of once per pair.
+        
+        Args:
+            subject_brand: The main brand being analyzed
+            brands: Brands to classify (not found in the graph)
+            category: Category context
+            text_context: Text context
+            
+        Returns:
+            Relationships in the same order as brands
+        """
+        searches = self._map(lambda brand: self._search(subject_brand, brand, category), brands)
+        pairs = list(zip(brands, searches))
+        
+        batches = [
+            pairs[start:start + self.batch_size]
+            for start in range(0, len(pairs), self.batch_size)
+        ]
+        
+        def classify_batch(batch) -> List[Relationship]:
+            batch_brands = [brand for brand, _ in batch]
+            batch_searches = [search for _, search in batch]
+            if len(batch) > 1:
+                try:
+                    return self._classify_batch_with_llm(
+                        subject_brand=subject_brand,
+                        brands=batch_brands,
+                        category=category,
+                        text_context=text_context,
+                        search_results=batch_searches
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Batched classification of {len(batch)} pairs failed ({e}); "
+                        f"falling back to per-pair calls"
+                    )
+            return [
+                self._classify_with_llm(
+                    subject_brand=subject_brand,
+                    brand=brand,
+                    category=category,
+                    text_context=text_context,
+                    search_results=search
+                )
+                for brand, search in batch
+            ]
+        
+        return [rel for batch_result in self._map(classify_batch, batches) for rel in batch_result]
+    
+    async def _aclassify_batched(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        text_context: str
+    ) -> List[Optional[Relationship]]:
+        """Async variant of _classify_batched."""
+        searches = await self._amap(lambda brand: self._asearch(subject_brand, brand, category), brands)
+        pairs = list(zip(brands, searches))
+        
+        batches = [
+            pairs[start:start + self.batch_size]
+            for start in range(0, len(pairs), self.batch_size)
+        ]
+        
+        async def classify_batch(batch) -> List[Relationship]:
+            batch_brands = [brand for brand, _ in batch]
+            batch_searches = [search for _, search in batch]
+            if len(batch) > 1:
+                try:
+                    return await self._aclassify_batch_with_llm(
+                        subject_brand=subject_brand,
+                        brands=batch_brands,
+                        category=category,
+                        text_context=text_context,
+                        search_results=batch_searches
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Batched classification of {len(batch)} pairs failed ({e}); "
+                        f"falling back to per-pair calls"
+                    )
+            return list(await asyncio.gather(*(
+                self._aclassify_with_llm(
+                    subject_brand=subject_brand,
+                    brand=brand,
+                    category=category,
+                    text_context=text_context,
+                    search_results=search
+                )
+                for brand, search in batch
+            )))
+        
+        batch_results = await self._amap(classify_batch, batches)
+        return [rel for batch_result in batch_results for rel in batch_result]
+    
     def _relationship_from_graph(
         self,
+        subject_brand: str,
         brand: Brand,
         category: str,
         graph_data: dict,
@@ -161,6 +695,7 @@ Consider:
         Create relationship from graph data with text verification.
         
         Args:
+            subject_brand: The main brand being analyzed
             brand: Brand
             category: Category
             graph_data: Data from graph
@@ -179,7 +714,7 @@ Consider:
         evidence = " | ".join(brand.context) if brand.context else "From knowledge graph"
         
         return Relationship(
-            source=self.subject_brand,
+            source=subject_brand,
             target=brand.name,
             relationship_type=RelationshipType(rel_type),
             category=category,
@@ -194,6 +729,7 @@ Consider:
     
     def _classify_with_llm(
         self,
+        subject_brand: str,
         brand: Brand,
         category: str,
         text_context: str,
@@ -203,6 +739,7 @@ Consider:
         Classify relationship using LLM.
         
         Args:
+            subject_brand: The main brand being analyzed
             brand: Brand to classify
             category: Category
             text_context: Original text
@@ -211,17 +748,64 @@ Consider:
         Returns:
             Relationship
         """
+        prompt = self._pair_prompt(subject_brand, brand, category, text_context, search_results)
+        
+        try:
+            return self._call_llm(prompt, self.SYSTEM_PROMPT, parse=lambda response: self._relationship_from_llm_data(
+                subject_brand=subject_brand,
+                brand=brand,
+                category=category,
+                data=self._parse_json_response(response),
+                search_results=search_results
+            ))
+            
+        except Exception as e:
+            logger.error(f"LLM classification failed: {e}")
+            return self._failed_relationship(subject_brand, brand, category, e)
+    
+    async def _aclassify_with_llm(
+        self,
+        subject_brand: str,
+        brand: Brand,
+        category: str,
+        text_context: str,
+        search_results: List[WebSearchResult]
+    ) -> Relationship:
+        """Async variant of _classify_with_llm."""
+        prompt = self._pair_prompt(subject_brand, brand, category, text_context, search_results)
+        
+        try:
+            return await self._acall_llm(prompt, self.SYSTEM_PROMPT, parse=lambda response: self._relationship_from_llm_data(
+                subject_brand=subject_brand,
+                brand=brand,
+                category=category,
+                data=self._parse_json_response(response),
+                search_results=search_results
+            ))
+            
+        except Exception as e:
+            logger.error(f"LLM classification failed: {e}")
+            return self._failed_relationship(subject_brand, brand, category, e)
+    
+    def _pair_prompt(
+        self,
+        subject_brand: str,
+        brand: Brand,
+        category: str,
+        text_context: str,
+        search_results: List[WebSearchResult]
+    ) -> str:
+        """Build the classification prompt for a single brand pair."""
         # Prepare context
         brand_context = "\n".join(brand.context) if brand.context else "No specific context"
         
         search_context = ""
         if search_results:
-            search_agent = WebSearchAgent()
-            search_context = search_agent.synthesize_results(search_results)
+            search_context = self.web_search.synthesize_results(search_results)
         else:
             search_context = "No web search results found"
         
-        prompt = f"""Analyze the relationship between "{self.subject_brand}" and "{brand.name}" in the context of {category}.
+        return f"""Analyze the relationship between "{subject_brand}" and "{brand.name}" in the context of {category}.
 
 Original Text Context:
 {text_context}
@@ -266,55 +850,225 @@ Examples of context-specific relationships:
 - Financial Report → relationship_context: "market_competition" or "revenue_analysis"
 - Patent Filing → relationship_context: "intellectual_property" or "technology_licensing"
 """
+    
+    def _failed_relationship(
+        self,
+        subject_brand: str,
+        brand: Brand,
+        category: str,
+        error: Exception
+    ) -> Relationship:
+        """Unknown relationship with low confidence, returned when classification errors."""
+        return Relationship(
+            source=subject_brand,
+            target=brand.name,
+            relationship_type=RelationshipType.UNKNOWN,
+            category=category,
+            relationship_context="unknown",
+            confidence=0.0,
+            evidence=CLASSIFICATION_FAILED_EVIDENCE,
+            source_type=SourceType.LLM_INFERENCE,
+            flagged=True,
+            reasoning=f"Error during classification: {str(error)}"
+        )
+    
+    def _classify_batch_with_llm(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        text_context: str,
+        search_results: List[List[WebSearchResult]]
+    ) -> List[Relationship]:
+        """
+        Classify several relationships with one LLM call.
         
-        try:
-            response = self._call_llm(prompt, self.SYSTEM_PROMPT)
-            data = self._parse_json_response(response)
-            
-            rel_type = RelationshipType(data.get("relationship_type", "unknown"))
-            relationship_context = data.get("relationship_context", "general")
-            confidence = float(data.get("confidence", 0.5))
-            evidence = data.get("evidence", "No evidence provided")
-            reasoning = data.get("reasoning", "")
-            sentiment = data.get("sentiment", "neutral")
+        Args:
+            subject_brand: The main brand being analyzed
+            brands: Brands to classify
+            category: Category
+            text_context: Original text (sent once for the whole batch)
+            search_results: Web search results per brand, aligned with brands
             
-            # Determine source type
-            source_type = SourceType.WEB_SEARCH if search_results else SourceType.LLM_INFERENCE
+        Returns:
+            Relationships aligned with brands
             
-            relationship = Relationship(
-                source=self.subject_brand,
-                target=brand.name,
-                relationship_type=rel_type,
-                category=category,
-                relationship_context=relationship_context,
-                confidence=confidence,
-                evidence=evidence,
-                source_type=source_type,
-                flagged=should_flag_relationship(confidence),
-                reasoning=reasoning,
-                sentiment=sentiment
+        Raises:
+            ValueError: If the response is malformed or misses a brand
+        """
+        prompt = self._batch_prompt(subject_brand, brands, category, text_context, search_results)
+        return self._call_llm(prompt, self.SYSTEM_PROMPT, parse=lambda response: self._relationships_from_batch_response(
+            subject_brand, brands, category, search_results, response
+        ))
+    
+    async def _aclassify_batch_with_llm(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        text_context: str,
+        search_results: List[List[WebSearchResult]]
+    ) -> List[Relationship]:
+        """Async variant of _classify_batch_with_llm."""
+        prompt = self._batch_prompt(subject_brand, brands, category, text_context, search_results)
+        return await self._acall_llm(prompt, self.SYSTEM_PROMPT, parse=lambda response: self._relationships_from_batch_response(
+            subject_brand, brands, category, search_results, response
+        ))
+    
+    def _batch_prompt(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        text_context: str,
+        search_results: List[List[WebSearchResult]]
+    ) -> str:
+        """Build the classification prompt for a batch of brand pairs."""
+        pair_sections = []
+        for i, (brand, results) in enumerate(zip(brands, search_results), 1):
+            brand_context = "\n".join(brand.context) if brand.context else "No specific context"
+            search_context = (
+                self.web_search.synthesize_results(results) if results
+                else "No web search results found"
             )
-            
-            # Store in graph for future use
-            self.graph_ops.store_relationship_from_model(relationship)
-            
-            return relationship
-            
-        except Exception as e:
-            logger.error(f"LLM classification failed: {e}")
-            # Return unknown relationship with low confidence
-            return Relationship(
-                source=self.subject_brand,
-                target=brand.name,
-                relationship_type=RelationshipType.UNKNOWN,
-                category=category,
-                relationship_context="unknown",
-                confidence=0.0,
-                evidence="Classification failed",
-                source_type=SourceType.LLM_INFERENCE,
-                flagged=True,
-                reasoning=f"Error during classification: {str(e)}"
+            pair_sections.append(
+                f"""### Pair {i}: "{subject_brand}" -> "{brand.name}"
+
+Specific Brand Context:
+{brand_context}
+
+Web Search Results:
+{search_context}
+"""
             )
+        pairs_text = "\n".join(pair_sections)
+        
+        return f"""Analyze the relationship between "{subject_brand}" and each of the {len(brands)} brands below in the context of {category}.
+Classify every pair independently.
+
+Original Text Context:
+{text_context}
+
+{pairs_text}
+CRITICAL: Identify the SPECIFIC CONTEXT/SUBCATEGORY where each relationship exists.
+The same companies can be competitors in one context and partners in another!
+
+For each pair determine:
+1. target: The target brand name exactly as given above
+2. relationship_type: The type of relationship (competitor, partner, customer, supplier, subsidiary, parent, investor, neutral, unknown)
+3. relationship_context: The specific subcategory/context (e.g., "consumer_smartphones", "supply_chain", "r_and_d", "patent_licensing")
+4. confidence: Your confidence in this classification (0.0 to 1.0)
+5. evidence: A quote or summary supporting your classification
+6. reasoning: Brief explanation considering the specific context
+7. sentiment: The sentiment/tone (positive, negative, neutral, or mixed)
+
+Return JSON in this exact format, with one entry per pair:
+{{
+    "relationships": [
+        {{
+            "target": "Brand Name",
+            "relationship_type": "competitor",
+            "relationship_context": "consumer_smartphones",
+            "confidence": 0.85,
+            "evidence": "Specific evidence from the text or search results",
+            "reasoning": "Why you chose this classification in THIS specific context",
+            "sentiment": "negative"
+        }}
+    ]
+}}
+
+Be conservative with confidence scores:
+- 0.9-1.0: Very clear, explicit relationship in specific context
+- 0.7-0.9: Strong evidence but some ambiguity
+- 0.5-0.7: Moderate evidence, contextual inference
+- 0.3-0.5: Weak evidence, high uncertainty
+- 0.0-0.3: Very uncertain, insufficient information
+"""
+    
+    def _relationships_from_batch_response(
+        self,
+        subject_brand: str,
+        brands: List[Brand],
+        category: str,
+        search_results: List[List[WebSearchResult]],
+        response: str
+    ) -> List[Relationship]:
+        """
+        Parse a batched classification response.
+        
+        Raises:
+            ValueError: If the response is malformed or misses a brand
+        """
+        data = self._parse_json_response(response)
+        
+        entries = data.get("relationships") if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            raise ValueError("Batched response has no 'relationships' list")
+        
+        by_target = {}
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get("target"):
+                by_target[str(entry["target"]).strip().lower()] = entry
+        
+        relationships = []
+        for brand, results in zip(brands, search_results):
+            entry = by_target.get(brand.name.lower())
+            if entry is None:
+                raise ValueError(f"Batched response is missing brand '{brand.name}'")
+            relationships.append(self._relationship_from_llm_data(
+                subject_brand=subject_brand,
+                brand=brand,
+                category=category,
+                data=entry,
+                search_results=results
+            ))
+        
+        return relationships
+    
+    def _relationship_from_llm_data(
+        self,
+        subject_brand: str,
+        brand: Brand,
+        category: str,
+        data: dict,
+        search_results: List[WebSearchResult]
+    ) -> Relationship:
+        """
+        Build a relationship from a parsed LLM classification.
+        
+        Args:
+            subject_brand: The main brand being analyzed
+            brand: Classified brand
+            category: Category
+            data: Parsed JSON classification
+            search_results: Web search results used for the classification
+            
+        Returns:
+            Relationship
+        """
+        rel_type = RelationshipType(data.get("relationship_type", "unknown"))
+        relationship_context = data.get("relationship_context", "general")
+        confidence = float(data.get("confidence", 0.5))
+        evidence = data.get("evidence", "No evidence provided")
+        reasoning = data.get("reasoning", "")
+        sentiment = data.get("sentiment", "neutral")
+        
+        # Determine source type
+        source_type = SourceType.WEB_SEARCH if search_results else SourceType.LLM_INFERENCE
+        
+        return Relationship(
+            source=subject_brand,
+            target=brand.name,
+            relationship_type=rel_type,
+            category=category,
+            relationship_context=relationship_context,
+            confidence=confidence,
+            evidence=evidence,
+            source_type=source_type,
+            flagged=should_flag_relationship(confidence),
+            reasoning=reasoning,
+            sentiment=sentiment
+        )
 
 
 def should_flag_relationship(confidence: float) -> bool:
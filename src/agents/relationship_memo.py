@@ -0,0 +1,308 @@
+"""
+Relationship Memo - Remembers classified brand pairs so a batch classifies each pair once.
+"""
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from ..models import Relationship, RelationshipType
+from ..single_flight import SingleFlight
+from ..utils import normalize_brand_name
+
+
+logger = logging.getLogger(__name__)
+
+# How a relationship reads from the other brand's side, for every
+# RelationshipType. None means there is no inverse type (nothing says "is
+# invested in by"), so the reverse pair is classified on its own.
+INVERSE_RELATIONSHIP_TYPES: Dict[RelationshipType, Optional[RelationshipType]] = {
+    RelationshipType.COMPETITOR: RelationshipType.COMPETITOR,
+    RelationshipType.PARTNER: RelationshipType.PARTNER,
+    RelationshipType.NEUTRAL: RelationshipType.NEUTRAL,
+    RelationshipType.UNKNOWN: RelationshipType.UNKNOWN,
+    RelationshipType.PARENT: RelationshipType.SUBSIDIARY,
+    RelationshipType.SUBSIDIARY: RelationshipType.PARENT,
+    RelationshipType.SUPPLIER: RelationshipType.CUSTOMER,
+    RelationshipType.CUSTOMER: RelationshipType.SUPPLIER,
+    RelationshipType.INVESTOR: None,
+}
+
+PairKey = Tuple[str, str, str]
+
+
+def _normalize(brand: str) -> str:
+    """Canonical brand name for matching ("Tesla, Inc." and "tesla" are the same brand)."""
+    return " ".join(re.findall(r"\w+", normalize_brand_name(brand).lower()))
+
+
+def invert_relationship(relationship: Relationship) -> Optional[Relationship]:
+    """
+    The same relationship seen from the target brand's side.
+
+    Args:
+        relationship: Relationship to invert
+
+    Returns:
+        Relationship with source and target swapped, or None if the type has no inverse
+    """
+    inverse_type = INVERSE_RELATIONSHIP_TYPES.get(relationship.relationship_type)
+    if inverse_type is None:
+        return None
+    return relationship.model_copy(update={
+        "source": relationship.target,
+        "target": relationship.source,
+        "relationship_type": inverse_type
+    })
+
+
+class RelationshipMemo:
+    """
+    Thread-safe, in-process memo of classified pairs.
+
+    Keys are the unordered, normalized (brand_a, brand_b, category), so the
+    reverse pair is served by inverting the stored relationship. Concurrent
+    lookups of the same pair share one classification, through resolve() for
+    pairs classified one at a time, or through reserve() for pairs a caller
+    classifies later in a batch. Entries expire after
+    ttl_seconds, so a long-lived memo (e.g. in the API process) doesn't keep
+    serving classifications after the graph or the LLM cache has moved on.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """
+        Initialize memo.
+
+        Args:
+            max_entries: Max pairs remembered; least recently used are evicted (None or 0 = unbounded)
+            ttl_seconds: Seconds a classification is served (None or 0 = until evicted)
+        """
+        self.max_entries = max_entries or None
+        self.ttl_seconds = ttl_seconds or None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[PairKey, Tuple[float, Relationship]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._reservations: Dict[PairKey, Future] = {}
+
+    @staticmethod
+    def key(brand_a: str, brand_b: str, category: str) -> PairKey:
+        """Unordered key for a brand pair in a category."""
+        first, second = sorted([_normalize(brand_a), _normalize(brand_b)])
+        return (first, second, category.strip().lower())
+
+    def get(self, source: str, target: str, category: str) -> Optional[Relationship]:
+        """
+        Look up a pair in either direction.
+
+        Args:
+            source: Source brand
+            target: Target brand
+            category: Category context
+
+        Returns:
+            Relationship oriented source -> target, or None on miss
+        """
+        key = self.key(source, target, category)
+        with self._lock:
+            entry = self._entries.get(key)
+            stored = None
+            if entry is not None and entry[0] and entry[0] < time.monotonic():
+                del self._entries[key]
+            elif entry is not None:
+                stored = entry[1]
+                self._entries.move_to_end(key)
+
+        relationship = self._orient(stored, source, target) if stored is not None else None
+        with self._lock:
+            if relationship is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return relationship
+
+    def put(self, relationship: Relationship):
+        """
+        Remember a classified relationship.
+
+        Unknown relationships (including failed classifications) are not
+        remembered, so the pair gets another chance later.
+
+        Args:
+            relationship: Classified relationship
+        """
+        if relationship.relationship_type == RelationshipType.UNKNOWN:
+            return
+        key = self.key(relationship.source, relationship.target, relationship.category)
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0
+        with self._lock:
+            self._entries[key] = (expires_at, relationship)
+            self._entries.move_to_end(key)
+            if self.max_entries:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def resolve(
+        self,
+        source: str,
+        target: str,
+        category: str,
+        classify: Callable[[], Relationship]
+    ) -> Tuple[Relationship, bool]:
+        """
+        Get a pair from the memo, or classify it once for all concurrent callers.
+
+        Args:
+            source: Source brand
+            target: Target brand
+            category: Category context
+            classify: Classifies source -> target on a miss
+
+        Returns:
+            Relationship oriented source -> target, and whether this caller
+            claimed a new classification (and so should store it). Each new
+            classification is claimed by exactly one caller, even if the one
+            that started it was cancelled; memo hits are never claimed
+        """
+        memoized = self.get(source, target, category)
+        if memoized is not None:
+            return memoized, False
+
+        def classify_and_remember() -> Tuple[Relationship, list]:
+            relationship = classify()
+            self.put(relationship)
+            return relationship, [relationship]
+
+        key = "|".join(self.key(source, target, category))
+        relationship, claim = self._flights.do(key, classify_and_remember)
+        oriented = self._orient(relationship, source, target)
+        if oriented is None:
+            # A concurrent reverse classification without an inverse: classify our own direction
+            return classify_and_remember()[0], True
+        return oriented, self._claim(claim)
+
+    async def aresolve(
+        self,
+        source: str,
+        target: str,
+        category: str,
+        classify: Callable[[], Awaitable[Relationship]]
+    ) -> Tuple[Relationship, bool]:
+        """Async variant of resolve."""
+        memoized = self.get(source, target, category)
+        if memoized is not None:
+            return memoized, False
+
+        async def classify_and_remember() -> Tuple[Relationship, list]:
+            relationship = await classify()
+            self.put(relationship)
+            return relationship, [relationship]
+
+        key = "|".join(self.key(source, target, category))
+        relationship, claim = await self._flights.ado(key, classify_and_remember)
+        oriented = self._orient(relationship, source, target)
+        if oriented is None:
+            return (await classify_and_remember())[0], True
+        return oriented, self._claim(claim)
+
+    def reserve(self, source: str, target: str, category: str) -> Tuple[Future, bool]:
+        """
+        Reserve a pair that the caller will classify later (e.g. in a batch).
+
+        Args:
+            source: Source brand
+            target: Target brand
+            category: Category context
+
+        Returns:
+            Future of the pair's relationship, and whether the caller owns the
+            reservation. An owner must end it with fulfill(), even on failure;
+            other callers pass the future to wait() or await_reserved()
+        """
+        future = Future()
+        memoized = self.get(source, target, category)
+        if memoized is not None:
+            future.set_result(memoized)
+            return future, False
+        key = self.key(source, target, category)
+        with self._lock:
+            pending = self._reservations.get(key)
+            if pending is not None:
+                return pending, False
+            self._reservations[key] = future
+        return future, True
+
+    def fulfill(self, source: str, target: str, category: str, relationship: Optional[Relationship]):
+        """
+        End an owned reservation.
+
+        Args:
+            source: Source brand, as reserved
+            target: Target brand, as reserved
+            category: Category context, as reserved
+            relationship: The classification, or None if it failed (waiters
+                then classify the pair themselves)
+        """
+        if relationship is not None:
+            self.put(relationship)
+        with self._lock:
+            future = self._reservations.pop(self.key(source, target, category), None)
+        if future is not None:
+            future.set_result(relationship)
+
+    def wait(self, future: Future, source: str, target: str) -> Optional[Relationship]:
+        """
+        Wait for a reserved pair.
+
+        Returns:
+            Relationship oriented source -> target, or None if the owner failed
+            or classified the reverse pair and it has no inverse
+        """
+        return self._orient_reserved(future.result(), source, target)
+
+    async def await_reserved(self, future: Future, source: str, target: str) -> Optional[Relationship]:
+        """Async variant of wait."""
+        # Shielded: a cancelled waiter must not cancel the owner's future
+        relationship = await asyncio.shield(asyncio.wrap_future(future))
+        return self._orient_reserved(relationship, source, target)
+
+    def _orient_reserved(self, relationship: Optional[Relationship], source: str, target: str) -> Optional[Relationship]:
+        return self._orient(relationship, source, target) if relationship is not None else None
+
+    @staticmethod
+    def _claim(claim: list) -> bool:
+        """Take a new classification's one claim; False if another caller took it."""
+        try:
+            claim.pop()
+            return True
+        except IndexError:
+            return False
+
+    def clear(self):
+        """Forget all pairs."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get memo statistics."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def _orient(relationship: Relationship, source: str, target: str) -> Optional[Relationship]:
+        """Present a stored relationship as source -> target (None if it can't be inverted)."""
+        if _normalize(relationship.source) == _normalize(source):
+            return relationship.model_copy(update={"source": source, "target": target})
+        inverted = invert_relationship(relationship)
+        if inverted is None:
+            return None
+        return inverted.model_copy(update={"source": source, "target": target})
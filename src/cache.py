@@ -0,0 +1,283 @@
+"""
+Response caching for deterministic LLM calls and web searches.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+from .config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Cache hits whose access times are buffered before one batched UPDATE
+_ACCESS_FLUSH_SIZE = 256
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a content-addressed cache key from arbitrary JSON-serializable parts.
+
+    Args:
+        parts: Values that together identify a request
+
+    Returns:
+        SHA-256 hex digest
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Base class for response caches with hit/miss accounting."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str, is_fresh: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key
+            is_fresh: Optional check on the stored value; values it rejects count as misses
+
+        Returns:
+            Cached value or None on miss
+        """
+        value = self._get(key)
+        if value is not None and is_fresh is not None and not is_fresh(value):
+            value = None
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        """Backend lookup without accounting."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str):
+        """Store a response."""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Remove all entries."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self)
+        }
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk response cache backed by SQLite with TTL and LRU size eviction.
+
+    Hits don't write: their access times are buffered and flushed in one
+    batch, before any eviction. Eviction runs only once the entry count
+    (tracked in memory, resynced on every eviction) exceeds max_entries.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        """
+        Initialize SQLite cache.
+
+        Args:
+            path: Database file path (":memory:" for a throwaway cache)
+            ttl_seconds: Entry lifetime in seconds (None or 0 = never expire)
+            max_entries: Max entries kept; least recently used are evicted (None or 0 = unbounded)
+        """
+        super().__init__()
+        self.path = path
+        self.ttl_seconds = ttl_seconds or None
+        self.max_entries = max_entries or None
+
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+
+        # A single connection shared across threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+            )
+            self._conn.commit()
+            self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        self._accessed: Dict[str, float] = {}
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                cursor = self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count -= cursor.rowcount
+                self._accessed.pop(key, None)
+                return None
+
+            self._accessed[key] = now
+            if len(self._accessed) >= _ACCESS_FLUSH_SIZE:
+                self._flush_accessed()
+                self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)
+            ).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._accessed.pop(key, None)
+            if not exists:
+                self._count += 1
+            if self.max_entries and self._count > self.max_entries:
+                self._flush_accessed()
+                self._conn.execute(
+                    """
+                    DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,)
+                )
+                self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            self._conn.commit()
+
+    def _flush_accessed(self):
+        """Write buffered access times (caller holds the lock and commits)."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def purge_expired(self) -> int:
+        """
+        Delete all expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        if not self.ttl_seconds:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+            self._count -= cursor.rowcount
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._count = 0
+            self._accessed.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        """Flush buffered access times and close the database connection."""
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            self._conn.close()
+
+
+# Singleton instances
+_llm_cache: Optional[ResponseCache] = None
+_llm_cache_lock = threading.Lock()
+_search_cache: Optional[ResponseCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[ResponseCache]:
+    """Get or create the LLM response cache singleton (None when disabled)."""
+    global _llm_cache
+    if not settings.llm_cache_enabled:
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = SQLiteResponseCache(
+                path=settings.llm_cache_path,
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                max_entries=settings.llm_cache_max_entries
+            )
+            logger.info(f"LLM response cache enabled at {settings.llm_cache_path}")
+    return _llm_cache
+
+
+def get_search_cache() -> Optional[ResponseCache]:
+    """Get or create the web search result cache singleton (None when disabled)."""
+    global _search_cache
+    if not settings.search_cache_enabled:
+        return None
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SQLiteResponseCache(
+                path=settings.search_cache_path,
+                ttl_seconds=settings.search_cache_ttl_seconds,
+                max_entries=settings.search_cache_max_entries
+            )
+            logger.info(f"Web search cache enabled at {settings.search_cache_path}")
+    return _search_cache
@@ -20,19 +20,76 @@ class Settings(BaseSettings):
     llm_model: str = os.getenv("LLM_MODEL", "gpt-4o")
     llm_temperature: float = float(os.getenv("LLM_TEMPERATURE", "0.0"))
     
+    # LLM Response Cache
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite")
+    llm_cache_ttl_seconds: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", "0"))  # 0 = never expire
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))  # 0 = unbounded
+    
+    # Rate Limiting (0 = unlimited)
+    llm_requests_per_minute: float = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))  # Per provider/model
+    llm_tokens_per_minute: float = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))  # Per provider/model, prompt tokens (estimated)
+    search_requests_per_minute: float = float(os.getenv("SEARCH_REQUESTS_PER_MINUTE", "0"))  # Per search provider
+    rate_limit_max_retries: int = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))  # Retries on 429/5xx/timeouts
+    rate_limit_backoff_seconds: float = float(os.getenv("RATE_LIMIT_BACKOFF_SECONDS", "1.0"))  # Initial backoff, doubled per retry
+    rate_limit_max_backoff_seconds: float = float(os.getenv("RATE_LIMIT_MAX_BACKOFF_SECONDS", "60"))
+    
     # Neo4j Configuration
     neo4j_uri: str = os.getenv("NEO4J_URI", "bolt://localhost:7687")
     neo4j_user: str = os.getenv("NEO4J_USER", "neo4j")
     neo4j_password: str = os.getenv("NEO4J_PASSWORD", "password")
+    neo4j_max_connection_pool_size: int = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", "100"))
+    neo4j_connection_acquisition_timeout: float = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60"))  # Seconds to wait for a pooled connection
+    neo4j_max_connection_lifetime: float = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))  # Seconds before a connection is recycled
+    neo4j_max_transaction_retry_time: float = float(os.getenv("NEO4J_MAX_TRANSACTION_RETRY_TIME", "30"))  # Seconds managed transactions retry transient errors
+    neo4j_fetch_size: int = int(os.getenv("NEO4J_FETCH_SIZE", "1000"))  # Records pulled per batch from the server
+    graph_backend: str = os.getenv("GRAPH_BACKEND", "neo4j")  # "neo4j" or "embedded" (in-process graph persisted to embedded_graph_path)
+    embedded_graph_path: Optional[str] = os.getenv("EMBEDDED_GRAPH_PATH", ".cache/graph.jsonl")  # Empty keeps the embedded graph in memory only
+    graph_cache_enabled: bool = os.getenv("GRAPH_CACHE_ENABLED", "true").lower() == "true"  # In-process cache of relationship lookups
+    graph_cache_max_entries: int = int(os.getenv("GRAPH_CACHE_MAX_ENTRIES", "5000"))  # 0 = unbounded
+    graph_cache_ttl_seconds: float = float(os.getenv("GRAPH_CACHE_TTL_SECONDS", "300"))  # Bounds staleness from other processes' writes (0 = until invalidated)
+    graph_cache_negative_ttl_seconds: float = float(os.getenv("GRAPH_CACHE_NEGATIVE_TTL_SECONDS", "60"))  # How long "no relationship" is trusted
+    neo4j_schema_check: bool = os.getenv("NEO4J_SCHEMA_CHECK", "true").lower() == "true"  # Report missing indexes and scanning query plans on API startup
+    graph_snapshot_ttl_seconds: float = float(os.getenv("GRAPH_SNAPSHOT_TTL_SECONDS", "300"))  # How long /visualize reuses its in-memory adjacency snapshot
+    visualize_max_nodes: int = int(os.getenv("VISUALIZE_MAX_NODES", "500"))  # Node budget of a /visualize view
+    visualize_max_edges: int = int(os.getenv("VISUALIZE_MAX_EDGES", "2000"))  # Edge budget of a /visualize view
+    layout_cache_dir: str = os.getenv("LAYOUT_CACHE_DIR", ".cache/layouts")  # Precomputed visualization layouts keyed on graph content (empty disables)
+    layout_cache_max_files: int = int(os.getenv("LAYOUT_CACHE_MAX_FILES", "32"))  # Most recently used layouts kept (0 = unbounded)
     
     # Web Search Configuration
     tavily_api_key: Optional[str] = os.getenv("TAVILY_API_KEY")
     serpapi_api_key: Optional[str] = os.getenv("SERPAPI_API_KEY")
     max_web_search_results: int = int(os.getenv("MAX_WEB_SEARCH_RESULTS", "5"))
+    search_mode: str = os.getenv("SEARCH_MODE", "single")  # single (first configured provider), race, or merge
+    search_deadline_seconds: float = float(os.getenv("SEARCH_DEADLINE_SECONDS", "10"))  # race/merge: stop waiting for slower providers
+    search_race_min_results: int = int(os.getenv("SEARCH_RACE_MIN_RESULTS", "1"))  # race: results needed to win
+    search_http_pool_size: int = int(os.getenv("SEARCH_HTTP_POOL_SIZE", "10"))  # Keep-alive connections per search provider
+    search_async_max_workers: int = int(os.getenv("SEARCH_ASYNC_MAX_WORKERS", "128"))  # Threads running the (blocking) provider SDKs for async searches
+    
+    local_search_index_path: Optional[str] = os.getenv("LOCAL_SEARCH_INDEX_PATH")  # SQLite FTS5 index built with `main.py index-search`
+    local_search_only: bool = os.getenv("LOCAL_SEARCH_ONLY", "false").lower() == "true"  # Never call network search providers
+    
+    # Web Search Cache
+    search_cache_enabled: bool = os.getenv("SEARCH_CACHE_ENABLED", "false").lower() == "true"
+    search_cache_path: str = os.getenv("SEARCH_CACHE_PATH", ".cache/search_results.sqlite")
+    search_cache_ttl_seconds: float = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "604800"))  # Freshness window (0 = never expire)
+    search_cache_negative_ttl_seconds: float = float(os.getenv("SEARCH_CACHE_NEGATIVE_TTL_SECONDS", "86400"))  # How long empty results are trusted
+    search_cache_max_entries: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "100000"))  # 0 = unbounded
     
     # Pipeline Configuration
     confidence_threshold: float = float(os.getenv("CONFIDENCE_THRESHOLD", "0.7"))
     low_confidence_threshold: float = float(os.getenv("LOW_CONFIDENCE_THRESHOLD", "0.5"))
+    relationship_batch_size: int = int(os.getenv("RELATIONSHIP_BATCH_SIZE", "1"))  # Brand pairs per LLM call (1 = one call per pair)
+    relationship_max_workers: int = int(os.getenv("RELATIONSHIP_MAX_WORKERS", "4"))  # Max brand pairs classified in parallel (1 = sequential)
+    relationship_memo_enabled: bool = os.getenv("RELATIONSHIP_MEMO_ENABLED", "true").lower() == "true"  # Reuse pairs classified earlier in this process
+    relationship_memo_max_entries: int = int(os.getenv("RELATIONSHIP_MEMO_MAX_ENTRIES", "10000"))  # 0 = unbounded
+    relationship_memo_ttl_seconds: float = float(os.getenv("RELATIONSHIP_MEMO_TTL_SECONDS", "600"))  # Bounds how long a classification outlives graph or LLM cache changes (0 = until evicted)
+    
+    # API Configuration
+    api_pipeline_mode: str = os.getenv("API_PIPELINE_MODE", "thread")  # thread (worker pool) or async (AsyncBrandAnalysisPipeline)
+    api_max_concurrent_analyses: int = int(os.getenv("API_MAX_CONCURRENT_ANALYSES", "4"))  # Worker threads running the pipeline
+    api_max_queued_analyses: int = int(os.getenv("API_MAX_QUEUED_ANALYSES", "16"))  # Waiting requests before 429
+    api_max_async_analyses: int = int(os.getenv("API_MAX_ASYNC_ANALYSES", "256"))  # Async mode: analyses in flight on the event loop before 429
     
     # Logging
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
@@ -0,0 +1,168 @@
+"""
+Graph backend interface shared by the Neo4j and embedded graph stores.
+"""
+import base64
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def encode_cursor(updated_at: Optional[str], edge_id: Any) -> str:
+    """
+    Opaque keyset cursor pointing just past an exported edge.
+
+    Args:
+        updated_at: The edge's updated_at (ISO-8601)
+        edge_id: Backend-specific edge identity, the tie-breaker within a timestamp
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps([updated_at, edge_id], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], Any]:
+    """
+    Decode a cursor from encode_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        (updated_at, edge_id) of the last edge of the previous page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        updated_at, edge_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError(f"Invalid export cursor: {cursor!r}")
+    return updated_at, edge_id
+
+
+class GraphBackend(ABC):
+    """
+    Storage operations GraphOperations needs from a graph store.
+
+    Relationship rows passed to upsert_relationships are dicts with source,
+    target, category, context, rel_type and properties. Relationship data
+    returned by lookups has relationship_type, category, relationship_context
+    and properties (all edge properties, including updated_at).
+    """
+
+    @abstractmethod
+    def close(self):
+        """Release connections or flush state to disk."""
+        pass
+
+    @abstractmethod
+    def create_constraints(self):
+        """Create constraints and indexes (no-op for stores that don't need them)."""
+        pass
+
+    @abstractmethod
+    def check_schema(self) -> Dict[str, Any]:
+        """
+        Report missing indexes and hot queries that fall back to scans.
+
+        Returns:
+            Dict with "missing_indexes" (names) and "scans" (query name to scan operators)
+        """
+        pass
+
+    @abstractmethod
+    def clear_database(self):
+        """Remove all brands and relationships."""
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, int]:
+        """Get brand and relationship counts."""
+        pass
+
+    @abstractmethod
+    def get_categories(self) -> List[str]:
+        """Get the distinct relationship categories, sorted."""
+        pass
+
+    @abstractmethod
+    def upsert_brand(self, name: str, properties: Dict[str, Any]):
+        """Create or update a brand node."""
+        pass
+
+    @abstractmethod
+    def upsert_relationships(self, rows: List[Dict[str, Any]]):
+        """
+        Create or update relationships (and their brand nodes) in one write.
+
+        An edge is identified by (source, target, category, context).
+        """
+        pass
+
+    @abstractmethod
+    def get_relationships(
+        self,
+        source: str,
+        target: str,
+        category: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Relationships from source to target matching the filters, most recent first."""
+        pass
+
+    @abstractmethod
+    def get_relationships_for_targets(
+        self,
+        source: str,
+        targets: List[str],
+        category: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Most recent relationship from source to each target that has one."""
+        pass
+
+    @abstractmethod
+    def get_brand_relationships(self, brand: str, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Relationships touching a brand in either direction.
+
+        Returns:
+            Rows with source (the brand), target (the other brand),
+            relationship_type, category and properties
+        """
+        pass
+
+    @abstractmethod
+    def get_brands_by_category(self, category: str) -> List[str]:
+        """Brands with a relationship in the category."""
+        pass
+
+    @abstractmethod
+    def export_relationships(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+        category: Optional[str] = None,
+        relationship_type: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        updated_after: Optional[str] = None,
+        updated_before: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of edges in (updated_at, edge id) order.
+
+        Timestamps are ISO-8601 strings in UTC; updated_after is inclusive
+        and updated_before exclusive.
+
+        Returns:
+            Rows with source, target, relationship_type, category,
+            relationship_context, confidence and updated_at, and the cursor of
+            the next page (None once a page comes back short)
+        """
+        pass
+
+    @abstractmethod
+    def find_brand(self, name: str) -> Optional[str]:
+        """Stored name of the brand matching name case-insensitively."""
+        pass
@@ -0,0 +1,403 @@
+"""
+Embedded graph backend - in-process brand graph for single-node deployments, tests and benchmarks.
+"""
+import bisect
+import itertools
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .backend import GraphBackend, encode_cursor, decode_cursor
+
+
+logger = logging.getLogger(__name__)
+
+# (source, target, category, relationship_context) identifies an edge, as in the Neo4j MERGE
+EdgeKey = Tuple[str, str, str, str]
+
+# The log is compacted once it holds this many times the live records (and at
+# least _COMPACT_MIN_RECORDS), so re-upserting the same edges keeps it bounded
+# and amortizes each rewrite over the writes it drops
+_COMPACT_FACTOR = 4
+_COMPACT_MIN_RECORDS = 1024
+
+
+def _now() -> str:
+    """Timestamp stored as updated_at."""
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+class EmbeddedGraph(GraphBackend):
+    """
+    Brand graph held in adjacency maps inside the process.
+
+    Edges are keyed by (source, target, category, relationship_context) and
+    indexed by source -> target, by target and by category, so every
+    GraphOperations lookup is a few dict reads. State is persisted to an
+    append-only JSONL file (one record per upserted brand or edge) that is
+    replayed on open and compacted to one line per brand and edge on open,
+    on close and whenever superseded records outgrow the live ones.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) an embedded graph.
+
+        Args:
+            path: Graph file path (None keeps the graph in memory only)
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._log = None
+        self._reset()
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(path):
+                self._load()
+            if self._records > len(self._brands) + len(self._edges):
+                self.compact()
+            else:
+                self._log = open(path, "a", encoding="utf-8")
+            logger.info(f"Embedded graph opened at {path} ({len(self._brands)} brands, {len(self._edges)} relationships)")
+
+    def _reset(self):
+        """Empty all maps."""
+        self._brands: Dict[str, Dict[str, Any]] = {}
+        self._lower: Dict[str, str] = {}
+        self._edges: Dict[EdgeKey, Dict[str, Any]] = {}
+        # Write order of each edge, for "most recent first"
+        self._versions: Dict[EdgeKey, int] = {}
+        self._counter = itertools.count()
+        self._out: Dict[str, Dict[str, Set[EdgeKey]]] = {}
+        self._in: Dict[str, Set[EdgeKey]] = {}
+        self._by_category: Dict[str, Set[EdgeKey]] = {}
+        # (updated_at, key) of every edge, sorted; a rewrite replaces the
+        # edge's entry, whose timestamp is kept in _timeline_at
+        self._timeline: List[Tuple[str, EdgeKey]] = []
+        self._timeline_at: Dict[EdgeKey, str] = {}
+        # Lines in the on-disk log
+        self._records = 0
+
+    def close(self):
+        """Compact the graph file and close it."""
+        with self._lock:
+            if self._log is not None:
+                self.compact()
+                self._log.close()
+                self._log = None
+                logger.info("Embedded graph closed")
+
+    def compact(self):
+        """Rewrite the graph file with one record per brand and edge."""
+        if not self.path:
+            return
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for line in self._snapshot_lines():
+                    f.write(line)
+            os.replace(tmp_path, self.path)
+            self._records = len(self._brands) + len(self._edges)
+            self._log = open(self.path, "a", encoding="utf-8")
+
+    def create_constraints(self):
+        """Nothing to create: the adjacency maps are the indexes."""
+        logger.info("Embedded graph needs no constraints or indexes")
+
+    def check_schema(self) -> Dict[str, Any]:
+        """Every lookup is served by an adjacency map, so nothing is missing."""
+        return {"missing_indexes": [], "scans": {}}
+
+    def clear_database(self):
+        """Clear all nodes and relationships (use with caution!)."""
+        with self._lock:
+            self._reset()
+            if self._log is not None:
+                self._log.close()
+                self._log = open(self.path, "w", encoding="utf-8")
+        logger.warning("Database cleared")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get database statistics."""
+        with self._lock:
+            return {"brands": len(self._brands), "relationships": len(self._edges)}
+
+    def get_categories(self) -> List[str]:
+        """Get the distinct relationship categories, sorted."""
+        with self._lock:
+            return sorted(category for category, keys in self._by_category.items() if keys and category)
+
+    def upsert_brand(self, name: str, properties: Dict[str, Any]):
+        """Create or update a brand node."""
+        with self._lock:
+            brand = self._touch_brand(name)
+            brand.update(properties)
+            self._append([{"b": name, "p": brand}])
+
+    def upsert_relationships(self, rows: List[Dict[str, Any]]):
+        """Upsert relationships and their brand nodes, appended to the log as one write."""
+        with self._lock:
+            records = []
+            for row in rows:
+                for name in (row["source"], row["target"]):
+                    records.append({"b": name, "p": self._touch_brand(name)})
+
+                key = (row["source"], row["target"], row["category"], row["context"])
+                edge = self._edges.get(key) or {"category": row["category"], "relationship_context": row["context"]}
+                edge["relationship_type"] = row["rel_type"]
+                edge.update(row["properties"])
+                edge["updated_at"] = _now()
+                self._put_edge(key, edge)
+                records.append({"e": list(key), "p": edge})
+            self._append(records)
+
+    def get_relationships(
+        self,
+        source: str,
+        target: str,
+        category: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Relationships from source to target matching the filters, most recent first."""
+        with self._lock:
+            return self._lookup(source, target, category, context)
+
+    def _lookup(
+        self,
+        source: str,
+        target: str,
+        category: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """get_relationships for callers holding the lock."""
+        if category and context:
+            key = (source, target, category, context)
+            return [self._relationship_data(key)] if key in self._edges else []
+
+        keys = self._out.get(source, {}).get(target, ())
+        if category:
+            keys = [key for key in keys if key[2] == category]
+        rows = [self._relationship_data(key) for key in self._recent_first(keys)]
+        # Without filters only the latest relationship is returned, as in Neo4j
+        return rows if category else rows[:1]
+
+    def get_relationships_for_targets(
+        self,
+        source: str,
+        targets: List[str],
+        category: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Most recent relationship from source to each target that has one."""
+        found = {}
+        with self._lock:
+            for target in targets:
+                rows = self._lookup(source, target, category)
+                if rows:
+                    found[target] = rows[0]
+        return found
+
+    def get_brand_relationships(self, brand: str, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Relationships touching a brand in either direction."""
+        with self._lock:
+            outgoing = set().union(*self._out.get(brand, {}).values())
+            keys = outgoing | self._in.get(brand, set())
+            rows = []
+            for key in self._oldest_first(keys):
+                if category and key[2] != category:
+                    continue
+                edge = self._edges[key]
+                rows.append({
+                    "source": brand,
+                    "target": key[1] if key[0] == brand else key[0],
+                    "relationship_type": edge.get("relationship_type"),
+                    "category": edge.get("category"),
+                    "properties": dict(edge)
+                })
+            return rows
+
+    def get_brands_by_category(self, category: str) -> List[str]:
+        """Brands with a relationship in the category."""
+        with self._lock:
+            brands = {}
+            for source, target, _, _ in self._oldest_first(self._by_category.get(category, ())):
+                brands[source] = None
+                brands[target] = None
+            return list(brands)
+
+    def export_relationships(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+        category: Optional[str] = None,
+        relationship_type: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        updated_after: Optional[str] = None,
+        updated_before: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of edges in (updated_at, edge key) order, resuming after cursor."""
+        with self._lock:
+            timeline = self._timeline
+            if cursor:
+                after_ts, after_key = decode_cursor(cursor)
+                position = bisect.bisect_right(timeline, (after_ts, tuple(after_key)))
+            else:
+                position = 0
+            if updated_after:
+                position = max(position, bisect.bisect_left(timeline, (updated_after,)))
+
+            rows = []
+            last = None
+            while position < len(timeline) and len(rows) < limit:
+                updated_at, key = timeline[position]
+                position += 1
+                edge = self._edges[key]
+                if updated_before and updated_at >= updated_before:
+                    break
+                if category and key[2] != category:
+                    continue
+                if relationship_type and edge.get("relationship_type") != relationship_type:
+                    continue
+                if min_confidence is not None and (edge.get("confidence") is None or edge["confidence"] < min_confidence):
+                    continue
+                rows.append({
+                    "source": key[0],
+                    "target": key[1],
+                    "relationship_type": edge.get("relationship_type"),
+                    "category": key[2],
+                    "relationship_context": key[3],
+                    "confidence": edge.get("confidence"),
+                    "updated_at": updated_at
+                })
+                last = (updated_at, list(key))
+
+            next_cursor = encode_cursor(*last) if len(rows) == limit else None
+            return rows, next_cursor
+
+    def find_brand(self, name: str) -> Optional[str]:
+        """Stored name of the brand matching name case-insensitively."""
+        with self._lock:
+            return self._lower.get(name.lower())
+
+    def _touch_brand(self, name: str) -> Dict[str, Any]:
+        """Create the brand node if needed and stamp it as updated."""
+        brand = self._brands.setdefault(name, {"name": name})
+        brand["name_lower"] = name.lower()
+        brand["updated_at"] = _now()
+        self._lower[brand["name_lower"]] = name
+        return brand
+
+    def _put_edge(self, key: EdgeKey, edge: Dict[str, Any]):
+        """Store an edge and add it to every adjacency map."""
+        source, target, category, _ = key
+        self._edges[key] = edge
+        self._versions[key] = next(self._counter)
+        self._out.setdefault(source, {}).setdefault(target, set()).add(key)
+        self._in.setdefault(target, set()).add(key)
+        self._by_category.setdefault(category, set()).add(key)
+        # Replace the edge's previous entry: matching on the stored timestamp
+        # (not the edge's, already overwritten) works even if both writes
+        # got the same timestamp
+        previous = self._timeline_at.get(key)
+        if previous is not None:
+            position = bisect.bisect_left(self._timeline, (previous, key))
+            del self._timeline[position]
+        updated_at = edge.get("updated_at") or ""
+        bisect.insort(self._timeline, (updated_at, key))
+        self._timeline_at[key] = updated_at
+
+    def _relationship_data(self, key: EdgeKey) -> Dict[str, Any]:
+        """Relationship data in the shape GraphOperations returns."""
+        edge = self._edges[key]
+        return {
+            "relationship_type": edge.get("relationship_type"),
+            "category": edge.get("category"),
+            "relationship_context": edge.get("relationship_context"),
+            "properties": dict(edge)
+        }
+
+    def _recent_first(self, keys: Iterable[EdgeKey]) -> List[EdgeKey]:
+        return sorted(keys, key=self._versions.__getitem__, reverse=True)
+
+    def _oldest_first(self, keys: Iterable[EdgeKey]) -> List[EdgeKey]:
+        return sorted(keys, key=self._versions.__getitem__)
+
+    def _append(self, records: List[Dict[str, Any]]):
+        """Append upsert records to the graph file."""
+        if self._log is None:
+            return
+        self._log.write("".join(self._encode(record) for record in records))
+        self._log.flush()
+        self._records += len(records)
+        if self._records > _COMPACT_FACTOR * max(len(self._brands) + len(self._edges), _COMPACT_MIN_RECORDS):
+            self.compact()
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> str:
+        return json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=str) + "\n"
+
+    def _snapshot_lines(self) -> Iterable[str]:
+        """Current state as records, brands first and edges in write order."""
+        for name, brand in self._brands.items():
+            yield self._encode({"b": name, "p": brand})
+        for key in self._oldest_first(self._edges):
+            yield self._encode({"e": list(key), "p": self._edges[key]})
+
+    def _load(self):
+        """Replay the graph file."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                self._records += 1
+                if "b" in record:
+                    self._brands[record["b"]] = record["p"]
+                    self._lower[record["p"].get("name_lower", record["b"].lower())] = record["b"]
+                elif "e" in record:
+                    self._put_edge(tuple(record["e"]), record["p"])
+
+
+class AsyncEmbeddedGraph:
+    """
+    Async facade over an EmbeddedGraph for AsyncGraphOperations.
+
+    Lookups are in-process dict reads, so they run directly on the event loop.
+    """
+
+    def __init__(self, graph: EmbeddedGraph):
+        """
+        Initialize facade.
+
+        Args:
+            graph: Embedded graph shared with the synchronous backend
+        """
+        self.graph = graph
+
+    async def verify_connectivity(self):
+        """Nothing to connect to."""
+        pass
+
+    async def close(self):
+        """The shared graph is closed with the synchronous backend."""
+        pass
+
+    async def upsert_relationships(self, rows: List[Dict[str, Any]]):
+        """Upsert relationships and their brand nodes."""
+        self.graph.upsert_relationships(rows)
+
+    async def get_relationships_for_targets(
+        self,
+        source: str,
+        targets: List[str],
+        category: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Most recent relationship from source to each target that has one."""
+        return self.graph.get_relationships_for_targets(source, targets, category)
@@ -0,0 +1,278 @@
+"""
+Precomputed graph layouts - node positions for static visualization.
+"""
+import hashlib
+import json
+import logging
+import os
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy.sparse import coo_matrix, diags
+    from scipy.sparse.linalg import lobpcg
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+LAYOUTS = ("force", "spectral")
+
+# Rows of the pairwise repulsion computed at once (bounds memory to chunk * n)
+_REPULSION_CHUNK = 512
+
+# Force steps that untangle coincident nodes of a spectral layout
+_SPECTRAL_REFINE_ITERATIONS = 10
+
+# Largest graph given a dense eigendecomposition (O(n^2) memory, O(n^3) time);
+# larger graphs use scipy's sparse solver, or the force layout without scipy
+_SPECTRAL_DENSE_MAX_NODES = 2000
+
+# Iteration cap of the sparse solver; a layout needs only rough eigenvectors
+_SPECTRAL_SPARSE_MAX_ITERATIONS = 200
+
+
+def _edge_arrays(graph_data: Dict[str, Any]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Node ids and the source/target index arrays of the edges between them."""
+    ids = [node["id"] for node in graph_data["nodes"]]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    pairs = [
+        (index[edge["source"]], index[edge["target"]])
+        for edge in graph_data["edges"]
+        if edge["source"] in index and edge["target"] in index and edge["source"] != edge["target"]
+    ]
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    return ids, pairs[:, 0], pairs[:, 1]
+
+
+def spectral_layout(n: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Position nodes by the two smallest non-trivial eigenvectors of the graph Laplacian.
+
+    Up to _SPECTRAL_DENSE_MAX_NODES nodes the Laplacian is decomposed densely;
+    larger graphs need scipy, whose LOBPCG solver iterates on the sparse
+    Laplacian (O(edges) per step) for just the two eigenvectors orthogonal
+    to the constant one.
+
+    Args:
+        n: Number of nodes
+        sources: Source index of each edge
+        targets: Target index of each edge
+
+    Returns:
+        (n, 2) array of positions
+    """
+    if n < 3:
+        return np.array([[0.0, 0.0], [1.0, 0.0]])[:n]
+    if n > _SPECTRAL_DENSE_MAX_NODES:
+        adjacency = coo_matrix((np.ones(len(sources)), (sources, targets)), shape=(n, n)).tocsr()
+        adjacency = adjacency + adjacency.T
+        laplacian = diags(np.asarray(adjacency.sum(axis=1)).ravel()) - adjacency
+        start = np.random.default_rng(0).normal(size=(n, 2))
+        with warnings.catch_warnings():
+            # Stopping at the iteration cap short of tolerance is expected
+            warnings.simplefilter("ignore", UserWarning)
+            values, vectors = lobpcg(
+                laplacian.tocsr(), start, Y=np.ones((n, 1)), tol=1e-4,
+                maxiter=_SPECTRAL_SPARSE_MAX_ITERATIONS, largest=False
+            )
+        return vectors[:, np.argsort(values)]
+    adjacency = np.zeros((n, n))
+    np.add.at(adjacency, (sources, targets), 1.0)
+    adjacency += adjacency.T
+    laplacian = np.diag(adjacency.sum(axis=1)) - adjacency
+    _, vectors = np.linalg.eigh(laplacian)
+    return vectors[:, 1:3]
+
+
+def force_layout(
+    n: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    iterations: int = 50,
+    initial: Optional[np.ndarray] = None,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Fruchterman-Reingold force-directed layout, vectorized over all node pairs.
+
+    Args:
+        n: Number of nodes
+        sources: Source index of each edge
+        targets: Target index of each edge
+        iterations: Simulation steps
+        initial: (n, 2) starting positions in the unit square (default: random)
+        seed: Seed of the random start, or of the jitter that separates
+            coincident initial positions
+
+    Returns:
+        (n, 2) array of positions
+    """
+    rng = np.random.default_rng(seed)
+    if initial is None:
+        positions = rng.random((n, 2))
+    else:
+        positions = initial + rng.normal(scale=1e-3, size=(n, 2))
+    if n < 2:
+        return positions
+    k = np.sqrt(1.0 / n)
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        displacement = np.zeros((n, 2))
+        x, y = positions[:, 0], positions[:, 1]
+        # Repulsion k^2 / d between every pair
+        for start in range(0, n, _REPULSION_CHUNK):
+            end = start + _REPULSION_CHUNK
+            dx = x[start:end, None] - x[None, :]
+            dy = y[start:end, None] - y[None, :]
+            strength = (k * k) / np.maximum(dx * dx + dy * dy, 1e-9)
+            displacement[start:end, 0] += (dx * strength).sum(axis=1)
+            displacement[start:end, 1] += (dy * strength).sum(axis=1)
+        # Attraction d^2 / k along edges
+        delta = positions[sources] - positions[targets]
+        force = delta * (np.linalg.norm(delta, axis=1) / k)[:, None]
+        np.subtract.at(displacement, sources, force)
+        np.add.at(displacement, targets, force)
+
+        length = np.maximum(np.linalg.norm(displacement, axis=1), 1e-9)
+        positions += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+    return positions
+
+
+def compute_layout(
+    graph_data: Dict[str, Any],
+    method: str = "force",
+    iterations: int = 50,
+    scale: float = 1000.0
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Compute node positions for graph data.
+
+    Args:
+        graph_data: Graph data with nodes and edges
+        method: "force" or "spectral"
+        iterations: Steps of the force layout
+        scale: Positions are centered and scaled into [-scale, scale]
+
+    Returns:
+        Node id to (x, y)
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in LAYOUTS:
+        raise ValueError(f"Unknown layout {method!r}; expected one of {', '.join(LAYOUTS)}")
+    ids, sources, targets = _edge_arrays(graph_data)
+    if not ids:
+        return {}
+    if method == "spectral" and len(ids) > _SPECTRAL_DENSE_MAX_NODES and not SCIPY_AVAILABLE:
+        logger.warning(f"Spectral layout of {len(ids)} nodes needs scipy; using the force layout")
+        method = "force"
+    if method == "spectral":
+        # Structurally equivalent nodes share a spectral position; a short,
+        # cool force pass separates them without reshaping the layout
+        positions = spectral_layout(len(ids), sources, targets)
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        positions = (positions - low) / np.where(high > low, high - low, 1.0)
+        positions = force_layout(len(ids), sources, targets, _SPECTRAL_REFINE_ITERATIONS, initial=positions)
+    else:
+        positions = force_layout(len(ids), sources, targets, iterations)
+
+    positions = positions - positions.mean(axis=0)
+    extent = np.abs(positions).max()
+    if extent > 0:
+        positions = positions * (scale / extent)
+    return {node_id: (round(float(x), 2), round(float(y), 2)) for node_id, (x, y) in zip(ids, positions)}
+
+
+def graph_version(graph_data: Dict[str, Any], method: str, iterations: int) -> str:
+    """
+    Cache key of a layout: a hash of the nodes, edges and layout parameters.
+
+    Args:
+        graph_data: Graph data with nodes and edges
+        method: Layout method
+        iterations: Steps of the force layout
+
+    Returns:
+        Hex digest
+    """
+    payload = {
+        "nodes": sorted(node["id"] for node in graph_data["nodes"]),
+        "edges": sorted(
+            [edge["source"], edge["target"], edge["type"], edge.get("category") or ""]
+            for edge in graph_data["edges"]
+        ),
+        "method": method,
+        "iterations": iterations if method == "force" else None
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def get_layout(
+    graph_data: Dict[str, Any],
+    method: str = "force",
+    iterations: int = 50,
+    cache_dir: Optional[str] = None
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Get node positions, reusing the layout cached for an unchanged graph.
+
+    Args:
+        graph_data: Graph data with nodes and edges
+        method: "force" or "spectral"
+        iterations: Steps of the force layout
+        cache_dir: Layout cache directory (default: settings.layout_cache_dir; empty disables caching).
+            Only the settings.layout_cache_max_files most recently used layouts are kept
+
+    Returns:
+        Node id to (x, y)
+    """
+    cache_dir = settings.layout_cache_dir if cache_dir is None else cache_dir
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, f"{graph_version(graph_data, method, iterations)}.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                logger.info(f"Reusing cached layout {path}")
+                layout = {node_id: tuple(xy) for node_id, xy in json.load(f).items()}
+            # Mark as recently used, so pruning keeps it
+            os.utime(path)
+            return layout
+
+    layout = compute_layout(graph_data, method, iterations)
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(layout, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        _prune_layouts(cache_dir, settings.layout_cache_max_files)
+    return layout
+
+
+def _prune_layouts(cache_dir: str, max_files: int):
+    """Delete all but the max_files most recently used layouts (0 keeps all)."""
+    if max_files <= 0:
+        return
+    paths = [
+        os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".json")
+    ]
+    if len(paths) <= max_files:
+        return
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[max_files:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
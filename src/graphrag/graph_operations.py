@@ -2,21 +2,109 @@
 Graph operations for brand relationships.
 """
 import logging
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Iterator, Tuple, Union
 
-from .neo4j_client import get_neo4j_client
+from .neo4j_client import get_neo4j_client, get_async_neo4j_client
+from .relationship_cache import MISSING, RelationshipCache, get_relationship_cache
 from ..models import GraphNode, GraphEdge, Relationship, RelationshipType
 
 
 logger = logging.getLogger(__name__)
 
 
+def _relationship_rows(relationships: List[Relationship]) -> List[Dict[str, Any]]:
+    """Backend rows for GraphBackend.upsert_relationships."""
+    return [
+        {
+            "source": rel.source,
+            "target": rel.target,
+            "category": rel.category,
+            "context": rel.relationship_context,
+            "rel_type": rel.relationship_type.value,
+            "properties": GraphOperations._relationship_properties(rel)
+        }
+        for rel in relationships
+    ]
+
+
+def _cached_targets(
+    cache: Optional[RelationshipCache],
+    source_brand: str,
+    target_brands: List[str],
+    category: Optional[str]
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """Split targets into cached relationships and targets that need a graph lookup."""
+    if cache is None:
+        return {}, list(target_brands)
+    
+    found, missing = {}, []
+    for target in target_brands:
+        cached = cache.get((source_brand, target, category or None, None))
+        if cached is MISSING:
+            missing.append(target)
+        elif cached is not None:
+            found[target] = cached
+    return found, missing
+
+
+def _remember_targets(
+    cache: Optional[RelationshipCache],
+    source_brand: str,
+    target_brands: List[str],
+    category: Optional[str],
+    fetched: Dict[str, Dict[str, Any]]
+):
+    """Cache a targets lookup, including the targets without a relationship."""
+    if cache is None:
+        return
+    for target in target_brands:
+        cache.put((source_brand, target, category or None, None), fetched.get(target))
+
+
+def _utc_timestamp(value: Union[str, datetime, None]) -> Optional[str]:
+    """
+    Normalize an export time filter to an ISO-8601 UTC string.
+    
+    Naive timestamps are taken as UTC.
+    
+    Args:
+        value: ISO-8601 string or datetime (None or "" = no filter)
+        
+    Returns:
+        Timestamp in the format updated_at is compared against, or None
+        
+    Raises:
+        ValueError: If value is not an ISO-8601 timestamp
+    """
+    if value is None or value == "":
+        return None
+    moment = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _invalidate(cache: Optional[RelationshipCache], rows: List[Dict[str, Any]]):
+    """Drop cached lookups of the edges in upserted rows."""
+    if cache is None:
+        return
+    for row in rows:
+        cache.invalidate(row["source"], row["target"], row["category"], row["context"])
+
+
 class GraphOperations:
     """Operations for managing brand relationship graph."""
     
-    def __init__(self):
-        """Initialize graph operations."""
+    def __init__(self, cache: Optional[RelationshipCache] = None):
+        """
+        Initialize graph operations on the configured graph backend.
+        
+        Args:
+            cache: Relationship lookup cache (defaults to the shared cache, if enabled)
+        """
         self.client = get_neo4j_client()
+        self.cache = cache if cache is not None else get_relationship_cache()
     
     def create_brand_node(self, brand_name: str, properties: Dict[str, Any] = None) -> bool:
         """
@@ -31,18 +119,8 @@ class GraphOperations:
         """
         properties = properties or {}
         
-        query = """
-        MERGE (b:Brand {name: $name})
-        SET b += $properties
-        SET b.updated_at = datetime()
-        RETURN b
-        """
-        
         try:
-            self.client.execute_write(
-                query,
-                {"name": brand_name, "properties": properties}
-            )
+            self.client.upsert_brand(brand_name, properties)
             logger.info(f"Created/updated brand node: {brand_name}")
             return True
         except Exception as e:
@@ -74,33 +152,20 @@ class GraphOperations:
         """
         properties = properties or {}
         
-        # First ensure both nodes exist
-        self.create_brand_node(source_brand)
-        self.create_brand_node(target_brand)
-        
-        # Use category + context as unique key for relationships
-        query = """
-        MATCH (source:Brand {name: $source})
-        MATCH (target:Brand {name: $target})
-        MERGE (source)-[r:RELATES_TO {category: $category, relationship_context: $context}]->(target)
-        SET r.relationship_type = $rel_type
-        SET r += $properties
-        SET r.updated_at = datetime()
-        RETURN r
-        """
+        # Category + context is the unique key for relationships; the
+        # upsert creates both brand nodes if needed
+        row = {
+            "source": source_brand,
+            "target": target_brand,
+            "category": category,
+            "context": relationship_context,
+            "rel_type": relationship_type,
+            "properties": properties
+        }
         
         try:
-            self.client.execute_write(
-                query,
-                {
-                    "source": source_brand,
-                    "target": target_brand,
-                    "category": category,
-                    "context": relationship_context,
-                    "rel_type": relationship_type,
-                    "properties": properties
-                }
-            )
+            self.client.upsert_relationships([row])
+            _invalidate(self.cache, [row])
             logger.info(f"Created/updated relationship: {source_brand} -[{relationship_type}]-> {target_brand} ({category}/{relationship_context})")
             return True
         except Exception as e:
@@ -126,48 +191,58 @@ class GraphOperations:
         Returns:
             Relationship data or None if not found
         """
-        if category and relationship_context:
-            # Exact match with category and context
-            query = """
-            MATCH (source:Brand {name: $source})-[r:RELATES_TO {category: $category, relationship_context: $context}]->(target:Brand {name: $target})
-            RETURN r.relationship_type as relationship_type, 
-                   r.category as category,
-                   r.relationship_context as relationship_context,
-                   properties(r) as properties
-            """
-            params = {"source": source_brand, "target": target_brand, "category": category, "context": relationship_context}
-        elif category:
-            # All relationships in this category
-            query = """
-            MATCH (source:Brand {name: $source})-[r:RELATES_TO {category: $category}]->(target:Brand {name: $target})
-            RETURN r.relationship_type as relationship_type,
-                   r.category as category,
-                   r.relationship_context as relationship_context,
-                   properties(r) as properties
-            ORDER BY r.updated_at DESC
-            """
-            params = {"source": source_brand, "target": target_brand, "category": category}
-        else:
-            # Any relationship
-            query = """
-            MATCH (source:Brand {name: $source})-[r:RELATES_TO]->(target:Brand {name: $target})
-            RETURN r.relationship_type as relationship_type,
-                   r.category as category,
-                   r.relationship_context as relationship_context,
-                   properties(r) as properties
-            ORDER BY r.updated_at DESC
-            LIMIT 1
-            """
-            params = {"source": source_brand, "target": target_brand}
+        # The context filter only applies together with a category
+        key = (source_brand, target_brand, category or None, relationship_context if category else None)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not MISSING:
+                return cached
         
         try:
-            results = self.client.execute_query(query, params)
-            if results:
-                return results[0]
-            return None
+            results = self.client.get_relationships(source_brand, target_brand, category, relationship_context)
         except Exception as e:
             logger.error(f"Failed to get relationship: {e}")
             return None
+        
+        relationship = results[0] if results else None
+        if self.cache is not None:
+            self.cache.put(key, relationship)
+        return relationship
+    
+    def get_relationships_for_targets(
+        self,
+        source_brand: str,
+        target_brands: List[str],
+        category: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get existing relationships from one brand to many brands in one query.
+        
+        Args:
+            source_brand: Source brand name
+            target_brands: Target brand names
+            category: Optional category filter
+            
+        Returns:
+            Mapping of target brand name to its most recent relationship data
+            (same shape as get_relationship); targets without one are omitted
+        """
+        if not target_brands:
+            return {}
+        
+        found, missing = _cached_targets(self.cache, source_brand, target_brands, category)
+        if not missing:
+            return found
+        
+        try:
+            fetched = self.client.get_relationships_for_targets(source_brand, missing, category)
+        except Exception as e:
+            logger.error(f"Failed to get relationships for targets: {e}")
+            return found
+        
+        _remember_targets(self.cache, source_brand, missing, category, fetched)
+        found.update(fetched)
+        return found
     
     def get_all_relationships_for_brand(
         self,
@@ -184,29 +259,8 @@ class GraphOperations:
         Returns:
             List of relationships
         """
-        if category:
-            query = """
-            MATCH (b:Brand {name: $brand})-[r:RELATES_TO {category: $category}]-(other:Brand)
-            RETURN b.name as source,
-                   other.name as target,
-                   r.relationship_type as relationship_type,
-                   r.category as category,
-                   properties(r) as properties
-            """
-            params = {"brand": brand_name, "category": category}
-        else:
-            query = """
-            MATCH (b:Brand {name: $brand})-[r:RELATES_TO]-(other:Brand)
-            RETURN b.name as source,
-                   other.name as target,
-                   r.relationship_type as relationship_type,
-                   r.category as category,
-                   properties(r) as properties
-            """
-            params = {"brand": brand_name}
-        
         try:
-            return self.client.execute_query(query, params)
+            return self.client.get_brand_relationships(brand_name, category)
         except Exception as e:
             logger.error(f"Failed to get relationships for brand: {e}")
             return []
@@ -221,18 +275,28 @@ class GraphOperations:
         Returns:
             List of brand names
         """
-        query = """
-        MATCH (b:Brand)-[r:RELATES_TO {category: $category}]-()
-        RETURN DISTINCT b.name as name
-        """
-        
         try:
-            results = self.client.execute_query(query, {"category": category})
-            return [r["name"] for r in results]
+            return self.client.get_brands_by_category(category)
         except Exception as e:
             logger.error(f"Failed to get brands by category: {e}")
             return []
     
+    def find_brand(self, name: str) -> Optional[str]:
+        """
+        Look up a brand case-insensitively.
+        
+        Args:
+            name: Brand name in any casing
+            
+        Returns:
+            Stored brand name, or None if no brand matches
+        """
+        try:
+            return self.client.find_brand(name)
+        except Exception as e:
+            logger.error(f"Failed to find brand: {e}")
+            return None
+    
     def relationship_exists(
         self,
         source_brand: str,
@@ -252,60 +316,113 @@ class GraphOperations:
         """
         return self.get_relationship(source_brand, target_brand, category) is not None
     
-    def get_graph_data(self, category: Optional[str] = None) -> Dict[str, Any]:
+    def export_relationships(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+        category: Optional[str] = None,
+        relationship_type: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        updated_after: Union[str, datetime, None] = None,
+        updated_before: Union[str, datetime, None] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of edges, keyset-paginated by (updated_at, edge id).
+        
+        Pages stay cheap however deep the export goes, and an edge rewritten
+        during the export moves past the cursor, so it is exported again
+        with its new data rather than skipped.
+        
+        Args:
+            cursor: next_cursor of the previous page (None for the first page)
+            limit: Max edges in the page
+            category: Only edges in this category
+            relationship_type: Only edges of this type
+            min_confidence: Only edges with at least this confidence
+            updated_after: Only edges updated at or after this time (ISO-8601)
+            updated_before: Only edges updated before this time (ISO-8601)
+            
+        Returns:
+            Dict with "edges" and "next_cursor" (None on the last page)
+            
+        Raises:
+            ValueError: If the cursor or a timestamp is malformed
+        """
+        edges, next_cursor = self.client.export_relationships(
+            cursor=cursor,
+            limit=limit,
+            category=category,
+            relationship_type=relationship_type,
+            min_confidence=min_confidence,
+            updated_after=_utc_timestamp(updated_after),
+            updated_before=_utc_timestamp(updated_before)
+        )
+        return {"edges": edges, "next_cursor": next_cursor}
+    
+    def iter_relationship_pages(self, batch_size: int = 1000, **filters) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Walk the whole export page by page, holding one page in memory.
+        
+        Args:
+            batch_size: Edges per page
+            filters: Filters of export_relationships
+            
+        Yields:
+            Lists of edges
+        """
+        cursor = None
+        while True:
+            page = self.export_relationships(cursor=cursor, limit=batch_size, **filters)
+            if page["edges"]:
+                yield page["edges"]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return
+    
+    def iter_relationships(self, batch_size: int = 1000, **filters) -> Iterator[Dict[str, Any]]:
+        """Walk the whole export edge by edge (see iter_relationship_pages)."""
+        for page in self.iter_relationship_pages(batch_size, **filters):
+            yield from page
+    
+    def get_graph_data(self, category: Optional[str] = None, max_edges: Optional[int] = None) -> Dict[str, Any]:
         """
         Get graph data for visualization.
         
         Args:
             category: Optional category filter
+            max_edges: Stop after this many edges (None = whole graph)
             
         Returns:
-            Graph data with nodes and edges
-        """
-        if category:
-            query = """
-            MATCH (source:Brand)-[r:RELATES_TO {category: $category}]->(target:Brand)
-            RETURN source.name as source,
-                   target.name as target,
-                   r.relationship_type as relationship_type,
-                   r.category as category
-            """
-            params = {"category": category}
-        else:
-            query = """
-            MATCH (source:Brand)-[r:RELATES_TO]->(target:Brand)
-            RETURN source.name as source,
-                   target.name as target,
-                   r.relationship_type as relationship_type,
-                   r.category as category
-            LIMIT 1000
-            """
-            params = {}
+            Graph data with nodes, edges and whether max_edges truncated it
+        """
+        nodes = {}
+        edges = []
+        truncated = False
         
         try:
-            relationships = self.client.execute_query(query, params)
-            
-            # Extract unique nodes
-            nodes = set()
-            edges = []
-            
-            for rel in relationships:
-                nodes.add(rel["source"])
-                nodes.add(rel["target"])
+            for rel in self.iter_relationships(category=category):
+                if max_edges is not None and len(edges) >= max_edges:
+                    truncated = True
+                    break
+                nodes[rel["source"]] = None
+                nodes[rel["target"]] = None
                 edges.append({
                     "source": rel["source"],
                     "target": rel["target"],
                     "type": rel["relationship_type"],
                     "category": rel["category"]
                 })
-            
-            return {
-                "nodes": [{"id": node, "label": node} for node in nodes],
-                "edges": edges
-            }
         except Exception as e:
             logger.error(f"Failed to get graph data: {e}")
-            return {"nodes": [], "edges": []}
+            return {"nodes": [], "edges": [], "truncated": False}
+        
+        if truncated:
+            logger.warning(f"Graph data truncated to {max_edges} edges")
+        return {
+            "nodes": [{"id": node, "label": node} for node in nodes],
+            "edges": edges,
+            "truncated": truncated
+        }
     
     def store_relationship_from_model(self, relationship: Relationship) -> bool:
         """
@@ -317,6 +434,34 @@ class GraphOperations:
         Returns:
             True if successful
         """
+        return self.store_relationships([relationship])
+    
+    def store_relationships(self, relationships: List[Relationship]) -> bool:
+        """
+        Upsert many relationships and their brand nodes in one transaction.
+        
+        Args:
+            relationships: Relationship model instances
+            
+        Returns:
+            True if successful
+        """
+        if not relationships:
+            return True
+        
+        rows = _relationship_rows(relationships)
+        try:
+            self.client.upsert_relationships(rows)
+            _invalidate(self.cache, rows)
+            logger.info(f"Stored {len(relationships)} relationships in one transaction")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to store relationships: {e}")
+            return False
+    
+    @staticmethod
+    def _relationship_properties(relationship: Relationship) -> Dict[str, Any]:
+        """Edge properties persisted for a Relationship model."""
         properties = {
             "confidence": relationship.confidence,
             "evidence": relationship.evidence,
@@ -330,12 +475,75 @@ class GraphOperations:
         if relationship.sentiment:
             properties["sentiment"] = relationship.sentiment
         
-        return self.create_relationship(
-            source_brand=relationship.source,
-            target_brand=relationship.target,
-            relationship_type=relationship.relationship_type.value,
-            category=relationship.category,
-            relationship_context=relationship.relationship_context,
-            properties=properties
-        )
+        return properties
 
+
+class AsyncGraphOperations:
+    """Graph operations used by the asyncio pipeline."""
+    
+    def __init__(self, cache: Optional[RelationshipCache] = None):
+        """
+        Initialize async graph operations.
+        
+        Args:
+            cache: Relationship lookup cache (defaults to the shared cache, if enabled)
+        """
+        self.client = get_async_neo4j_client()
+        self.cache = cache if cache is not None else get_relationship_cache()
+    
+    async def get_relationships_for_targets(
+        self,
+        source_brand: str,
+        target_brands: List[str],
+        category: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get existing relationships from one brand to many brands in one query.
+        
+        Args:
+            source_brand: Source brand name
+            target_brands: Target brand names
+            category: Optional category filter
+            
+        Returns:
+            Mapping of target brand name to its most recent relationship data
+        """
+        if not target_brands:
+            return {}
+        
+        found, missing = _cached_targets(self.cache, source_brand, target_brands, category)
+        if not missing:
+            return found
+        
+        try:
+            fetched = await self.client.get_relationships_for_targets(source_brand, missing, category)
+        except Exception as e:
+            logger.error(f"Failed to get relationships for targets: {e}")
+            return found
+        
+        _remember_targets(self.cache, source_brand, missing, category, fetched)
+        found.update(fetched)
+        return found
+    
+    async def store_relationships(self, relationships: List[Relationship]) -> bool:
+        """
+        Upsert many relationships and their brand nodes in one transaction.
+        
+        Args:
+            relationships: Relationship model instances
+            
+        Returns:
+            True if successful
+        """
+        if not relationships:
+            return True
+        
+        rows = _relationship_rows(relationships)
+        try:
+            await self.client.upsert_relationships(rows)
+            _invalidate(self.cache, rows)
+            logger.info(f"Stored {len(relationships)} relationships in one transaction")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to store relationships: {e}")
+            return False
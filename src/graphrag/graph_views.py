@@ -0,0 +1,461 @@
+"""
+Aggregated graph views - level-of-detail visualization over a cached adjacency snapshot.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+VIEWS = ("auto", "raw", "top_brands", "ego", "categories")
+
+
+class GraphSnapshot:
+    """
+    The whole graph as integer-coded NumPy edge arrays.
+
+    Built once from the paginated export and reused by every view, so a
+    view costs a few vectorized passes over the arrays instead of a graph
+    query whose size grows with the graph.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        types: np.ndarray,
+        categories: np.ndarray,
+        type_names: List[str],
+        category_names: List[str]
+    ):
+        """
+        Initialize snapshot.
+
+        Args:
+            names: Brand name of each node id
+            sources: Source node id of each edge
+            targets: Target node id of each edge
+            types: Relationship type id of each edge
+            categories: Category id of each edge
+            type_names: Relationship type of each type id
+            category_names: Category of each category id
+        """
+        self.names = names
+        self.node_ids = {name: i for i, name in enumerate(names)}
+        self.sources = sources
+        self.targets = targets
+        self.types = types
+        self.categories = categories
+        self.type_names = type_names
+        self.category_names = category_names
+        self.built_at = time.monotonic()
+        self._csr = None
+        self._summarize_categories()
+
+    def _summarize_categories(self):
+        """
+        Per-category relationship and brand counts, and the brands each pair
+        of categories shares, computed once so the categories view is O(C^2).
+        """
+        num_categories = len(self.category_names)
+        self.category_edge_counts = np.bincount(self.categories, minlength=num_categories)
+        # Unique (brand, category) memberships, sorted by brand then category
+        memberships = np.unique(np.concatenate([
+            self.sources * num_categories + self.categories,
+            self.targets * num_categories + self.categories
+        ]))
+        member_nodes = memberships // max(num_categories, 1)
+        member_categories = memberships % max(num_categories, 1)
+        self.category_brand_counts = np.bincount(member_categories, minlength=num_categories)
+
+        shared = np.zeros((num_categories, num_categories), dtype=np.int64)
+        # Pair each membership with the brand's later ones, one offset at a time
+        offset = 1
+        while offset < memberships.size:
+            same_brand = member_nodes[offset:] == member_nodes[:-offset]
+            if not same_brand.any():
+                break
+            np.add.at(shared, (member_categories[:-offset][same_brand], member_categories[offset:][same_brand]), 1)
+            offset += 1
+        self.category_shared_brands = shared + shared.T
+
+    @classmethod
+    def build(cls, graph_ops, batch_size: int = 5000) -> "GraphSnapshot":
+        """
+        Build a snapshot by walking the paginated export.
+
+        Args:
+            graph_ops: GraphOperations to export from
+            batch_size: Edges per export page
+
+        Returns:
+            GraphSnapshot
+        """
+        node_ids: Dict[str, int] = {}
+        type_ids: Dict[str, int] = {}
+        category_ids: Dict[str, int] = {}
+        columns: List[List[int]] = [[], [], [], []]
+
+        for page in graph_ops.iter_relationship_pages(batch_size=batch_size):
+            for edge in page:
+                columns[0].append(node_ids.setdefault(edge["source"], len(node_ids)))
+                columns[1].append(node_ids.setdefault(edge["target"], len(node_ids)))
+                columns[2].append(type_ids.setdefault(edge["relationship_type"] or "unknown", len(type_ids)))
+                columns[3].append(category_ids.setdefault(edge["category"] or "", len(category_ids)))
+
+        sources, targets, types, categories = (np.array(column, dtype=np.int64) for column in columns)
+        snapshot = cls(list(node_ids), sources, targets, types, categories, list(type_ids), list(category_ids))
+        logger.info(f"Built graph snapshot: {len(node_ids)} brands, {len(sources)} relationships")
+        return snapshot
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.sources)
+
+    def edge_mask(self, category: Optional[str] = None) -> np.ndarray:
+        """Boolean mask of the edges in a category (all edges if None)."""
+        if not category:
+            return np.ones(self.num_edges, dtype=bool)
+        if category not in self.category_names:
+            return np.zeros(self.num_edges, dtype=bool)
+        return self.categories == self.category_names.index(category)
+
+    def degrees(self, mask: np.ndarray) -> np.ndarray:
+        """Undirected degree of every node, counting only masked edges."""
+        return np.bincount(
+            np.concatenate([self.sources[mask], self.targets[mask]]),
+            minlength=self.num_nodes
+        )
+
+    def adjacency(self, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Undirected adjacency in CSR form: the neighbors of node i are
+        adjacent[indptr[i]:indptr[i + 1]].
+
+        Args:
+            mask: Edges to traverse (default: all; only the unmasked form is cached)
+
+        Returns:
+            (indptr, adjacent)
+        """
+        if mask is None and self._csr is not None:
+            return self._csr
+        sources = self.sources if mask is None else self.sources[mask]
+        targets = self.targets if mask is None else self.targets[mask]
+        heads = np.concatenate([sources, targets])
+        tails = np.concatenate([targets, sources])
+        order = np.argsort(heads, kind="stable")
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(heads, minlength=self.num_nodes))])
+        csr = (indptr, tails[order])
+        if mask is None:
+            self._csr = csr
+        return csr
+
+    def neighbors(self, node: int) -> np.ndarray:
+        """Node ids adjacent to node in either direction."""
+        indptr, adjacent = self.adjacency()
+        return adjacent[indptr[node]:indptr[node + 1]]
+
+
+def _bundle(snapshot: GraphSnapshot, edges: np.ndarray, max_edges: int) -> Dict[str, Any]:
+    """
+    Collapse parallel edges with the same type and category, heaviest first.
+
+    Args:
+        snapshot: Graph snapshot
+        edges: Edge indices to bundle
+        max_edges: Edge budget
+
+    Returns:
+        Dict with edges (each with a count) and whether the budget truncated them
+    """
+    n, num_types, num_categories = snapshot.num_nodes, len(snapshot.type_names), len(snapshot.category_names)
+    keys = (
+        (snapshot.sources[edges] * n + snapshot.targets[edges]) * num_types + snapshot.types[edges]
+    ) * num_categories + snapshot.categories[edges]
+    _, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.argsort(-counts, kind="stable")[:max_edges]
+
+    bundled = []
+    for position in order:
+        edge = edges[first[position]]
+        bundled.append({
+            "source": snapshot.names[snapshot.sources[edge]],
+            "target": snapshot.names[snapshot.targets[edge]],
+            "type": snapshot.type_names[snapshot.types[edge]],
+            "category": snapshot.category_names[snapshot.categories[edge]],
+            "count": int(counts[position])
+        })
+    return {"edges": bundled, "truncated": len(counts) > max_edges}
+
+
+def _induced_view(
+    snapshot: GraphSnapshot,
+    in_view: np.ndarray,
+    mask: np.ndarray,
+    degrees: np.ndarray,
+    max_edges: int
+) -> Dict[str, Any]:
+    """Nodes flagged in in_view and the bundled edges among them."""
+    edges = np.flatnonzero(mask & in_view[snapshot.sources] & in_view[snapshot.targets])
+    view = _bundle(snapshot, edges, max_edges)
+    nodes = np.flatnonzero(in_view)
+    nodes = nodes[np.argsort(-degrees[nodes], kind="stable")]
+    view["nodes"] = [
+        {"id": snapshot.names[node], "label": snapshot.names[node], "degree": int(degrees[node])}
+        for node in nodes
+    ]
+    return view
+
+
+def raw_view(snapshot: GraphSnapshot, category: Optional[str], max_nodes: int, max_edges: int) -> Dict[str, Any]:
+    """Edges as stored, in export order, until either budget is reached."""
+    degrees = snapshot.degrees(snapshot.edge_mask(category))
+    nodes: Dict[int, None] = {}
+    edges = []
+    truncated = False
+    for edge in np.flatnonzero(snapshot.edge_mask(category)):
+        source, target = int(snapshot.sources[edge]), int(snapshot.targets[edge])
+        new_nodes = len({source, target} - nodes.keys())
+        if len(edges) >= max_edges or len(nodes) + new_nodes > max_nodes:
+            truncated = True
+            break
+        nodes[source] = None
+        nodes[target] = None
+        edges.append({
+            "source": snapshot.names[source],
+            "target": snapshot.names[target],
+            "type": snapshot.type_names[snapshot.types[edge]],
+            "category": snapshot.category_names[snapshot.categories[edge]],
+            "count": 1
+        })
+    return {
+        "nodes": [
+            {"id": snapshot.names[node], "label": snapshot.names[node], "degree": int(degrees[node])}
+            for node in nodes
+        ],
+        "edges": edges,
+        "truncated": truncated
+    }
+
+
+def top_brands_view(
+    snapshot: GraphSnapshot,
+    category: Optional[str],
+    top_k: int,
+    max_edges: int
+) -> Dict[str, Any]:
+    """The top_k brands by degree and the bundled edges among them."""
+    mask = snapshot.edge_mask(category)
+    degrees = snapshot.degrees(mask)
+    candidates = np.flatnonzero(degrees)
+    chosen = candidates
+    if len(candidates) > top_k:
+        chosen = candidates[np.argpartition(-degrees[candidates], top_k - 1)[:top_k]]
+
+    in_view = np.zeros(snapshot.num_nodes, dtype=bool)
+    in_view[chosen] = True
+    view = _induced_view(snapshot, in_view, mask, degrees, max_edges)
+    view["truncated"] = view["truncated"] or len(candidates) > top_k
+    return view
+
+
+def ego_view(
+    snapshot: GraphSnapshot,
+    category: Optional[str],
+    brand: str,
+    hops: int,
+    max_nodes: int,
+    max_edges: int
+) -> Dict[str, Any]:
+    """
+    The brands within hops of brand and the bundled edges among them.
+
+    When a hop would exceed max_nodes, its highest-degree brands are kept.
+    """
+    center = snapshot.node_ids.get(brand)
+    if center is None:
+        return {"nodes": [], "edges": [], "truncated": False}
+
+    mask = snapshot.edge_mask(category)
+    degrees = snapshot.degrees(mask)
+    in_view = np.zeros(snapshot.num_nodes, dtype=bool)
+    in_view[center] = True
+    # Only edges of the category are traversed
+    indptr, adjacent_ids = snapshot.adjacency(mask if category else None)
+
+    truncated = False
+    frontier = np.array([center])
+    for _ in range(hops):
+        room = max_nodes - int(in_view.sum())
+        if frontier.size == 0 or room <= 0:
+            break
+        adjacent = np.unique(np.concatenate([adjacent_ids[indptr[node]:indptr[node + 1]] for node in frontier]))
+        new = adjacent[~in_view[adjacent]]
+        if new.size > room:
+            truncated = True
+            new = new[np.argsort(-degrees[new], kind="stable")[:room]]
+        in_view[new] = True
+        frontier = new
+
+    view = _induced_view(snapshot, in_view, mask, degrees, max_edges)
+    view["truncated"] = view["truncated"] or truncated
+    return view
+
+
+def categories_view(snapshot: GraphSnapshot, max_nodes: int, max_edges: int) -> Dict[str, Any]:
+    """
+    One node per category; edges join categories that share brands.
+
+    Nodes carry their brand and relationship counts, edges the number of
+    shared brands.
+    """
+    nodes = [
+        {
+            "id": f"category:{name}",
+            "label": name or "uncategorized",
+            "brands": int(snapshot.category_brand_counts[category_id]),
+            "relationships": int(snapshot.category_edge_counts[category_id])
+        }
+        for category_id, name in enumerate(snapshot.category_names)
+    ]
+
+    ranked = sorted(range(len(nodes)), key=lambda i: -nodes[i]["relationships"])
+    kept = ranked[:max_nodes]
+    edges = []
+    for position, first in enumerate(kept):
+        for second in kept[position + 1:]:
+            shared = snapshot.category_shared_brands[first, second]
+            if shared:
+                edges.append({
+                    "source": nodes[first]["id"],
+                    "target": nodes[second]["id"],
+                    "type": "shared_brands",
+                    "category": None,
+                    "count": int(shared)
+                })
+    edges.sort(key=lambda edge: -edge["count"])
+    return {
+        "nodes": [nodes[i] for i in kept],
+        "edges": edges[:max_edges],
+        "truncated": len(nodes) > max_nodes or len(edges) > max_edges
+    }
+
+
+def build_view(
+    snapshot: GraphSnapshot,
+    view: str = "auto",
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    hops: int = 1,
+    top_k: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+    max_edges: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build a visualization view within a node and edge budget.
+
+    Args:
+        snapshot: Graph snapshot
+        view: "raw", "top_brands", "ego", "categories", or "auto" (raw if the
+            graph fits the budget, otherwise top_brands)
+        category: Only edges in this category (ignored by the categories view)
+        brand: Center of the ego view
+        hops: Radius of the ego view
+        top_k: Brands in the top_brands view (capped at max_nodes)
+        max_nodes: Node budget (default: settings.visualize_max_nodes)
+        max_edges: Edge budget (default: settings.visualize_max_edges)
+
+    Returns:
+        Graph data with nodes, edges, truncated, the view used and the graph totals
+
+    Raises:
+        ValueError: If the view is unknown or ego is requested without a brand
+    """
+    if view not in VIEWS:
+        raise ValueError(f"Unknown view {view!r}; expected one of {', '.join(VIEWS)}")
+    max_nodes = max_nodes or settings.visualize_max_nodes
+    max_edges = max_edges or settings.visualize_max_edges
+
+    if view == "auto":
+        mask = snapshot.edge_mask(category)
+        fits = int(mask.sum()) <= max_edges and int(np.count_nonzero(snapshot.degrees(mask))) <= max_nodes
+        view = "raw" if fits else "top_brands"
+
+    if view == "raw":
+        result = raw_view(snapshot, category, max_nodes, max_edges)
+    elif view == "top_brands":
+        result = top_brands_view(snapshot, category, min(top_k or max_nodes, max_nodes), max_edges)
+    elif view == "ego":
+        if not brand:
+            raise ValueError("The ego view needs a brand")
+        result = ego_view(snapshot, category, brand, hops, max_nodes, max_edges)
+    else:
+        result = categories_view(snapshot, max_nodes, max_edges)
+
+    result["view"] = view
+    result["total_nodes"] = snapshot.num_nodes
+    result["total_edges"] = snapshot.num_edges
+    return result
+
+
+# Singleton instance
+_snapshot: Optional[GraphSnapshot] = None
+_snapshot_lock = threading.Lock()
+_snapshot_refreshing = False
+
+
+def get_graph_snapshot(graph_ops, max_age: Optional[float] = None) -> GraphSnapshot:
+    """
+    Get the cached graph snapshot, refreshing it once it is older than max_age.
+
+    Only the first build is waited for. A stale snapshot keeps being served
+    while a single background thread rebuilds it, so a view never pays for
+    a full export.
+
+    Args:
+        graph_ops: GraphOperations to build from
+        max_age: Seconds a snapshot is reused (default: settings.graph_snapshot_ttl_seconds)
+
+    Returns:
+        GraphSnapshot
+    """
+    global _snapshot, _snapshot_refreshing
+    max_age = settings.graph_snapshot_ttl_seconds if max_age is None else max_age
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = GraphSnapshot.build(graph_ops)
+        elif time.monotonic() - _snapshot.built_at > max_age and not _snapshot_refreshing:
+            _snapshot_refreshing = True
+            threading.Thread(
+                target=_refresh_snapshot,
+                args=(graph_ops,),
+                name="graph-snapshot",
+                daemon=True
+            ).start()
+        return _snapshot
+
+
+def _refresh_snapshot(graph_ops):
+    """Rebuild the snapshot in the background; on failure the next request retries."""
+    global _snapshot, _snapshot_refreshing
+    try:
+        snapshot = GraphSnapshot.build(graph_ops)
+        with _snapshot_lock:
+            _snapshot = snapshot
+    except Exception as e:
+        logger.warning(f"Graph snapshot refresh failed: {e}")
+    finally:
+        with _snapshot_lock:
+            _snapshot_refreshing = False
@@ -2,17 +2,254 @@
 Neo4j database client for GraphRAG.
 """
 import logging
-from typing import Optional, List, Dict, Any
-from neo4j import GraphDatabase
+import threading
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+from neo4j import GraphDatabase, AsyncGraphDatabase, Session, Transaction, READ_ACCESS
 from neo4j.exceptions import ServiceUnavailable, AuthError
 
+from .backend import GraphBackend, encode_cursor, decode_cursor
 from ..config import settings
 
 
 logger = logging.getLogger(__name__)
 
 
-class Neo4jClient:
+def _driver_config() -> Dict[str, Any]:
+    """Connection pool settings shared by the sync and async drivers."""
+    return {
+        "max_connection_pool_size": settings.neo4j_max_connection_pool_size,
+        "connection_acquisition_timeout": settings.neo4j_connection_acquisition_timeout,
+        "max_connection_lifetime": settings.neo4j_max_connection_lifetime,
+        "max_transaction_retry_time": settings.neo4j_max_transaction_retry_time,
+    }
+
+
+def _session_config(**kwargs) -> Dict[str, Any]:
+    """Session settings, with the configured fetch size unless overridden."""
+    return {"fetch_size": settings.neo4j_fetch_size, **kwargs}
+
+
+# Schema created by create_constraints, as (index name, statement). A
+# constraint's backing index has the constraint's name in SHOW INDEXES.
+SCHEMA_INDEXES = [
+    # Unique constraint on Brand name (also the index behind {name: $x} lookups)
+    ("brand_name_unique", "CREATE CONSTRAINT brand_name_unique IF NOT EXISTS FOR (b:Brand) REQUIRE b.name IS UNIQUE"),
+    # Lowercased name for case-insensitive equality lookups
+    ("brand_name_lower", "CREATE INDEX brand_name_lower IF NOT EXISTS FOR (b:Brand) ON (b.name_lower)"),
+    # Text index for case-insensitive CONTAINS / STARTS WITH brand search
+    ("brand_name_lower_text", "CREATE TEXT INDEX brand_name_lower_text IF NOT EXISTS FOR (b:Brand) ON (b.name_lower)"),
+    # Index on category for faster lookups
+    ("relationship_category", "CREATE INDEX relationship_category IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.category)"),
+    # Edges are keyed by (category, relationship_context)
+    ("relationship_category_context", "CREATE INDEX relationship_category_context IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.category, r.relationship_context)"),
+    # Most recent edge in a category
+    ("relationship_category_updated", "CREATE INDEX relationship_category_updated IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.category, r.updated_at)"),
+    # Keyset-paginated export walks edges in updated_at order
+    ("relationship_updated_at", "CREATE INDEX relationship_updated_at IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.updated_at)"),
+]
+
+# Brands written before name_lower existed
+BACKFILL_NAME_LOWER_QUERY = """
+MATCH (b:Brand) WHERE b.name_lower IS NULL
+SET b.name_lower = toLower(b.name)
+"""
+
+# Plan operators that read every node/edge of a label or type instead of seeking an index
+SCAN_OPERATORS = {
+    "AllNodesScan",
+    "NodeByLabelScan",
+    "DirectedRelationshipTypeScan",
+    "UndirectedRelationshipTypeScan",
+    "DirectedAllRelationshipsScan",
+    "UndirectedAllRelationshipsScan",
+}
+
+
+# Upsert brand nodes and RELATES_TO edges for a list of relationship rows
+STORE_RELATIONSHIPS_QUERY = """
+UNWIND $rows AS row
+MERGE (source:Brand {name: row.source})
+SET source.name_lower = toLower(row.source), source.updated_at = datetime()
+MERGE (target:Brand {name: row.target})
+SET target.name_lower = toLower(row.target), target.updated_at = datetime()
+MERGE (source)-[r:RELATES_TO {category: row.category, relationship_context: row.context}]->(target)
+SET r.relationship_type = row.rel_type
+SET r += row.properties
+SET r.updated_at = datetime()
+"""
+
+UPSERT_BRAND_QUERY = """
+MERGE (b:Brand {name: $name})
+SET b += $properties
+SET b.name_lower = toLower($name), b.updated_at = datetime()
+RETURN b
+"""
+
+# get_relationships variants, by which filters are given
+RELATIONSHIP_BY_CONTEXT_QUERY = """
+MATCH (source:Brand {name: $source})-[r:RELATES_TO {category: $category, relationship_context: $context}]->(target:Brand {name: $target})
+RETURN r.relationship_type as relationship_type, 
+       r.category as category,
+       r.relationship_context as relationship_context,
+       properties(r) as properties
+"""
+
+RELATIONSHIP_BY_CATEGORY_QUERY = """
+MATCH (source:Brand {name: $source})-[r:RELATES_TO {category: $category}]->(target:Brand {name: $target})
+RETURN r.relationship_type as relationship_type,
+       r.category as category,
+       r.relationship_context as relationship_context,
+       properties(r) as properties
+ORDER BY r.updated_at DESC
+"""
+
+LATEST_RELATIONSHIP_QUERY = """
+MATCH (source:Brand {name: $source})-[r:RELATES_TO]->(target:Brand {name: $target})
+RETURN r.relationship_type as relationship_type,
+       r.category as category,
+       r.relationship_context as relationship_context,
+       properties(r) as properties
+ORDER BY r.updated_at DESC
+LIMIT 1
+"""
+
+BRANDS_BY_CATEGORY_QUERY = """
+MATCH (b:Brand)-[r:RELATES_TO {category: $category}]-()
+RETURN DISTINCT b.name as name
+"""
+
+FIND_BRAND_QUERY = """
+MATCH (b:Brand {name_lower: toLower($name)})
+RETURN b.name as name
+LIMIT 1
+"""
+
+CATEGORIES_QUERY = """
+MATCH ()-[r:RELATES_TO]->()
+RETURN DISTINCT r.category as category
+ORDER BY category
+"""
+
+
+def _targets_lookup_query(category: Optional[str]) -> str:
+    """Query returning the most recent edge from $source to each of $targets."""
+    if category:
+        match = "MATCH (source:Brand {name: $source})-[r:RELATES_TO {category: $category}]->(target:Brand {name: target_name})"
+    else:
+        match = "MATCH (source:Brand {name: $source})-[r:RELATES_TO]->(target:Brand {name: target_name})"
+    
+    return f"""
+    UNWIND $targets AS target_name
+    {match}
+    WITH target_name, r
+    ORDER BY r.updated_at DESC
+    WITH target_name, collect(r)[0] AS r
+    RETURN target_name as target,
+           r.relationship_type as relationship_type,
+           r.category as category,
+           r.relationship_context as relationship_context,
+           properties(r) as properties
+    """
+
+
+def _brand_relationships_query(category: Optional[str]) -> str:
+    """Query returning every edge touching $brand, in either direction."""
+    pattern = "[r:RELATES_TO {category: $category}]" if category else "[r:RELATES_TO]"
+    return f"""
+    MATCH (b:Brand {{name: $brand}})-{pattern}-(other:Brand)
+    RETURN b.name as source,
+           other.name as target,
+           r.relationship_type as relationship_type,
+           r.category as category,
+           properties(r) as properties
+    """
+
+
+def _export_query(after: bool, filters: Dict[str, Any]) -> str:
+    """
+    Keyset-paginated edge export, ordered by (updated_at, elementId).
+    
+    Args:
+        after: Whether to resume after $after_ts/$after_id
+        filters: Filters that are set (keys of export_relationships' filter arguments)
+    """
+    conditions = []
+    if after:
+        # The range predicate lets the updated_at index seek to the cursor
+        conditions.append(
+            "r.updated_at >= datetime($after_ts) AND "
+            "(r.updated_at > datetime($after_ts) OR elementId(r) > $after_id)"
+        )
+    if filters.get("category"):
+        conditions.append("r.category = $category")
+    if filters.get("relationship_type"):
+        conditions.append("r.relationship_type = $relationship_type")
+    if filters.get("min_confidence") is not None:
+        conditions.append("r.confidence >= $min_confidence")
+    if filters.get("updated_after"):
+        conditions.append("r.updated_at >= datetime($updated_after)")
+    if filters.get("updated_before"):
+        conditions.append("r.updated_at < datetime($updated_before)")
+    where = "WHERE " + "\n      AND ".join(conditions) if conditions else ""
+    
+    return f"""
+    MATCH (source:Brand)-[r:RELATES_TO]->(target:Brand)
+    {where}
+    RETURN elementId(r) as id,
+           source.name as source,
+           target.name as target,
+           r.relationship_type as relationship_type,
+           r.category as category,
+           r.relationship_context as relationship_context,
+           r.confidence as confidence,
+           r.updated_at as updated_at
+    ORDER BY r.updated_at, elementId(r)
+    LIMIT $limit
+    """
+
+
+def _iso(value: Any) -> Any:
+    """Neo4j or Python datetime as an ISO-8601 string."""
+    if hasattr(value, "iso_format"):
+        return value.iso_format()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _hot_queries() -> Dict[str, Any]:
+    """Queries on the analysis path, with sample parameters for EXPLAIN."""
+    pair = {"source": "", "target": "", "category": "", "context": ""}
+    return {
+        "relationship_by_context": (RELATIONSHIP_BY_CONTEXT_QUERY, pair),
+        "relationship_by_category": (RELATIONSHIP_BY_CATEGORY_QUERY, pair),
+        "targets_lookup": (_targets_lookup_query("category"), {"source": "", "targets": [], "category": ""}),
+        "brands_by_category": (BRANDS_BY_CATEGORY_QUERY, {"category": ""}),
+        "find_brand": (FIND_BRAND_QUERY, {"name": ""}),
+        "export_page": (_export_query(True, {}), {"after_ts": "2000-01-01T00:00:00Z", "after_id": "", "limit": 1000}),
+    }
+
+
+def plan_operators(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Flatten an EXPLAIN plan into its operator names.
+    
+    Args:
+        plan: Plan dict from a result summary (operatorType, children)
+        
+    Returns:
+        Operator names, root first, without the "@neo4j" runtime suffix
+    """
+    if not plan:
+        return []
+    operators = [plan.get("operatorType", "").split("@")[0]]
+    for child in plan.get("children", []):
+        operators.extend(plan_operators(child))
+    return operators
+
+
+class Neo4jClient(GraphBackend):
     """Neo4j database client."""
     
     def __init__(self, uri: str = None, user: str = None, password: str = None):
@@ -29,6 +266,8 @@ class Neo4jClient:
         self.password = password or settings.neo4j_password
         
         self.driver = None
+        # Session/transaction opened by session()/transaction() on this thread
+        self._local = threading.local()
         self._connect()
     
     def _connect(self):
@@ -36,7 +275,8 @@ class Neo4jClient:
         try:
             self.driver = GraphDatabase.driver(
                 self.uri,
-                auth=(self.user, self.password)
+                auth=(self.user, self.password),
+                **_driver_config()
             )
             # Verify connectivity
             self.driver.verify_connectivity()
@@ -57,6 +297,62 @@ class Neo4jClient:
             self.driver.close()
             logger.info("Neo4j connection closed")
     
+    @contextmanager
+    def session(self, **kwargs) -> Iterator[Session]:
+        """
+        Open a session that this thread's queries reuse until the block exits.
+        
+        execute_query/execute_write called inside the block (directly or via
+        GraphOperations) run on this session instead of opening their own.
+        Nested calls reuse the outer session.
+        
+        Args:
+            kwargs: Extra session configuration (e.g. database)
+            
+        Yields:
+            neo4j Session
+        """
+        current = getattr(self._local, "session", None)
+        if current is not None:
+            yield current
+            return
+        
+        with self.driver.session(**_session_config(**kwargs)) as session:
+            self._local.session = session
+            try:
+                yield session
+            finally:
+                self._local.session = None
+    
+    @contextmanager
+    def transaction(self, **kwargs) -> Iterator[Transaction]:
+        """
+        Run many statements in one explicit transaction.
+        
+        The transaction commits when the block exits normally and rolls back
+        on an exception. execute_query/execute_write called inside the block
+        on this thread join the transaction.
+        
+        Args:
+            kwargs: Extra session configuration (e.g. database)
+            
+        Yields:
+            neo4j Transaction
+        """
+        current = getattr(self._local, "transaction", None)
+        if current is not None:
+            yield current
+            return
+        
+        with self.session(**kwargs) as session:
+            with session.begin_transaction() as tx:
+                self._local.transaction = tx
+                try:
+                    yield tx
+                    tx.commit()
+                finally:
+                    self._local.transaction = None
+    
     def execute_query(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
         Execute a Cypher query.
@@ -71,7 +367,10 @@ class Neo4jClient:
         parameters = parameters or {}
         
         try:
-            with self.driver.session() as session:
+            tx = getattr(self._local, "transaction", None)
+            if tx is not None:
+                return [dict(record) for record in tx.run(query, parameters)]
+            with self.session() as session:
                 result = session.run(query, parameters)
                 return [dict(record) for record in result]
         except Exception as e:
@@ -79,6 +378,41 @@ class Neo4jClient:
             logger.error(f"Query: {query}")
             raise
     
+    def execute_read(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Execute a read transaction.
+        
+        Runs as a managed transaction in READ access mode, so a cluster or
+        neo4j:// routing URI can serve it from a follower, and transient
+        errors are retried by the driver.
+        
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+            
+        Returns:
+            List of result records as dictionaries
+        """
+        parameters = parameters or {}
+        
+        def _tx_function(tx):
+            result = tx.run(query, parameters)
+            return [dict(record) for record in result]
+        
+        try:
+            tx = getattr(self._local, "transaction", None)
+            if tx is not None:
+                return _tx_function(tx)
+            session = getattr(self._local, "session", None)
+            if session is not None:
+                return session.execute_read(_tx_function)
+            with self.session(default_access_mode=READ_ACCESS) as session:
+                return session.execute_read(_tx_function)
+        except Exception as e:
+            logger.error(f"Read transaction failed: {e}")
+            logger.error(f"Query: {query}")
+            raise
+    
     def execute_write(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
         Execute a write transaction.
@@ -97,7 +431,10 @@ class Neo4jClient:
             return [dict(record) for record in result]
         
         try:
-            with self.driver.session() as session:
+            tx = getattr(self._local, "transaction", None)
+            if tx is not None:
+                return _tx_function(tx)
+            with self.session() as session:
                 return session.execute_write(_tx_function)
         except Exception as e:
             logger.error(f"Write transaction failed: {e}")
@@ -106,19 +443,63 @@ class Neo4jClient:
     
     def create_constraints(self):
         """Create database constraints and indexes."""
-        constraints = [
-            # Unique constraint on Brand name
-            "CREATE CONSTRAINT brand_name_unique IF NOT EXISTS FOR (b:Brand) REQUIRE b.name IS UNIQUE",
-            # Index on category for faster lookups
-            "CREATE INDEX relationship_category IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.category)",
-        ]
-        
-        for constraint in constraints:
+        for name, constraint in SCHEMA_INDEXES:
             try:
                 self.execute_write(constraint)
-                logger.info(f"Created constraint/index: {constraint}")
+                logger.info(f"Created constraint/index: {name}")
             except Exception as e:
                 logger.warning(f"Constraint/index creation failed (may already exist): {e}")
+        
+        try:
+            self.execute_write(BACKFILL_NAME_LOWER_QUERY)
+        except Exception as e:
+            logger.warning(f"Backfilling Brand.name_lower failed: {e}")
+    
+    def missing_indexes(self) -> List[str]:
+        """
+        Find schema indexes that don't exist or aren't online yet.
+        
+        Returns:
+            Names from SCHEMA_INDEXES missing from SHOW INDEXES (or not ONLINE)
+        """
+        rows = self.execute_query("SHOW INDEXES YIELD name, state")
+        online = {row["name"] for row in rows if row.get("state") == "ONLINE"}
+        return [name for name, _ in SCHEMA_INDEXES if name not in online]
+    
+    def explain(self, query: str, parameters: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Get the execution plan of a query without running it.
+        
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+            
+        Returns:
+            Plan dict (operatorType, arguments, children), empty if none was returned
+        """
+        with self.session() as session:
+            summary = session.run(f"EXPLAIN {query}", parameters or {}).consume()
+            return summary.plan or {}
+    
+    def check_schema(self) -> Dict[str, Any]:
+        """
+        Report missing indexes and hot queries whose plans fall back to scans.
+        
+        Returns:
+            Dict with "missing_indexes" (index names) and "scans" (query name
+            to the scan operators in its EXPLAIN plan, for queries that scan)
+        """
+        report = {"missing_indexes": self.missing_indexes(), "scans": {}}
+        for name, (query, params) in _hot_queries().items():
+            scans = [op for op in plan_operators(self.explain(query, params)) if op in SCAN_OPERATORS]
+            if scans:
+                report["scans"][name] = scans
+        
+        if report["missing_indexes"]:
+            logger.warning(f"Missing Neo4j indexes: {', '.join(report['missing_indexes'])} (run scripts/init_neo4j.py)")
+        for name, scans in report["scans"].items():
+            logger.warning(f"Query '{name}' plan scans instead of using an index: {', '.join(scans)}")
+        return report
     
     def clear_database(self):
         """Clear all nodes and relationships (use with caution!)."""
@@ -133,24 +514,250 @@ class Neo4jClient:
         OPTIONAL MATCH ()-[r:RELATES_TO]->()
         RETURN count(DISTINCT b) as brand_count, count(DISTINCT r) as relationship_count
         """
-        result = self.execute_query(query)
+        result = self.execute_read(query)
         if result:
             return {
                 "brands": result[0].get("brand_count", 0),
                 "relationships": result[0].get("relationship_count", 0)
             }
         return {"brands": 0, "relationships": 0}
+    
+    def get_categories(self) -> List[str]:
+        """Get the distinct relationship categories, sorted."""
+        return [r["category"] for r in self.execute_read(CATEGORIES_QUERY) if r.get("category")]
+    
+    def upsert_brand(self, name: str, properties: Dict[str, Any]):
+        """Create or update a brand node."""
+        self.execute_write(UPSERT_BRAND_QUERY, {"name": name, "properties": properties})
+    
+    def upsert_relationships(self, rows: List[Dict[str, Any]]):
+        """Upsert relationships and their brand nodes with one UNWIND query."""
+        self.execute_write(STORE_RELATIONSHIPS_QUERY, {"rows": rows})
+    
+    def get_relationships(
+        self,
+        source: str,
+        target: str,
+        category: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Relationships from source to target matching the filters, most recent first."""
+        if category and context:
+            # Exact match with category and context
+            query = RELATIONSHIP_BY_CONTEXT_QUERY
+            params = {"source": source, "target": target, "category": category, "context": context}
+        elif category:
+            # All relationships in this category
+            query = RELATIONSHIP_BY_CATEGORY_QUERY
+            params = {"source": source, "target": target, "category": category}
+        else:
+            # Any relationship
+            query = LATEST_RELATIONSHIP_QUERY
+            params = {"source": source, "target": target}
+        return self.execute_read(query, params)
+    
+    def get_relationships_for_targets(
+        self,
+        source: str,
+        targets: List[str],
+        category: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Most recent relationship from source to each target, in one query."""
+        params = {"source": source, "targets": list(targets), "category": category}
+        results = self.execute_read(_targets_lookup_query(category), params)
+        return {row.pop("target"): row for row in results}
+    
+    def get_brand_relationships(self, brand: str, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Relationships touching a brand in either direction."""
+        return self.execute_read(_brand_relationships_query(category), {"brand": brand, "category": category})
+    
+    def get_brands_by_category(self, category: str) -> List[str]:
+        """Brands with a relationship in the category."""
+        return [r["name"] for r in self.execute_read(BRANDS_BY_CATEGORY_QUERY, {"category": category})]
+    
+    def export_relationships(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+        category: Optional[str] = None,
+        relationship_type: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        updated_after: Optional[str] = None,
+        updated_before: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of edges in (updated_at, edge id) order, resuming after cursor."""
+        filters = {
+            "category": category,
+            "relationship_type": relationship_type,
+            "min_confidence": min_confidence,
+            "updated_after": updated_after,
+            "updated_before": updated_before,
+        }
+        params = {**filters, "limit": limit}
+        if cursor:
+            params["after_ts"], params["after_id"] = decode_cursor(cursor)
+        
+        rows = self.execute_read(_export_query(bool(cursor), filters), params)
+        for row in rows:
+            row["updated_at"] = _iso(row["updated_at"])
+        
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1]["updated_at"], rows[-1]["id"])
+        for row in rows:
+            del row["id"]
+        return rows, next_cursor
+    
+    def find_brand(self, name: str) -> Optional[str]:
+        """Stored name of the brand matching name case-insensitively."""
+        results = self.execute_read(FIND_BRAND_QUERY, {"name": name})
+        return results[0]["name"] if results else None
+
+
+class AsyncNeo4jClient:
+    """Neo4j database client using the asyncio driver."""
+    
+    def __init__(self, uri: str = None, user: str = None, password: str = None):
+        """
+        Initialize async Neo4j client.
+        
+        The driver connects lazily on first use; call verify_connectivity()
+        to check the connection upfront.
+        
+        Args:
+            uri: Neo4j connection URI
+            user: Neo4j username
+            password: Neo4j password
+        """
+        self.uri = uri or settings.neo4j_uri
+        self.user = user or settings.neo4j_user
+        self.password = password or settings.neo4j_password
+        
+        self.driver = AsyncGraphDatabase.driver(
+            self.uri,
+            auth=(self.user, self.password),
+            **_driver_config()
+        )
+    
+    async def verify_connectivity(self):
+        """Verify the database is reachable."""
+        try:
+            await self.driver.verify_connectivity()
+            logger.info(f"Connected to Neo4j at {self.uri} (async)")
+        except AuthError:
+            logger.error("Neo4j authentication failed")
+            raise
+        except ServiceUnavailable:
+            logger.error(f"Neo4j service unavailable at {self.uri}")
+            raise
+    
+    async def close(self):
+        """Close the database connection."""
+        await self.driver.close()
+        logger.info("Neo4j async connection closed")
+    
+    async def execute_query(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Execute a Cypher query.
+        
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+            
+        Returns:
+            List of result records as dictionaries
+        """
+        parameters = parameters or {}
+        
+        try:
+            async with self.driver.session(**_session_config()) as session:
+                result = await session.run(query, parameters)
+                return [dict(record) async for record in result]
+        except Exception as e:
+            logger.error(f"Query execution failed: {e}")
+            logger.error(f"Query: {query}")
+            raise
+    
+    async def execute_read(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Execute a read transaction (READ access mode, retried on transient errors).
+        
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+            
+        Returns:
+            List of result records as dictionaries
+        """
+        parameters = parameters or {}
+        
+        async def _tx_function(tx):
+            result = await tx.run(query, parameters)
+            return [dict(record) async for record in result]
+        
+        try:
+            async with self.driver.session(**_session_config(default_access_mode=READ_ACCESS)) as session:
+                return await session.execute_read(_tx_function)
+        except Exception as e:
+            logger.error(f"Read transaction failed: {e}")
+            logger.error(f"Query: {query}")
+            raise
+    
+    async def execute_write(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Execute a write transaction.
+        
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+            
+        Returns:
+            List of result records as dictionaries
+        """
+        parameters = parameters or {}
+        
+        async def _tx_function(tx):
+            result = await tx.run(query, parameters)
+            return [dict(record) async for record in result]
+        
+        try:
+            async with self.driver.session(**_session_config()) as session:
+                return await session.execute_write(_tx_function)
+        except Exception as e:
+            logger.error(f"Write transaction failed: {e}")
+            logger.error(f"Query: {query}")
+            raise
+    
+    async def upsert_relationships(self, rows: List[Dict[str, Any]]):
+        """Upsert relationships and their brand nodes with one UNWIND query."""
+        await self.execute_write(STORE_RELATIONSHIPS_QUERY, {"rows": rows})
+    
+    async def get_relationships_for_targets(
+        self,
+        source: str,
+        targets: List[str],
+        category: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Most recent relationship from source to each target, in one query."""
+        params = {"source": source, "targets": list(targets), "category": category}
+        results = await self.execute_read(_targets_lookup_query(category), params)
+        return {row.pop("target"): row for row in results}
 
 
 # Singleton instance
-_neo4j_client: Optional[Neo4jClient] = None
+_neo4j_client: Optional[GraphBackend] = None
+_async_neo4j_client: Optional[AsyncNeo4jClient] = None
 
 
-def get_neo4j_client() -> Neo4jClient:
-    """Get or create Neo4j client singleton."""
+def get_neo4j_client() -> GraphBackend:
+    """Get or create the graph backend singleton (Neo4j or embedded, per settings)."""
     global _neo4j_client
     if _neo4j_client is None:
-        _neo4j_client = Neo4jClient()
+        if settings.graph_backend == "embedded":
+            from .embedded_graph import EmbeddedGraph
+            _neo4j_client = EmbeddedGraph(settings.embedded_graph_path)
+        else:
+            _neo4j_client = Neo4jClient()
     return _neo4j_client
 
 
@@ -161,3 +768,24 @@ def close_neo4j_client():
         _neo4j_client.close()
         _neo4j_client = None
 
+
+
+def get_async_neo4j_client() -> AsyncNeo4jClient:
+    """Get or create async Neo4j client singleton."""
+    global _async_neo4j_client
+    if _async_neo4j_client is None:
+        if settings.graph_backend == "embedded":
+            # Same in-process graph as the sync backend
+            from .embedded_graph import AsyncEmbeddedGraph
+            _async_neo4j_client = AsyncEmbeddedGraph(get_neo4j_client())
+        else:
+            _async_neo4j_client = AsyncNeo4jClient()
+    return _async_neo4j_client
+
+
+async def close_async_neo4j_client():
+    """Close the async Neo4j client singleton."""
+    global _async_neo4j_client
+    if _async_neo4j_client:
+        await _async_neo4j_client.close()
+        _async_neo4j_client = None
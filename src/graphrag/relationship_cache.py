@@ -0,0 +1,148 @@
+"""
+Read-through cache of graph relationship lookups.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# (source, target, category, relationship_context); None means "any"
+CacheKey = Tuple[str, str, Optional[str], Optional[str]]
+
+# Returned by get on a miss, so a cached "no relationship" (None) is distinguishable
+MISSING = object()
+
+
+class RelationshipCache:
+    """
+    Thread-safe, in-process LRU/TTL cache of relationship lookups.
+
+    Values are relationship data dicts, or None for pairs with no
+    relationship (negative entries expire sooner). Cached dicts are shared
+    between callers, so treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl_seconds: float = 300,
+        negative_ttl_seconds: float = 60
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Max lookups kept; least recently used are evicted (0 = unbounded)
+            ttl_seconds: Seconds a found relationship is served (0 = until invalidated)
+            negative_ttl_seconds: Seconds a "no relationship" result is served (0 = until invalidated)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Any:
+        """
+        Look up a relationship.
+
+        Args:
+            key: (source, target, category, relationship_context)
+
+        Returns:
+            Relationship data, None for a cached absence, or MISSING
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: CacheKey, relationship: Optional[Dict[str, Any]]):
+        """
+        Remember a lookup result.
+
+        Args:
+            key: (source, target, category, relationship_context)
+            relationship: Relationship data, or None if there is none
+        """
+        ttl = self.ttl_seconds if relationship is not None else self.negative_ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl else 0
+        with self._lock:
+            self._entries[key] = (expires_at, relationship)
+            self._entries.move_to_end(key)
+            if self.max_entries:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def invalidate(self, source: str, target: str, category: str, relationship_context: str):
+        """
+        Drop every cached lookup a write to this edge could change.
+
+        Args:
+            source: Source brand
+            target: Target brand
+            category: Edge category
+            relationship_context: Edge context
+        """
+        with self._lock:
+            for key in (
+                (source, target, category, relationship_context),
+                (source, target, category, None),
+                (source, target, None, None),
+            ):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries)
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# Singleton instance
+_relationship_cache: Optional[RelationshipCache] = None
+_relationship_cache_lock = threading.Lock()
+
+
+def get_relationship_cache() -> Optional[RelationshipCache]:
+    """Get or create the graph relationship cache singleton (None when disabled)."""
+    global _relationship_cache
+    if not settings.graph_cache_enabled:
+        return None
+    with _relationship_cache_lock:
+        if _relationship_cache is None:
+            _relationship_cache = RelationshipCache(
+                max_entries=settings.graph_cache_max_entries,
+                ttl_seconds=settings.graph_cache_ttl_seconds,
+                negative_ttl_seconds=settings.graph_cache_negative_ttl_seconds
+            )
+    return _relationship_cache
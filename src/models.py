@@ -103,6 +103,7 @@ class CategoryOutput(BaseModel):
 class RelationshipOutput(BaseModel):
     """Output from relationship classification agent."""
     relationships: List[Relationship] = Field(default_factory=list, description="Classified relationships")
+    new_relationships: List[Relationship] = Field(default_factory=list, description="Newly classified relationships not yet stored in the graph")
 
 
 class WebSearchResult(BaseModel):
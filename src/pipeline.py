@@ -11,7 +11,9 @@ from .agents.citation_extractor import CitationExtractorAgent
 from .agents.category_agent import CategoryAgent
 from .agents.relationship_agent import RelationshipAgent
 from .models import AnalysisResult, FlaggedItem
-from .graphrag.graph_operations import GraphOperations
+from .graphrag.graph_operations import GraphOperations, AsyncGraphOperations
+from .graphrag.neo4j_client import close_async_neo4j_client
+from .agents.base_agent import create_async_llm_client
 from .config import settings
 from .utils import setup_logging, clean_text
 
@@ -19,96 +21,32 @@ from .utils import setup_logging, clean_text
 logger = logging.getLogger(__name__)
 
 
-class BrandAnalysisPipeline:
-    """Main pipeline for brand and citation analysis."""
+class _BasePipeline:
+    """Result compilation shared by the sync and async pipelines."""
     
-    def __init__(
+    def _compile_result(
         self,
         subject_brand: str,
-        log_level: str = None
-    ):
-        """
-        Initialize the pipeline.
-        
-        Args:
-            subject_brand: The main brand being analyzed
-            log_level: Logging level (default from settings)
-        """
-        self.subject_brand = subject_brand
-        
-        # Setup logging
-        log_level = log_level or settings.log_level
-        setup_logging(log_level)
-        
-        # Initialize agents
-        self.brand_extractor = BrandExtractorAgent()
-        self.citation_extractor = CitationExtractorAgent()
-        self.category_agent = CategoryAgent()
-        self.relationship_agent = None  # Initialized with subject_brand later
-        
-        # Initialize graph operations
-        self.graph_ops = GraphOperations()
-        
-        logger.info(f"Pipeline initialized for subject brand: {subject_brand}")
-    
-    def analyze(self, text: str) -> AnalysisResult:
+        brand_output,
+        citation_output,
+        category_output,
+        relationship_output
+    ) -> AnalysisResult:
         """
-        Analyze text to extract brands, citations, and relationships.
+        Flag low-confidence items and assemble the final result.
         
         Args:
-            text: Input text to analyze
+            subject_brand: Subject brand of the document
+            brand_output: Brand extraction output
+            citation_output: Citation extraction output
+            category_output: Category output
+            relationship_output: Relationship output
             
         Returns:
-            AnalysisResult with complete analysis
+            AnalysisResult
         """
-        logger.info("=" * 80)
-        logger.info("Starting brand analysis pipeline")
-        logger.info("=" * 80)
-        
-        cleaned_text = clean_text(text)
-        
-        # Step 1: Extract brands and category first (parallel)
-        logger.info("\n[Step 1] Running brand and category extraction...")
-        
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            brand_future = executor.submit(self.brand_extractor.run, cleaned_text)
-            category_future = executor.submit(
-                self.category_agent.run,
-                cleaned_text,
-                self.subject_brand
-            )
-            
-            brand_output = brand_future.result()
-            category_output = category_future.result()
-        
-        logger.info(f"✓ Extracted {len(brand_output.brands)} brands")
-        logger.info(f"✓ Identified category: {category_output.primary_category}")
-        
-        # Step 1b: Extract citations with brand context for better URL association
-        logger.info("\n[Step 1b] Extracting citations with brand context...")
-        brand_names = [b.name for b in brand_output.brands]
-        citation_output = self.citation_extractor.run(cleaned_text, extracted_brands=brand_names)
-        
-        logger.info(f"✓ Extracted {len(citation_output.citations)} citations")
-        
-        # Step 2: Initialize relationship agent with subject brand
-        logger.info(f"\n[Step 2] Initializing relationship agent...")
-        self.relationship_agent = RelationshipAgent(subject_brand=self.subject_brand)
-        
-        # Step 3: Classify relationships (uses GraphRAG + web search)
-        logger.info(f"\n[Step 3] Classifying brand relationships...")
-        logger.info("(Checking GraphRAG and performing web search for missing data)")
-        
-        relationship_output = self.relationship_agent.run(
-            brands=brand_output.brands,
-            category=category_output.primary_category,
-            text_context=cleaned_text
-        )
-        
-        logger.info(f"✓ Classified {len(relationship_output.relationships)} relationships")
-        
-        # Step 4: Flag low-confidence items
-        logger.info(f"\n[Step 4] Flagging low-confidence items...")
+        # Step 3: Flag low-confidence items
+        logger.info(f"\n[Step 3] Flagging low-confidence items...")
         flagged_items = self._identify_flagged_items(
             brand_output=brand_output,
             citation_output=citation_output,
@@ -118,9 +56,9 @@ class BrandAnalysisPipeline:
         
         logger.info(f"✓ Flagged {len(flagged_items)} items for review")
         
-        # Step 5: Compile results
+        # Step 4: Compile results
         result = AnalysisResult(
-            subject_brand=self.subject_brand,
+            subject_brand=subject_brand,
             category=category_output.primary_category,
             brands=brand_output.brands,
             relationships=relationship_output.relationships,
@@ -206,6 +144,130 @@ class BrandAnalysisPipeline:
                 ))
         
         return flagged
+
+
+class BrandAnalysisPipeline(_BasePipeline):
+    """Main pipeline for brand and citation analysis."""
+    
+    def __init__(
+        self,
+        subject_brand: Optional[str] = None,
+        log_level: str = None,
+        configure_logging: bool = True
+    ):
+        """
+        Initialize the pipeline.
+        
+        Agents and clients are built once here, and analyze() keeps no
+        per-document state, so one instance can serve many documents and
+        subject brands concurrently.
+        
+        Args:
+            subject_brand: Default subject brand (can be overridden per analyze call)
+            log_level: Logging level (default from settings)
+            configure_logging: Set False when the host application already configured logging
+        """
+        self.subject_brand = subject_brand
+        
+        # Setup logging
+        if configure_logging:
+            log_level = log_level or settings.log_level
+            setup_logging(log_level)
+        
+        # Initialize agents (sharing one LLM client)
+        self.brand_extractor = BrandExtractorAgent()
+        llm_client = self.brand_extractor.client
+        self.citation_extractor = CitationExtractorAgent(client=llm_client)
+        self.category_agent = CategoryAgent(client=llm_client)
+        
+        # Initialize graph operations
+        self.graph_ops = GraphOperations()
+        
+        self.relationship_agent = RelationshipAgent(
+            subject_brand=subject_brand,
+            client=llm_client,
+            graph_ops=self.graph_ops
+        )
+        
+        if subject_brand:
+            logger.info(f"Pipeline initialized for subject brand: {subject_brand}")
+        else:
+            logger.info("Pipeline initialized")
+    
+    def analyze(self, text: str, subject_brand: Optional[str] = None) -> AnalysisResult:
+        """
+        Analyze text to extract brands, citations, and relationships.
+        
+        Args:
+            text: Input text to analyze
+            subject_brand: Subject brand for this document (default: the pipeline's)
+            
+        Returns:
+            AnalysisResult with complete analysis
+        """
+        subject_brand = subject_brand or self.subject_brand
+        if not subject_brand:
+            raise ValueError("subject_brand is required")
+        
+        logger.info("=" * 80)
+        logger.info("Starting brand analysis pipeline")
+        logger.info("=" * 80)
+        
+        cleaned_text = clean_text(text)
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # Step 1: Extract brands and category first (parallel)
+            logger.info("\n[Step 1] Running brand and category extraction...")
+            
+            brand_future = executor.submit(self.brand_extractor.run, cleaned_text)
+            category_future = executor.submit(
+                self.category_agent.run,
+                cleaned_text,
+                subject_brand
+            )
+            
+            # Citations don't need the brands for the LLM call, so start them
+            # now and attribute URLs to brands once both are done
+            citation_future = executor.submit(self.citation_extractor.run, cleaned_text)
+            
+            brand_output = brand_future.result()
+            category_output = category_future.result()
+            
+            logger.info(f"✓ Extracted {len(brand_output.brands)} brands")
+            logger.info(f"✓ Identified category: {category_output.primary_category}")
+            
+            brand_names = [b.name for b in brand_output.brands]
+            
+            # Step 2: Classify relationships (uses GraphRAG + web search)
+            logger.info(f"\n[Step 2] Classifying brand relationships...")
+            logger.info("(Checking GraphRAG and performing web search for missing data)")
+            
+            relationship_output = self.relationship_agent.run(
+                brands=brand_output.brands,
+                category=category_output.primary_category,
+                text_context=cleaned_text,
+                subject_brand=subject_brand
+            )
+            
+            logger.info(f"✓ Classified {len(relationship_output.relationships)} relationships")
+            
+            citation_output = self.citation_extractor.enrich_with_brands(
+                citation_future.result(),
+                brand_names
+            )
+            logger.info(f"✓ Extracted {len(citation_output.citations)} citations")
+        
+        # Store newly classified relationships for future use (one write per document)
+        self.graph_ops.store_relationships(relationship_output.new_relationships)
+        
+        # Steps 3-4: Flag low-confidence items and compile results
+        return self._compile_result(
+            subject_brand=subject_brand,
+            brand_output=brand_output,
+            citation_output=citation_output,
+            category_output=category_output,
+            relationship_output=relationship_output
+        )
     
     def get_graph_stats(self) -> dict:
         """Get GraphRAG statistics."""
@@ -223,3 +285,117 @@ class BrandAnalysisPipeline:
         """
         return self.graph_ops.get_graph_data(category)
 
+
+
+
+class AsyncBrandAnalysisPipeline(_BasePipeline):
+    """asyncio pipeline: every independent stage overlaps on one event loop."""
+    
+    def __init__(
+        self,
+        subject_brand: Optional[str] = None,
+        log_level: str = None,
+        configure_logging: bool = True
+    ):
+        """
+        Initialize the async pipeline.
+        
+        Agents share one AsyncOpenAI/AsyncAnthropic client and the async
+        Neo4j driver, so a single instance can serve many concurrent
+        documents from one process.
+        
+        Args:
+            subject_brand: Default subject brand (can be overridden per analyze call)
+            log_level: Logging level (default from settings)
+            configure_logging: Set False when the host application already configured logging
+        """
+        self.subject_brand = subject_brand
+        
+        if configure_logging:
+            setup_logging(log_level or settings.log_level)
+        
+        # Initialize agents (sharing one sync and one async LLM client)
+        async_client = create_async_llm_client(settings.llm_provider)
+        self.brand_extractor = BrandExtractorAgent(async_client=async_client)
+        llm_client = self.brand_extractor.client
+        self.citation_extractor = CitationExtractorAgent(client=llm_client, async_client=async_client)
+        self.category_agent = CategoryAgent(client=llm_client, async_client=async_client)
+        
+        self.graph_ops = AsyncGraphOperations()
+        
+        self.relationship_agent = RelationshipAgent(
+            subject_brand=subject_brand,
+            client=llm_client,
+            async_client=async_client,
+            async_graph_ops=self.graph_ops
+        )
+        
+        logger.info("Async pipeline initialized")
+    
+    async def analyze(self, text: str, subject_brand: Optional[str] = None) -> AnalysisResult:
+        """
+        Analyze text to extract brands, citations, and relationships.
+        
+        Args:
+            text: Input text to analyze
+            subject_brand: Subject brand for this document (default: the pipeline's)
+            
+        Returns:
+            AnalysisResult with complete analysis
+        """
+        subject_brand = subject_brand or self.subject_brand
+        if not subject_brand:
+            raise ValueError("subject_brand is required")
+        
+        logger.info(f"Starting async brand analysis pipeline for {subject_brand}")
+        
+        cleaned_text = clean_text(text)
+        
+        # Step 1: Brand and category extraction are independent; citations
+        # only need the brands for post-processing, so they can start too
+        citation_task = asyncio.create_task(self.citation_extractor.arun(cleaned_text))
+        
+        try:
+            brand_output, category_output = await asyncio.gather(
+                self.brand_extractor.arun(cleaned_text),
+                self.category_agent.arun(cleaned_text, subject_brand)
+            )
+            
+            logger.info(f"✓ Extracted {len(brand_output.brands)} brands")
+            logger.info(f"✓ Identified category: {category_output.primary_category}")
+            
+            # Step 2: Relationships run while citation extraction finishes
+            brand_names = [b.name for b in brand_output.brands]
+            relationship_output, citation_output = await asyncio.gather(
+                self.relationship_agent.arun(
+                    brands=brand_output.brands,
+                    category=category_output.primary_category,
+                    text_context=cleaned_text,
+                    subject_brand=subject_brand
+                ),
+                citation_task
+            )
+        finally:
+            # A failed stage must not leave citation extraction running unobserved
+            if not citation_task.done():
+                citation_task.cancel()
+        citation_output = self.citation_extractor.enrich_with_brands(citation_output, brand_names)
+        
+        logger.info(f"✓ Extracted {len(citation_output.citations)} citations")
+        logger.info(f"✓ Classified {len(relationship_output.relationships)} relationships")
+        
+        # Store newly classified relationships for future use (one write per document)
+        await self.graph_ops.store_relationships(relationship_output.new_relationships)
+        
+        return self._compile_result(
+            subject_brand=subject_brand,
+            brand_output=brand_output,
+            citation_output=citation_output,
+            category_output=category_output,
+            relationship_output=relationship_output
+        )
+    
+    async def aclose(self):
+        """Close the async Neo4j driver and search connections."""
+        self.relationship_agent.web_search.close()
+        await close_async_neo4j_client()
@@ -0,0 +1,324 @@
+"""
+Client-side rate limiting and retries for LLM and web search providers.
+"""
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import openai
+import anthropic
+import requests
+
+from .config import settings
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: throttling, timeouts and transient server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def _optional_errors() -> Tuple[type, ...]:
+    """Retryable exception types from optional search SDKs."""
+    errors = []
+    try:
+        from tavily.errors import UsageLimitExceededError, TimeoutError as TavilyTimeoutError
+        errors.extend([UsageLimitExceededError, TavilyTimeoutError])
+    except ImportError:
+        pass
+    try:
+        from duckduckgo_search.exceptions import RatelimitException, TimeoutException
+        errors.extend([RatelimitException, TimeoutException])
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+RETRYABLE_ERRORS: Tuple[type, ...] = (
+    openai.APIConnectionError,
+    anthropic.APIConnectionError,
+    requests.ConnectionError,
+    requests.Timeout,
+    TimeoutError,
+    ConnectionError,
+) + _optional_errors()
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0):
+        """
+        Initialize bucket.
+
+        Args:
+            per_minute: Sustained refill rate (units per minute)
+            burst_seconds: Bucket capacity, in seconds of refill
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """
+        Take tokens, going into debt if necessary.
+
+        Args:
+            amount: Units to take
+
+        Returns:
+            Seconds the caller must wait before using the reservation
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def drain(self, seconds: float):
+        """Push the bucket into debt so every caller waits at least `seconds`."""
+        with self._lock:
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one provider/model."""
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        """
+        Initialize limiter.
+
+        Args:
+            requests_per_minute: Max requests per minute (0 = unlimited)
+            tokens_per_minute: Max tokens per minute (0 = unlimited)
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+    def _reserve(self, tokens: float) -> float:
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        return delay
+
+    def acquire(self, tokens: float = 0):
+        """
+        Block until a request of `tokens` tokens may be sent.
+
+        Args:
+            tokens: Estimated tokens the request consumes
+        """
+        delay = self._reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Rate limiter waiting {delay:.2f}s")
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: float = 0):
+        """Async variant of acquire that sleeps without blocking the event loop."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Rate limiter waiting {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> bool:
+        """
+        Hold back all callers after the provider asked us to slow down.
+
+        Args:
+            seconds: How long to hold requests back
+
+        Returns:
+            True if the pause applies (the next acquire will wait it out)
+        """
+        if self.requests is None:
+            return False
+        self.requests.drain(seconds)
+        return True
+
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    """Rough token count (~4 characters per token) for tokens-per-minute budgeting."""
+    return sum(len(text) for text in texts if text) // 4 + 1
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an error is a throttling or transient failure worth retrying."""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status in RETRYABLE_STATUS_CODES
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read the server's requested delay from an error's HTTP response.
+
+    Args:
+        error: Exception raised by a provider SDK
+
+    Returns:
+        Seconds to wait, or None if the response carried no Retry-After
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _backoff_delay(error: Exception, attempt: int) -> float:
+    """Delay before the next attempt: Retry-After if given, else jittered exponential backoff."""
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        return min(retry_after, settings.rate_limit_max_backoff_seconds)
+    delay = settings.rate_limit_backoff_seconds * (2 ** attempt)
+    return min(delay, settings.rate_limit_max_backoff_seconds) * random.uniform(0.5, 1.0)
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    limiter: Optional[RateLimiter] = None,
+    tokens: float = 0,
+    max_retries: Optional[int] = None
+) -> T:
+    """
+    Call `fn` under a rate limiter, retrying throttled and transient failures.
+
+    Args:
+        fn: Zero-argument function performing one provider request
+        limiter: Rate limiter to acquire before each attempt
+        tokens: Estimated tokens per attempt
+        max_retries: Retries after the first attempt (default: settings)
+
+    Returns:
+        Result of fn
+    """
+    max_retries = settings.rate_limit_max_retries if max_retries is None else max_retries
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire(tokens)
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = _backoff_delay(e, attempt)
+            logger.warning(f"Retrying in {delay:.1f}s after {type(e).__name__}: {e}")
+            # A paused limiter makes every caller (including this one) wait
+            if limiter is None or not limiter.pause(delay):
+                time.sleep(delay)
+            attempt += 1
+
+
+async def acall_with_retry(
+    fn: Callable[[], Awaitable[T]],
+    limiter: Optional[RateLimiter] = None,
+    tokens: float = 0,
+    max_retries: Optional[int] = None
+) -> T:
+    """
+    Async variant of call_with_retry.
+
+    Args:
+        fn: Zero-argument function returning an awaitable provider request
+        limiter: Rate limiter to acquire before each attempt
+        tokens: Estimated tokens per attempt
+        max_retries: Retries after the first attempt (default: settings)
+
+    Returns:
+        Result of the awaited request
+    """
+    max_retries = settings.rate_limit_max_retries if max_retries is None else max_retries
+    attempt = 0
+    while True:
+        if limiter is not None:
+            await limiter.aacquire(tokens)
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = _backoff_delay(e, attempt)
+            logger.warning(f"Retrying in {delay:.1f}s after {type(e).__name__}: {e}")
+            # A paused limiter makes every caller (including this one) wait
+            if limiter is None or not limiter.pause(delay):
+                await asyncio.sleep(delay)
+            attempt += 1
+
+
+# Shared limiters, one per provider/model
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str, requests_per_minute: float = 0, tokens_per_minute: float = 0) -> RateLimiter:
+    """
+    Get or create the shared rate limiter for a provider/model.
+
+    Limits are fixed by the first caller for a key.
+
+    Args:
+        key: Limiter name, e.g. "llm:openai:gpt-4o" or "search:tavily"
+        requests_per_minute: Max requests per minute (0 = unlimited)
+        tokens_per_minute: Max tokens per minute (0 = unlimited)
+
+    Returns:
+        RateLimiter instance
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+            _limiters[key] = limiter
+        return limiter
+
+
+def get_llm_rate_limiter(provider: str, model: str) -> RateLimiter:
+    """Shared limiter for an LLM provider/model, sized from settings."""
+    return get_rate_limiter(
+        f"llm:{provider}:{model}",
+        requests_per_minute=settings.llm_requests_per_minute,
+        tokens_per_minute=settings.llm_tokens_per_minute
+    )
+
+
+def get_search_rate_limiter(provider: str) -> RateLimiter:
+    """Shared limiter for a web search provider, sized from settings."""
+    return get_rate_limiter(
+        f"search:{provider}",
+        requests_per_minute=settings.search_requests_per_minute
+    )
@@ -0,0 +1,128 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    """One in-flight call that followers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class _AsyncCall:
+    """One in-flight asyncio call, run as its own task, and the callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Share one execution of a call among concurrent callers with the same key.
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving while it is in flight wait for and receive the leader's result
+    or exception. Nothing is remembered once the call finishes, so this
+    complements rather than replaces a cache.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[Tuple[int, str], _AsyncCall] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """
+        Run fn, or wait for an identical call already in flight.
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument function to run as leader
+
+        Returns:
+            Result of fn (possibly from another thread's call)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            logger.debug(f"Coalesced with in-flight call {key[:12]}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Async variant of do for callers on the same event loop.
+
+        The call runs in its own task, so cancelling any one caller (the
+        first included) doesn't cancel it for the others; it is cancelled
+        only once every caller waiting on it has been.
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument function returning the awaitable to run as leader
+
+        Returns:
+            Result of the awaited call (possibly from another task's call)
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+
+        call = self._async_calls.get(flight_key)
+        if call is None:
+            call = _AsyncCall(loop.create_task(fn()))
+            self._async_calls[flight_key] = call
+            call.task.add_done_callback(lambda _: self._forget(flight_key, call))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced with in-flight call {key[:12]}")
+
+        call.waiters += 1
+        try:
+            # Shield so a cancelled caller doesn't cancel the shared call
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up; later ones start a fresh call
+                self._forget(flight_key, call)
+                call.task.cancel()
+
+    def _forget(self, flight_key: Tuple[int, str], call: _AsyncCall):
+        """Stop coalescing onto call, unless a newer call already replaced it."""
+        if self._async_calls.get(flight_key) is call:
+            del self._async_calls[flight_key]
@@ -181,9 +181,23 @@ def extract_domain_from_url(url: str) -> str:
         return ""
 
 
+# Second-level labels of country-code domains (bbc.co.uk, abc.net.au)
+_SECOND_LEVEL_LABELS = {"co", "com", "net", "org", "gov", "ac", "edu", "ne", "or"}
+
+
+def _compact(name: str) -> str:
+    """Lowercase name without spaces or punctuation."""
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
 def match_url_to_brand(url: str, brands: List[str]) -> str:
     """
-    Match a URL to a brand name.
+    Match a URL to a brand name by its registered domain.
+    
+    A brand matches when its name equals the registered domain's name label
+    (tesla for shop.tesla.com, general-motors for general-motors.com) or the
+    whole registered domain (Booking.com), ignoring case, spaces and
+    punctuation. Partial names never match: theverge.com is not GE.
     
     Args:
         url: URL to match
@@ -192,12 +206,17 @@ def match_url_to_brand(url: str, brands: List[str]) -> str:
     Returns:
         Matching brand name or empty string
     """
-    domain = extract_domain_from_url(url).lower()
+    labels = extract_domain_from_url(url).lower().split(':')[0].split('.')
+    if len(labels) < 2:
+        return ""
+    
+    registered = labels[-2:]
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS:
+        registered = labels[-3:]
+    keys = {_compact(registered[0]), _compact(''.join(registered))}
     
     for brand in brands:
-        brand_lower = brand.lower().replace(' ', '')
-        # Check if brand name appears in domain
-        if brand_lower in domain or domain in brand_lower:
+        if _compact(brand) in keys:
             return brand
     
     return ""
@@ -0,0 +1,233 @@
+"""
+Local full-text search index - offline search backend over an archived news corpus.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from ..models import WebSearchResult
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Query words that add nothing to ranking
+STOPWORDS = {"and", "or", "not", "the", "a", "an", "of", "in", "on", "for", "to", "with"}
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote text as an FTS5 phrase (so operators and punctuation are literal)."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Translate a web-style query into an FTS5 MATCH expression.
+
+    Quoted phrases (the brand names in `"brand1" "brand2" relationship
+    category`) are required. Bare keywords are optional: they sit in an OR
+    group that the first phrase always satisfies, so they only boost bm25
+    rank for documents that contain them.
+
+    Args:
+        query: Search query
+
+    Returns:
+        FTS5 expression, or None if the query has no searchable terms
+    """
+    phrases = [p.strip() for p in re.findall(r'"([^"]+)"', query) if p.strip()]
+    remainder = re.sub(r'"[^"]*"', " ", query)
+    keywords = [
+        word for word in re.findall(r"\w+", remainder.lower())
+        if word not in STOPWORDS
+    ]
+
+    if not phrases:
+        if not keywords:
+            return None
+        return " OR ".join(_fts_phrase(word) for word in keywords)
+
+    required = " AND ".join(_fts_phrase(phrase) for phrase in phrases)
+    if not keywords:
+        return required
+    boost = " OR ".join(_fts_phrase(term) for term in [phrases[0]] + keywords)
+    return f"({required}) AND ({boost})"
+
+
+class LocalSearchIndex:
+    """SQLite FTS5 index of archived documents, ranked with bm25."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a local search index.
+
+        Args:
+            path: Database file path (":memory:" for a throwaway index)
+        """
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+
+        # A single connection shared across threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT UNIQUE,
+                    title TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    source TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                    title, body, content='documents', content_rowid='id'
+                )
+                """
+            )
+            self._conn.commit()
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """
+        Index documents, skipping URLs that are already indexed.
+
+        Args:
+            documents: Dicts with url, title and text (or content/body), optionally source
+            batch_size: Documents per transaction
+
+        Returns:
+            Number of newly indexed documents
+        """
+        added = 0
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                added += self._add_batch(batch)
+                batch = []
+        if batch:
+            added += self._add_batch(batch)
+        return added
+
+    def _add_batch(self, documents: List[Dict[str, Any]]) -> int:
+        added = 0
+        with self._lock:
+            for document in documents:
+                url = document.get("url") or None
+                title = document.get("title", "")
+                body = document.get("text") or document.get("content") or document.get("body") or ""
+                source = document.get("source") or self._domain(url)
+
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO documents (url, title, body, source) VALUES (?, ?, ?, ?)",
+                    (url, title, body, source)
+                )
+                if cursor.rowcount:
+                    self._conn.execute(
+                        "INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, title, body)
+                    )
+                    added += 1
+            self._conn.commit()
+        return added
+
+    def index_jsonl(self, path: str, batch_size: int = 1000) -> int:
+        """
+        Bulk index a JSONL file of documents.
+
+        Args:
+            path: JSONL file with one {url, title, text, source} object per line
+            batch_size: Documents per transaction
+
+        Returns:
+            Number of newly indexed documents
+        """
+        def read_documents():
+            with open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+        added = self.add_documents(read_documents(), batch_size=batch_size)
+        logger.info(f"Indexed {added} new documents from {path}")
+        return added
+
+    def search(self, query: str, max_results: int = 5) -> List[WebSearchResult]:
+        """
+        Ranked full-text search.
+
+        Args:
+            query: Search query (web-style, see build_match_query)
+            max_results: Maximum number of results
+
+        Returns:
+            List of search results, best match first
+        """
+        match = build_match_query(query)
+        if match is None:
+            return []
+
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT d.title, snippet(documents_fts, 1, '', '', '…', 48), d.url, d.source
+                FROM documents_fts
+                JOIN documents d ON d.id = documents_fts.rowid
+                WHERE documents_fts MATCH ?
+                ORDER BY bm25(documents_fts, 2.0, 1.0)
+                LIMIT ?
+                """,
+                (match, max_results)
+            ).fetchall()
+
+        return [
+            WebSearchResult(title=title, snippet=snippet, url=url or "", source=source)
+            for title, snippet, url, source in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _domain(url: Optional[str]) -> str:
+        if not url:
+            return "local"
+        domain = urlparse(url).netloc
+        return domain[4:] if domain.startswith("www.") else domain or "local"
+
+
+# Singleton instance
+_local_index: Optional[LocalSearchIndex] = None
+_local_index_lock = threading.Lock()
+
+
+def get_local_search_index() -> Optional[LocalSearchIndex]:
+    """Get or open the configured local search index (None when not configured)."""
+    global _local_index
+    if not settings.local_search_index_path:
+        return None
+    with _local_index_lock:
+        if _local_index is None:
+            _local_index = LocalSearchIndex(settings.local_search_index_path)
+            logger.info(f"Local search index opened at {settings.local_search_index_path}")
+    return _local_index
@@ -1,11 +1,20 @@
 """
 Web Search Agent - Searches the web for brand relationship information.
 """
+import asyncio
 import logging
-from typing import List, Optional
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+from typing import Callable, Iterator, List, Optional, Tuple
 import time
 import json
 
+import requests
+from requests.adapters import HTTPAdapter
+
 try:
     from tavily import TavilyClient
     TAVILY_AVAILABLE = True
@@ -22,22 +31,107 @@ except ImportError:
 
 from ..models import WebSearchResult
 from ..config import settings
+from ..cache import ResponseCache, get_search_cache, make_cache_key
+from ..rate_limit import call_with_retry, get_search_rate_limiter
+from ..single_flight import SingleFlight
+from .local_index import LocalSearchIndex, get_local_search_index
 
 
 logger = logging.getLogger(__name__)
 
+# Identical queries issued concurrently share one provider call
+_search_flights = SingleFlight()
+
 
 class WebSearchAgent:
     """Agent for searching the web for brand relationships."""
     
-    def __init__(self, max_results: int = None):
+    def __init__(
+        self,
+        max_results: int = None,
+        cache: Optional[ResponseCache] = None,
+        use_cache: bool = True,
+        local_index: Optional[LocalSearchIndex] = None
+    ):
         """
         Initialize web search agent.
         
         Args:
             max_results: Maximum number of search results
+            cache: Search result cache (default: shared cache from settings, if enabled)
+            use_cache: Set False to always hit the search providers
+            local_index: Offline full-text index (default: LOCAL_SEARCH_INDEX_PATH, if set)
         """
         self.max_results = max_results or settings.max_web_search_results
+        if not use_cache:
+            self.cache = None
+        else:
+            self.cache = cache if cache is not None else get_search_cache()
+        self.local_index = local_index if local_index is not None else get_local_search_index()
+        
+        # Provider clients are created on first use and reused for every query
+        self._client_lock = threading.Lock()
+        self._http_session: Optional[requests.Session] = None
+        self._tavily_client = None
+        # Idle DuckDuckGo clients, reused by whichever thread searches next
+        self._ddgs_pool: "queue.Queue[DDGS]" = queue.Queue()
+        self._search_executor: Optional[ThreadPoolExecutor] = None
+        self._async_executor: Optional[ThreadPoolExecutor] = None
+    
+    @property
+    def tavily_client(self):
+        """Shared Tavily client over a pooled keep-alive HTTP session."""
+        if self._tavily_client is None:
+            with self._client_lock:
+                if self._tavily_client is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=settings.search_http_pool_size
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._http_session = session
+                    self._tavily_client = TavilyClient(
+                        api_key=settings.tavily_api_key,
+                        session=session
+                    )
+        return self._tavily_client
+    
+    @contextmanager
+    def ddgs_client(self) -> Iterator["DDGS"]:
+        """
+        Borrow a long-lived DuckDuckGo client from the pool.
+        
+        DDGS keeps per-request state on the instance, so a client serves one
+        search at a time. Pooling (rather than one client per thread) keeps
+        clients and their keep-alive connections across the short-lived
+        worker threads of successive documents; the pool grows only to the
+        peak number of concurrent searches.
+        """
+        try:
+            client = self._ddgs_pool.get_nowait()
+        except queue.Empty:
+            client = DDGS()
+        try:
+            yield client
+        finally:
+            self._ddgs_pool.put(client)
+    
+    def close(self):
+        """Close provider HTTP connections."""
+        with self._client_lock:
+            if self._http_session is not None:
+                self._http_session.close()
+            self._http_session = None
+            self._tavily_client = None
+            # DDGS has no close(); dropping the clients releases their connections
+            self._ddgs_pool = queue.Queue()
+            for executor in (self._search_executor, self._async_executor):
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            self._search_executor = None
+            self._async_executor = None
     
     def search_brand_relationship(
         self,
@@ -66,6 +160,34 @@ class WebSearchAgent:
         
         return self._perform_search(query)
     
+    async def asearch_brand_relationship(
+        self,
+        brand1: str,
+        brand2: str,
+        category: Optional[str] = None
+    ) -> List[WebSearchResult]:
+        """
+        Async variant of search_brand_relationship.
+        
+        The provider SDKs are synchronous, so the search runs in a worker
+        thread and the event loop stays free while it is in flight. The
+        threads are the agent's own (settings.search_async_max_workers),
+        not the loop's default executor, which holds only min(32, cpus + 4).
+        
+        Args:
+            brand1: First brand name
+            brand2: Second brand name
+            category: Optional category context
+            
+        Returns:
+            List of search results
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_async_executor(),
+            partial(self.search_brand_relationship, brand1, brand2, category)
+        )
+    
     def search_brand_info(self, brand: str) -> List[WebSearchResult]:
         """
         Search for general information about a brand.
@@ -85,22 +207,233 @@ class WebSearchAgent:
         """
         Perform the actual web search.
         
+        The local index, when configured, is queried first; only queries it
+        has no hits for go to the network providers (in the configured
+        search mode).
+        
         Args:
             query: Search query
             
         Returns:
             List of search results
         """
-        results = []
+        providers = self._providers()
+        if providers and providers[0][0] == "local":
+            results = self._run_search("local", providers[0][1], query)
+            providers = providers[1:]
+            if results or not providers:
+                return results
+            logger.debug(f"No local hits, searching the web for: {query}")
+        if not providers:
+            return []
+        
+        mode = settings.search_mode
+        if mode in ("race", "merge") and len(providers) > 1:
+            provider = f"{mode}:" + "+".join(name for name, _ in providers)
+            search = partial(self._fan_out_search, providers=providers, merge=(mode == "merge"))
+        else:
+            provider, search = providers[0]
+        
+        return self._run_search(provider, search, query)
+    
+    def _run_search(
+        self,
+        provider: str,
+        search: Callable[[str], List[WebSearchResult]],
+        query: str
+    ) -> List[WebSearchResult]:
+        """
+        Run one search through the result cache and call coalescing.
         
-        # Try Tavily first (best for this use case)
+        Args:
+            provider: Provider name (part of the cache key)
+            search: Search function
+            query: Search query
+            
+        Returns:
+            List of search results (empty if the provider failed)
+        """
+        request_key = self._request_key(provider, query)
+        # Local lookups are as cheap as the cache itself
+        use_cache = self.cache is not None and provider != "local"
+        if use_cache:
+            cached = self.cache.get(request_key, is_fresh=self._is_fresh)
+            if cached is not None:
+                logger.debug(f"Search cache hit for: {query}")
+                return self._results_from_cache(cached)
+        
+        try:
+            results = _search_flights.do(request_key, lambda: search(query))
+        except Exception as e:
+            # Provider errors are not cached, only genuine empty results
+            logger.error(f"{provider} search failed: {e}")
+            return []
+        
+        results = results[:self.max_results]
+        
+        if use_cache:
+            self.cache.set(request_key, json.dumps({
+                "cached_at": time.time(),
+                "results": [r.model_dump() for r in results]
+            }))
+        
+        return results
+    
+    def _providers(self) -> List[Tuple[str, Callable[[str], List[WebSearchResult]]]]:
+        """Configured search providers, in order of preference."""
+        providers = []
+        # The local index answers without network latency, so it goes first
+        if self.local_index is not None:
+            providers.append(("local", self._local_search))
+            if settings.local_search_only:
+                return providers
+        # Tavily first (best for this use case), DuckDuckGo as fallback
         if TAVILY_AVAILABLE and settings.tavily_api_key:
-            results = self._tavily_search(query)
-        # Fallback to DuckDuckGo
-        elif DDGS_AVAILABLE:
-            results = self._ddgs_search(query)
+            providers.append(("tavily", self._tavily_search))
+        if DDGS_AVAILABLE:
+            providers.append(("duckduckgo", self._ddgs_search))
+        return providers
+    
+    def _fan_out_search(
+        self,
+        query: str,
+        providers: List[Tuple[str, Callable[[str], List[WebSearchResult]]]],
+        merge: bool = False
+    ) -> List[WebSearchResult]:
+        """
+        Query all providers concurrently.
+        
+        In race mode the first provider returning at least
+        settings.search_race_min_results wins; in merge mode results are
+        combined in provider order and de-duplicated by URL. Either way,
+        providers that haven't answered by the deadline are abandoned.
         
-        return results[:self.max_results]
+        Args:
+            query: Search query
+            providers: (name, search function) pairs
+            merge: Merge all results instead of returning the first good one
+            
+        Returns:
+            List of search results
+            
+        Raises:
+            TimeoutError: If the deadline passed before any provider returned results
+        """
+        executor = self._get_search_executor()
+        futures = {executor.submit(search, query): name for name, search in providers}
+        deadline = time.monotonic() + settings.search_deadline_seconds
+        
+        results_by_provider = {}
+        errors = []
+        pending = set(futures)
+        
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.warning(f"{name} search failed: {e}")
+                    errors.append(e)
+                    continue
+                
+                results_by_provider[name] = results
+                if not merge and len(results) >= settings.search_race_min_results:
+                    logger.debug(f"{name} won the search race for: {query}")
+                    self._abandon(pending)
+                    return results
+        
+        if pending:
+            slow = ", ".join(futures[f] for f in pending)
+            logger.warning(f"Search deadline passed without results from: {slow}")
+            self._abandon(pending)
+            # An empty answer is only genuine if every provider gave it; raising
+            # keeps a timeout out of the (long-lived) negative cache
+            if not any(results_by_provider.values()):
+                raise TimeoutError(f"No search results within {settings.search_deadline_seconds}s from: {slow}")
+        
+        if not results_by_provider and errors:
+            raise errors[0]
+        
+        ordered = [results_by_provider[name] for name, _ in providers if name in results_by_provider]
+        if not merge:
+            # Nobody had enough results; return the best partial answer
+            return max(ordered, key=len, default=[])
+        
+        merged = []
+        seen_urls = set()
+        for results in ordered:
+            for result in results:
+                if result.url in seen_urls:
+                    continue
+                seen_urls.add(result.url)
+                merged.append(result)
+        return merged
+    
+    @staticmethod
+    def _abandon(pending):
+        """Cancel searches that haven't started; running ones finish in the background."""
+        for future in pending:
+            future.cancel()
+    
+    def _get_search_executor(self) -> ThreadPoolExecutor:
+        """Worker threads for fan-out searches, created on first use."""
+        if self._search_executor is None:
+            with self._client_lock:
+                if self._search_executor is None:
+                    self._search_executor = ThreadPoolExecutor(
+                        max_workers=settings.search_http_pool_size,
+                        thread_name_prefix="web-search"
+                    )
+        return self._search_executor
+    
+    def _get_async_executor(self) -> ThreadPoolExecutor:
+        """Worker threads for async searches, created on first use."""
+        if self._async_executor is None:
+            with self._client_lock:
+                if self._async_executor is None:
+                    self._async_executor = ThreadPoolExecutor(
+                        max_workers=max(1, settings.search_async_max_workers),
+                        thread_name_prefix="async-search"
+                    )
+        return self._async_executor
+    
+    def _request_key(self, provider: str, query: str) -> str:
+        """Identity of a search, for the result cache and call coalescing."""
+        normalized_query = " ".join(query.lower().split())
+        return make_cache_key("search", provider, normalized_query, self.max_results)
+    
+    @staticmethod
+    def _is_fresh(value: str) -> bool:
+        """Empty results expire sooner than real ones (negative caching)."""
+        entry = json.loads(value)
+        if entry["results"]:
+            return True
+        return time.time() - entry["cached_at"] <= settings.search_cache_negative_ttl_seconds
+    
+    @staticmethod
+    def _results_from_cache(value: str) -> List[WebSearchResult]:
+        """Rebuild search results from a cache entry."""
+        return [WebSearchResult(**result) for result in json.loads(value)["results"]]
+    
+    def _local_search(self, query: str) -> List[WebSearchResult]:
+        """
+        Search the offline full-text index.
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            List of search results
+        """
+        results = self.local_index.search(query, max_results=self.max_results)
+        logger.info(f"Found {len(results)} results in local index")
+        return results
     
     def _tavily_search(self, query: str) -> List[WebSearchResult]:
         """
@@ -114,26 +447,24 @@ class WebSearchAgent:
         """
         results = []
         
-        try:
-            client = TavilyClient(api_key=settings.tavily_api_key)
-            search_results = client.search(
+        search_results = call_with_retry(
+            lambda: self.tavily_client.search(
                 query=query,
                 max_results=self.max_results,
                 search_depth="advanced"  # More comprehensive results
-            )
-            
-            for result in search_results.get("results", []):
-                results.append(WebSearchResult(
-                    title=result.get("title", ""),
-                    snippet=result.get("content", ""),
-                    url=result.get("url", ""),
-                    source=self._extract_domain(result.get("url", ""))
-                ))
-                    
-            logger.info(f"Found {len(results)} results from Tavily")
-            
-        except Exception as e:
-            logger.error(f"Tavily search failed: {e}")
+            ),
+            get_search_rate_limiter("tavily")
+        )
+        
+        for result in search_results.get("results", []):
+            results.append(WebSearchResult(
+                title=result.get("title", ""),
+                snippet=result.get("content", ""),
+                url=result.get("url", ""),
+                source=self._extract_domain(result.get("url", ""))
+            ))
+                
+        logger.info(f"Found {len(results)} results from Tavily")
         
         return results
     
@@ -149,22 +480,21 @@ class WebSearchAgent:
         """
         results = []
         
-        try:
-            with DDGS() as ddgs:
-                search_results = ddgs.text(query, max_results=self.max_results)
-                
-                for result in search_results:
-                    results.append(WebSearchResult(
-                        title=result.get("title", ""),
-                        snippet=result.get("body", ""),
-                        url=result.get("href", ""),
-                        source=self._extract_domain(result.get("href", ""))
-                    ))
-                    
-            logger.info(f"Found {len(results)} results from DuckDuckGo")
+        with self.ddgs_client() as client:
+            search_results = call_with_retry(
+                lambda: client.text(query, max_results=self.max_results),
+                get_search_rate_limiter("duckduckgo")
+            )
+        
+        for result in search_results:
+            results.append(WebSearchResult(
+                title=result.get("title", ""),
+                snippet=result.get("body", ""),
+                url=result.get("href", ""),
+                source=self._extract_domain(result.get("href", ""))
+            ))
             
-        except Exception as e:
-            logger.error(f"DuckDuckGo search failed: {e}")
+        logger.info(f"Found {len(results)} results from DuckDuckGo")
         
         return results
     
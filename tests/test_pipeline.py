@@ -1,6 +1,7 @@
 """
 Unit tests for the brand analysis pipeline.
 """
+import json
 import pytest
 import sys
 import os
@@ -91,6 +92,1814 @@ class TestModels:
         assert rel.flagged == False
 
 
+class TestResponseCache:
+    """Test the SQLite LLM response cache."""
+    
+    def test_hit_and_miss_counters(self, tmp_path):
+        """Test basic get/set with hit/miss accounting."""
+        from src.cache import SQLiteResponseCache, make_cache_key
+        cache = SQLiteResponseCache(str(tmp_path / "llm.sqlite"))
+        key = make_cache_key("openai", "gpt-4o", 0.0, "system", "prompt")
+        
+        assert cache.get(key) is None
+        cache.set(key, '{"ok": true}')
+        assert cache.get(key) == '{"ok": true}'
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+    
+    def test_key_depends_on_all_parts(self):
+        """Test that changing any key part changes the key."""
+        from src.cache import make_cache_key
+        base = make_cache_key("openai", "gpt-4o", 0.0, "system", "prompt")
+        assert base != make_cache_key("openai", "gpt-4o", 0.5, "system", "prompt")
+        assert base != make_cache_key("anthropic", "gpt-4o", 0.0, "system", "prompt")
+    
+    def test_ttl_expiry(self, tmp_path):
+        """Test that expired entries are treated as misses."""
+        import time
+        from src.cache import SQLiteResponseCache
+        cache = SQLiteResponseCache(str(tmp_path / "llm.sqlite"), ttl_seconds=0.05)
+        cache.set("k", "v")
+        time.sleep(0.1)
+        assert cache.get("k") is None
+        assert len(cache) == 0
+    
+    def test_size_eviction(self, tmp_path):
+        """Test that least recently used entries are evicted."""
+        import time
+        from src.cache import SQLiteResponseCache
+        cache = SQLiteResponseCache(str(tmp_path / "llm.sqlite"), max_entries=2)
+        cache.set("a", "1")
+        time.sleep(0.01)
+        cache.set("b", "2")
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.set("c", "3")
+        
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+    
+    def test_hits_batch_access_updates(self, tmp_path, monkeypatch):
+        """Test that hits don't write until the buffer fills or an eviction needs them."""
+        from src import cache as cache_module
+        cache = cache_module.SQLiteResponseCache(str(tmp_path / "llm.sqlite"), max_entries=10)
+        cache.set("a", "1")
+        statements = []
+        cache._conn.set_trace_callback(statements.append)
+        
+        for _ in range(5):
+            assert cache.get("a") == "1"
+        cache.set("b", "2")
+        assert not any(s.startswith(("UPDATE", "DELETE")) for s in statements)
+        
+        monkeypatch.setattr(cache_module, "_ACCESS_FLUSH_SIZE", 2)
+        cache.get("a")
+        cache.get("b")
+        assert sum(s.startswith("UPDATE") for s in statements) == 2
+    
+    def test_unparseable_responses_not_cached(self):
+        """Test that an LLM reply is cached only once the caller's parser accepts it."""
+        import json
+        from src.agents.base_agent import BaseAgent
+        from src.cache import SQLiteResponseCache
+        
+        class EchoAgent(BaseAgent):
+            def run(self):
+                pass
+        
+        agent = EchoAgent.__new__(EchoAgent)
+        agent.provider, agent.model, agent.temperature = "openai", "gpt-4o", 0.0
+        agent.cache = SQLiteResponseCache(":memory:")
+        replies = iter(['{"brands": [', '{"brands": []}'])
+        calls = []
+        agent._invoke_llm = lambda prompt, system_prompt=None: calls.append(prompt) or next(replies)
+        
+        with pytest.raises(json.JSONDecodeError):
+            agent._call_llm("prompt", parse=json.loads)
+        assert len(agent.cache) == 0
+        assert agent._call_llm("prompt", parse=json.loads) == {"brands": []}
+        assert agent._call_llm("prompt", parse=json.loads) == {"brands": []}
+        assert len(calls) == 2
+        
+        # Entries that no longer parse are refetched rather than served
+        agent.cache.set(agent._request_key("other", None), "truncated")
+        agent._invoke_llm = lambda prompt, system_prompt=None: '{"ok": true}'
+        assert agent._call_llm("other", parse=json.loads) == {"ok": True}
+
+
+class TestRateLimit:
+    """Test client-side rate limiting and retries."""
+    
+    class _Throttled(Exception):
+        def __init__(self, retry_after=None):
+            super().__init__("429 Too Many Requests")
+            self.status_code = 429
+            self.response = type("Response", (), {
+                "status_code": 429,
+                "headers": {"retry-after": retry_after} if retry_after else {}
+            })()
+    
+    def test_token_bucket_spaces_requests(self):
+        """Test that requests beyond the burst are delayed by the refill rate."""
+        from src.rate_limit import TokenBucket
+        
+        bucket = TokenBucket(per_minute=60, burst_seconds=2)
+        delays = [bucket.reserve() for _ in range(4)]
+        
+        assert delays[:2] == [0.0, 0.0]
+        assert delays[2] == pytest.approx(1.0, abs=0.05)
+        assert delays[3] == pytest.approx(2.0, abs=0.05)
+    
+    def test_retry_honors_retry_after(self, monkeypatch):
+        """Test that a 429 is retried after the server-requested delay."""
+        from src import rate_limit
+        
+        sleeps = []
+        monkeypatch.setattr(rate_limit.time, "sleep", sleeps.append)
+        attempts = []
+        
+        def request():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise self._Throttled(retry_after="7")
+            return "ok"
+        
+        assert rate_limit.call_with_retry(request, max_retries=3) == "ok"
+        assert sleeps == [7.0, 7.0]
+    
+    def test_non_retryable_errors_raise(self, monkeypatch):
+        """Test that client errors and exhausted retries propagate."""
+        from src import rate_limit
+        monkeypatch.setattr(rate_limit.time, "sleep", lambda s: None)
+        
+        def bad_request():
+            raise ValueError("bad prompt")
+        
+        def always_throttled():
+            raise self._Throttled()
+        
+        with pytest.raises(ValueError):
+            rate_limit.call_with_retry(bad_request)
+        with pytest.raises(self._Throttled):
+            rate_limit.call_with_retry(always_throttled, max_retries=2)
+    
+    def test_async_retry(self, monkeypatch):
+        """Test the async retry path."""
+        import asyncio
+        from src import rate_limit
+        
+        async def no_sleep(seconds):
+            pass
+        
+        monkeypatch.setattr(rate_limit.asyncio, "sleep", no_sleep)
+        attempts = []
+        
+        async def request():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise self._Throttled()
+            return "ok"
+        
+        assert asyncio.run(rate_limit.acall_with_retry(request)) == "ok"
+        assert len(attempts) == 2
+
+
+class TestSingleFlight:
+    """Test coalescing of identical in-flight calls."""
+    
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that threads with the same key get the leader's result."""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from src.single_flight import SingleFlight
+        
+        flights = SingleFlight()
+        calls = []
+        started = threading.Event()
+        
+        def slow_call():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return "result"
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(flights.do, "key", slow_call)
+            started.wait()
+            followers = [executor.submit(flights.do, "key", slow_call) for _ in range(3)]
+            results = [leader.result()] + [f.result() for f in followers]
+        
+        assert calls == [1]
+        assert results == ["result"] * 4
+        assert flights.coalesced == 3
+        # Nothing is remembered once the call finishes
+        assert flights.do("key", lambda: "fresh") == "fresh"
+    
+    def test_async_calls_share_errors(self):
+        """Test that async followers receive the leader's exception."""
+        import asyncio
+        from src.single_flight import SingleFlight
+        
+        flights = SingleFlight()
+        calls = []
+        
+        async def failing_call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            raise RuntimeError("provider down")
+        
+        async def run():
+            return await asyncio.gather(
+                *(flights.ado("key", failing_call) for _ in range(3)),
+                return_exceptions=True
+            )
+        
+        results = asyncio.run(run())
+        
+        assert calls == [1]
+        assert all(isinstance(r, RuntimeError) for r in results)
+    
+    def test_cancelled_leader_doesnt_cancel_followers(self):
+        """Test that a follower still gets the result when the first caller is cancelled."""
+        import asyncio
+        from src.single_flight import SingleFlight
+        
+        flights = SingleFlight()
+        calls = []
+        
+        async def slow_call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+        
+        async def run():
+            leader = asyncio.create_task(flights.ado("key", slow_call))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(flights.ado("key", slow_call))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await asyncio.gather(leader, follower, return_exceptions=True)
+        
+        leader_result, follower_result = asyncio.run(run())
+        
+        assert isinstance(leader_result, asyncio.CancelledError)
+        assert follower_result == "result"
+        assert calls == [1]
+
+
+class TestRelationshipAgent:
+    """Test relationship agent orchestration (no LLM/graph calls)."""
+    
+    def _make_agent(self, max_workers, batch_size=1, memo=None):
+        """Build an agent without touching LLM clients or Neo4j."""
+        from src.agents.relationship_agent import RelationshipAgent
+        from src.web_search.search_agent import WebSearchAgent
+        
+        class StubGraph:
+            def get_relationships_for_targets(self, source_brand, target_brands, category=None):
+                return {}
+        
+        agent = RelationshipAgent.__new__(RelationshipAgent)
+        agent.subject_brand = "Tesla"
+        agent.max_workers = max_workers
+        agent.batch_size = batch_size
+        agent.graph_ops = StubGraph()
+        agent.web_search = WebSearchAgent(max_results=3)
+        agent._search = lambda subject_brand, brand, category: []
+        agent.memo = memo
+        return agent
+    
+    def _stub_relationship(self, target):
+        return Relationship(
+            source="Tesla",
+            target=target,
+            relationship_type=RelationshipType.NEUTRAL,
+            category="automotive",
+            relationship_context="general",
+            confidence=0.8,
+            evidence="stub",
+            source_type=SourceType.LLM_INFERENCE
+        )
+    
+    def test_concurrent_run_preserves_order(self):
+        """Test that concurrent classification keeps original brand order."""
+        import time
+        agent = self._make_agent(max_workers=4)
+        delays = {"Panasonic": 0.05, "Rivian": 0.0, "Lucid": 0.02}
+        
+        def classify(subject_brand, brand, category, text_context):
+            time.sleep(delays[brand.name])
+            return self._stub_relationship(brand.name)
+        
+        agent._search_and_classify = classify
+        brands = [Brand(name=n) for n in ["Panasonic", "Tesla", "Rivian", "Lucid"]]
+        output = agent.run(brands=brands, category="automotive", text_context="")
+        
+        assert [r.target for r in output.relationships] == ["Panasonic", "Rivian", "Lucid"]
+    
+    def test_sequential_run_skips_missing(self):
+        """Test that pairs returning None are dropped in sequential mode."""
+        agent = self._make_agent(max_workers=1)
+        agent._search_and_classify = lambda subject_brand, brand, category, text_context: (
+            None if brand.name == "Rivian" else self._stub_relationship(brand.name)
+        )
+        brands = [Brand(name="Panasonic"), Brand(name="Rivian")]
+        output = agent.run(brands=brands, category="automotive", text_context="")
+        
+        assert [r.target for r in output.relationships] == ["Panasonic"]
+
+
+    def test_subject_brand_per_run(self):
+        """Test that a shared agent takes the subject brand per run."""
+        agent = self._make_agent(max_workers=2)
+        agent.subject_brand = None
+        agent._search_and_classify = lambda subject_brand, brand, category, text_context: (
+            self._stub_relationship(brand.name).model_copy(update={"source": subject_brand})
+        )
+        brands = [Brand(name="Tesla"), Brand(name="Rivian")]
+        output = agent.run(brands=brands, category="automotive", text_context="", subject_brand="Rivian")
+        
+        assert [(r.source, r.target) for r in output.relationships] == [("Rivian", "Tesla")]
+        with pytest.raises(ValueError):
+            agent.run(brands=brands, category="automotive", text_context="")
+    
+    def test_async_run_matches_sync_order(self):
+        """Test that arun classifies concurrently and keeps brand order."""
+        import asyncio
+        agent = self._make_agent(max_workers=4)
+        agent.async_graph_ops = None
+        delays = {"Panasonic": 0.05, "Rivian": 0.0, "Lucid": 0.02}
+        
+        async def classify(subject_brand, brand, category, text_context):
+            await asyncio.sleep(delays[brand.name])
+            return self._stub_relationship(brand.name)
+        
+        agent._asearch_and_classify = classify
+        brands = [Brand(name=n) for n in ["Panasonic", "Tesla", "Rivian", "Lucid"]]
+        output = asyncio.run(agent.arun(brands=brands, category="automotive", text_context=""))
+        
+        assert [r.target for r in output.relationships] == ["Panasonic", "Rivian", "Lucid"]
+        assert len(output.new_relationships) == 3
+    
+    def test_batched_run_single_call(self):
+        """Test that a batch of pairs is classified with one LLM call."""
+        import json
+        agent = self._make_agent(max_workers=1, batch_size=8)
+        prompts = []
+        
+        def call_llm(prompt, system_prompt=None, parse=lambda response: response):
+            prompts.append(prompt)
+            return parse(json.dumps({"relationships": [
+                {"target": "rivian", "relationship_type": "competitor", "confidence": 0.9},
+                {"target": "Panasonic", "relationship_type": "supplier", "confidence": 0.8},
+            ]}))
+        
+        agent._call_llm = call_llm
+        brands = [Brand(name="Panasonic"), Brand(name="Rivian")]
+        output = agent.run(brands=brands, category="automotive", text_context="text")
+        
+        assert len(prompts) == 1
+        assert [r.target for r in output.relationships] == ["Panasonic", "Rivian"]
+        assert output.relationships[1].relationship_type == RelationshipType.COMPETITOR
+    
+    def test_batched_run_falls_back_on_malformed_json(self):
+        """Test per-pair fallback when the batched response is malformed."""
+        import json
+        agent = self._make_agent(max_workers=1, batch_size=8)
+        prompts = []
+        
+        def call_llm(prompt, system_prompt=None, parse=lambda response: response):
+            prompts.append(prompt)
+            if len(prompts) == 1:
+                return parse("not json")
+            return parse(json.dumps({"relationship_type": "partner", "confidence": 0.9}))
+        
+        agent._call_llm = call_llm
+        brands = [Brand(name="Panasonic"), Brand(name="Rivian")]
+        output = agent.run(brands=brands, category="automotive", text_context="text")
+        
+        assert len(prompts) == 3
+        assert [r.relationship_type for r in output.relationships] == [
+            RelationshipType.PARTNER, RelationshipType.PARTNER
+        ]
+        assert len(output.new_relationships) == 2
+    
+    def test_batched_runs_share_reserved_pairs(self):
+        """Test that concurrent batched runs send each pair to the LLM once."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from src.agents.relationship_memo import RelationshipMemo
+        agent = self._make_agent(max_workers=1, batch_size=8, memo=RelationshipMemo())
+        batched = []
+        
+        def classify_batched(subject_brand, brands, category, text_context):
+            batched.extend(brand.name for brand in brands)
+            time.sleep(0.1)
+            return [self._stub_relationship(brand.name) for brand in brands]
+        
+        agent._classify_batched = classify_batched
+        brands = [Brand(name="Rivian"), Brand(name="Lucid")]
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            outputs = list(executor.map(
+                lambda _: agent.run(brands=brands, category="automotive", text_context=""),
+                range(3)
+            ))
+        
+        assert sorted(batched) == ["Lucid", "Rivian"]
+        assert all([r.target for r in o.relationships] == ["Rivian", "Lucid"] for o in outputs)
+        assert sum(len(o.new_relationships) for o in outputs) == 2
+    
+    def test_batched_waiter_classifies_after_owner_fails(self):
+        """Test that a pair reserved by a run that fails is classified by the run waiting on it."""
+        import threading
+        import time
+        from src.agents.relationship_memo import RelationshipMemo
+        agent = self._make_agent(max_workers=1, batch_size=8, memo=RelationshipMemo())
+        agent._classify_batched = lambda subject_brand, brands, category, text_context: (
+            [self._stub_relationship(brand.name) for brand in brands]
+        )
+        classified = []
+        
+        def classify(subject_brand, brand, category, text_context):
+            classified.append(brand.name)
+            return self._stub_relationship(brand.name)
+        
+        agent._search_and_classify = classify
+        _, owns = agent.memo.reserve("Tesla", "Rivian", "automotive")
+        # The owning run fails while this one waits on its reservation
+        threading.Timer(0.1, agent.memo.fulfill, ("Tesla", "Rivian", "automotive", None)).start()
+        started = time.monotonic()
+        output = agent.run(brands=[Brand(name="Rivian")], category="automotive", text_context="")
+        
+        assert owns and time.monotonic() - started >= 0.1
+        assert classified == ["Rivian"]
+        assert [r.target for r in output.new_relationships] == ["Rivian"]
+    
+    def test_failed_classifications_are_not_stored(self):
+        """Test that errored pairs are returned but not marked for storage."""
+        agent = self._make_agent(max_workers=1)
+        
+        def call_llm(prompt, system_prompt=None, parse=lambda response: response):
+            raise RuntimeError("provider down")
+        
+        agent._call_llm = call_llm
+        output = agent.run(brands=[Brand(name="Rivian")], category="automotive", text_context="")
+        
+        assert output.relationships[0].relationship_type == RelationshipType.UNKNOWN
+        assert output.new_relationships == []
+    
+    def test_graph_hits_skip_classification(self):
+        """Test that pairs found by the bulk graph lookup are not re-classified."""
+        agent = self._make_agent(max_workers=1)
+        agent.graph_ops.get_relationships_for_targets = lambda source_brand, target_brands, category=None: {
+            "Panasonic": {
+                "relationship_type": "supplier",
+                "relationship_context": "battery_supply",
+                "properties": {"confidence": 0.95}
+            }
+        }
+        classified = []
+        
+        def classify(subject_brand, brand, category, text_context):
+            classified.append(brand.name)
+            return self._stub_relationship(brand.name)
+        
+        agent._search_and_classify = classify
+        brands = [Brand(name="Panasonic"), Brand(name="Rivian")]
+        output = agent.run(brands=brands, category="automotive", text_context="")
+        
+        assert classified == ["Rivian"]
+        assert output.relationships[0].source_type == SourceType.GRAPH_DB
+        assert [r.target for r in output.new_relationships] == ["Rivian"]
+    
+    def test_memo_serves_reverse_pair(self):
+        """Test that a pair classified for one subject is inverted for the other."""
+        from src.agents.relationship_memo import RelationshipMemo
+        agent = self._make_agent(max_workers=1, memo=RelationshipMemo())
+        classified = []
+        
+        def classify(subject_brand, brand, category, text_context):
+            classified.append((subject_brand, brand.name))
+            return Relationship(
+                source=subject_brand, target=brand.name,
+                relationship_type=RelationshipType.SUPPLIER if brand.name == "Panasonic" else RelationshipType.COMPETITOR,
+                category=category, relationship_context="general", confidence=0.9,
+                evidence="e", source_type=SourceType.LLM_INFERENCE
+            )
+        
+        agent._search_and_classify = classify
+        agent.run(brands=[Brand(name="Panasonic"), Brand(name="Rivian")], category="automotive", text_context="")
+        output = agent.run(
+            brands=[Brand(name="Tesla, Inc."), Brand(name="Rivian")],
+            category="Automotive", text_context="", subject_brand="Panasonic"
+        )
+        
+        assert classified == [("Tesla", "Panasonic"), ("Tesla", "Rivian"), ("Panasonic", "Rivian")]
+        reverse = output.relationships[0]
+        assert (reverse.source, reverse.target) == ("Panasonic", "Tesla, Inc.")
+        assert reverse.relationship_type == RelationshipType.CUSTOMER
+        # Memo hits were stored by the run that classified them
+        assert [r.target for r in output.new_relationships] == ["Rivian"]
+    
+    def test_memo_inverts_every_relationship_type(self):
+        """Test that the inversion table covers every relationship type."""
+        from src.agents.relationship_memo import INVERSE_RELATIONSHIP_TYPES
+        assert set(INVERSE_RELATIONSHIP_TYPES) == set(RelationshipType)
+    
+    def test_memo_entries_expire(self, monkeypatch):
+        """Test that memoized pairs are classified again after the TTL."""
+        from src.agents import relationship_memo
+        now = [1000.0]
+        monkeypatch.setattr(relationship_memo.time, "monotonic", lambda: now[0])
+        memo = relationship_memo.RelationshipMemo(ttl_seconds=60)
+        memo.put(self._stub_relationship("Rivian"))
+        
+        assert memo.get("Tesla", "Rivian", "automotive") is not None
+        now[0] += 61
+        assert memo.get("Tesla", "Rivian", "automotive") is None
+    
+    def test_memo_claim_survives_cancelled_leader(self):
+        """Test that a follower claims the classification when the caller that started it is cancelled."""
+        import asyncio
+        from src.agents.relationship_memo import RelationshipMemo
+        memo = RelationshipMemo()
+        
+        async def classify():
+            await asyncio.sleep(0.05)
+            return self._stub_relationship("Rivian")
+        
+        async def run():
+            leader = asyncio.create_task(memo.aresolve("Tesla", "Rivian", "automotive", classify))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(memo.aresolve("Tesla", "Rivian", "automotive", classify))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await asyncio.gather(leader, follower, return_exceptions=True)
+        
+        leader_result, (relationship, fresh) = asyncio.run(run())
+        
+        assert isinstance(leader_result, asyncio.CancelledError)
+        assert relationship.target == "Rivian" and fresh
+        assert memo.resolve("Tesla", "Rivian", "automotive", classify) == (relationship, False)
+    
+    def test_memo_classifies_concurrent_duplicates_once(self):
+        """Test that concurrent runs over the same pair share one classification."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from src.agents.relationship_memo import RelationshipMemo
+        agent = self._make_agent(max_workers=1, memo=RelationshipMemo())
+        classified = []
+        
+        def classify(subject_brand, brand, category, text_context):
+            classified.append(brand.name)
+            time.sleep(0.1)
+            return self._stub_relationship(brand.name)
+        
+        agent._search_and_classify = classify
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            outputs = list(executor.map(
+                lambda _: agent.run(brands=[Brand(name="Rivian")], category="automotive", text_context=""),
+                range(3)
+            ))
+        
+        assert classified == ["Rivian"]
+        assert all(o.relationships[0].target == "Rivian" for o in outputs)
+        assert sum(len(o.new_relationships) for o in outputs) == 1
+
+
+class TestWebSearchCache:
+    """Test web search result caching."""
+    
+    def _make_agent(self, provider_results):
+        """Build a search agent over an in-memory cache and a scripted provider."""
+        from src.cache import SQLiteResponseCache
+        from src.web_search import search_agent as search_module
+        from src.models import WebSearchResult
+        
+        agent = search_module.WebSearchAgent(max_results=3, cache=SQLiteResponseCache(":memory:"))
+        calls = []
+        
+        def provider(query):
+            calls.append(query)
+            outcome = provider_results[min(len(calls), len(provider_results)) - 1]
+            if isinstance(outcome, Exception):
+                raise outcome
+            return [WebSearchResult(title=t, snippet="s", url=f"https://{t}.com", source=f"{t}.com") for t in outcome]
+        
+        agent._tavily_search = provider
+        return agent, calls
+    
+    @pytest.fixture(autouse=True)
+    def _tavily_configured(self, monkeypatch):
+        from src.web_search import search_agent as search_module
+        monkeypatch.setattr(search_module, "TAVILY_AVAILABLE", True)
+        monkeypatch.setattr(search_module.settings, "tavily_api_key", "test")
+    
+    def test_normalized_query_hits_cache(self):
+        """Test that whitespace/case variants of a query are served from cache."""
+        agent, calls = self._make_agent([["a", "b"]])
+        
+        first = agent._perform_search('"Apple" "Samsung" relationship')
+        second = agent._perform_search('"apple"  "samsung" Relationship')
+        
+        assert len(calls) == 1
+        assert [r.title for r in second] == [r.title for r in first] == ["a", "b"]
+        assert agent.cache.stats()["hits"] == 1
+    
+    def test_negative_results_expire(self, monkeypatch):
+        """Test that empty results are cached only for the negative TTL."""
+        from src.web_search import search_agent as search_module
+        agent, calls = self._make_agent([[], ["a"]])
+        
+        agent._perform_search("q")
+        agent._perform_search("q")
+        assert len(calls) == 1
+        
+        monkeypatch.setattr(search_module.settings, "search_cache_negative_ttl_seconds", -1)
+        assert [r.title for r in agent._perform_search("q")] == ["a"]
+        assert len(calls) == 2
+    
+    def test_provider_errors_not_cached(self):
+        """Test that a failed search is retried rather than cached as empty."""
+        agent, calls = self._make_agent([RuntimeError("timeout"), ["a"]])
+        
+        assert agent._perform_search("q") == []
+        assert [r.title for r in agent._perform_search("q")] == ["a"]
+        assert len(calls) == 2
+
+
+class TestWebSearchClients:
+    """Test provider client reuse."""
+    
+    def test_tavily_client_reused(self, monkeypatch):
+        """Test that one Tavily client and pooled session serve every query."""
+        from src.web_search.search_agent import WebSearchAgent, settings as search_settings
+        monkeypatch.setattr(search_settings, "tavily_api_key", "test")
+        
+        agent = WebSearchAgent(use_cache=False)
+        client = agent.tavily_client
+        
+        assert agent.tavily_client is client
+        assert client.session is agent._http_session
+        assert client.session.get_adapter("https://api.tavily.com")._pool_maxsize == search_settings.search_http_pool_size
+        
+        agent.close()
+        assert agent._tavily_client is None
+    
+    def test_ddgs_clients_reused_across_threads(self, monkeypatch):
+        """Test that successive documents' worker threads reuse pooled DuckDuckGo clients."""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.web_search import search_agent as search_module
+        
+        created = []
+        
+        class StubDDGS:
+            def __init__(self):
+                created.append(self)
+            
+            def text(self, query, max_results):
+                return [{"title": query, "body": "b", "href": f"https://{query}.com"}]
+        
+        monkeypatch.setattr(search_module, "DDGS", StubDDGS, raising=False)
+        agent = search_module.WebSearchAgent(use_cache=False)
+        for document in range(3):
+            # A fresh pool per document, as RelationshipAgent._map creates
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(agent._ddgs_search, [f"q{document}{i}" for i in range(8)]))
+        
+        assert 1 <= len(created) <= 4
+        agent.close()
+    
+    def test_async_searches_use_dedicated_threads(self, monkeypatch):
+        """Test that async searches run on the agent's own pool, beyond the loop's default size."""
+        import asyncio
+        import threading
+        import time
+        from src.web_search import search_agent as search_module
+        
+        monkeypatch.setattr(search_module.settings, "search_async_max_workers", 64)
+        agent = search_module.WebSearchAgent(use_cache=False)
+        threads = []
+        
+        def search(brand1, brand2, category=None):
+            threads.append(threading.current_thread().name)
+            time.sleep(0.2)
+            return []
+        
+        agent.search_brand_relationship = search
+        
+        async def run():
+            await asyncio.gather(*(agent.asearch_brand_relationship("Tesla", f"B{i}") for i in range(64)))
+        
+        started = time.monotonic()
+        asyncio.run(run())
+        
+        assert time.monotonic() - started < 1.0
+        assert all(name.startswith("async-search") for name in threads)
+        agent.close()
+
+
+class TestMultiProviderSearch:
+    """Test fanning a query out to several providers."""
+    
+    def _make_agent(self, monkeypatch, mode, tavily, ddgs):
+        from src.web_search import search_agent as search_module
+        
+        monkeypatch.setattr(search_module, "TAVILY_AVAILABLE", True)
+        monkeypatch.setattr(search_module, "DDGS_AVAILABLE", True)
+        monkeypatch.setattr(search_module.settings, "tavily_api_key", "test")
+        monkeypatch.setattr(search_module.settings, "search_mode", mode)
+        monkeypatch.setattr(search_module.settings, "search_deadline_seconds", 2)
+        
+        agent = search_module.WebSearchAgent(max_results=5, use_cache=False)
+        agent._tavily_search = tavily
+        agent._ddgs_search = ddgs
+        return agent
+    
+    @staticmethod
+    def _provider(urls, delay=0.0, error=None):
+        import time
+        from src.models import WebSearchResult
+        
+        def search(query):
+            time.sleep(delay)
+            if error:
+                raise error
+            return [WebSearchResult(title=u, snippet="s", url=u, source="x") for u in urls]
+        return search
+    
+    def test_race_returns_fastest_good_result(self, monkeypatch):
+        """Test that a slow provider doesn't hold up the first good answer."""
+        import time
+        agent = self._make_agent(
+            monkeypatch, "race",
+            tavily=self._provider(["https://slow.com"], delay=1.0),
+            ddgs=self._provider(["https://fast.com"])
+        )
+        
+        started = time.monotonic()
+        results = agent._perform_search("q")
+        
+        assert [r.url for r in results] == ["https://fast.com"]
+        assert time.monotonic() - started < 0.5
+        agent.close()
+    
+    def test_race_skips_empty_and_failed_providers(self, monkeypatch):
+        """Test that an erroring provider doesn't win the race."""
+        agent = self._make_agent(
+            monkeypatch, "race",
+            tavily=self._provider([], error=RuntimeError("down")),
+            ddgs=self._provider(["https://a.com"], delay=0.1)
+        )
+        
+        assert [r.url for r in agent._perform_search("q")] == ["https://a.com"]
+        agent.close()
+    
+    def test_merge_dedupes_by_url(self, monkeypatch):
+        """Test that merged results keep provider order and drop duplicate URLs."""
+        agent = self._make_agent(
+            monkeypatch, "merge",
+            tavily=self._provider(["https://a.com", "https://b.com"], delay=0.1),
+            ddgs=self._provider(["https://b.com", "https://c.com"])
+        )
+        
+        results = agent._perform_search("q")
+        
+        assert [r.url for r in results] == ["https://a.com", "https://b.com", "https://c.com"]
+        agent.close()
+    
+    def test_deadline_miss_not_negative_cached(self, monkeypatch):
+        """Test that a search nobody answered in time is retried, not cached as empty."""
+        from src.cache import SQLiteResponseCache
+        from src.web_search import search_agent as search_module
+        calls = []
+        
+        def slow(query):
+            calls.append(query)
+            return self._provider(["https://late.com"], delay=0.3)(query)
+        
+        agent = self._make_agent(monkeypatch, "race", tavily=slow, ddgs=slow)
+        agent.cache = SQLiteResponseCache(":memory:")
+        monkeypatch.setattr(search_module.settings, "search_deadline_seconds", 0.05)
+        
+        assert agent._perform_search("q") == []
+        assert agent._perform_search("q") == []
+        assert len(calls) == 4 and len(agent.cache) == 0
+        agent.close()
+
+
+class TestLocalSearchIndex:
+    """Test the offline full-text search backend."""
+    
+    @pytest.fixture
+    def index(self, tmp_path):
+        from src.web_search.local_index import LocalSearchIndex
+        
+        archive = tmp_path / "news.jsonl"
+        archive.write_text("\n".join(json.dumps(doc) for doc in [
+            {"url": "https://a.com/1", "title": "Apple and Samsung settle", "text": "Apple and Samsung end their patent dispute."},
+            {"url": "https://www.b.com/2", "title": "Display deal", "text": "Samsung supplies OLED displays to Apple, a supplier relationship in consumer electronics."},
+            {"url": "https://c.com/3", "title": "Apple earnings", "text": "Apple reported record revenue."},
+            {"url": "https://a.com/1", "title": "Duplicate", "text": "Apple Samsung"}
+        ]))
+        
+        index = LocalSearchIndex(str(tmp_path / "index.sqlite"))
+        assert index.index_jsonl(str(archive)) == 3
+        yield index
+        index.close()
+    
+    def test_relationship_query_ranking(self, index):
+        """Test that both brands are required and keywords boost rank."""
+        results = index.search('"Apple" "Samsung" relationship consumer electronics', max_results=5)
+        
+        assert [r.url for r in results] == ["https://www.b.com/2", "https://a.com/1"]
+        assert results[0].source == "b.com"
+    
+    def test_search_agent_uses_local_index(self, index, monkeypatch):
+        """Test that WebSearchAgent can run entirely against the local index."""
+        from src.web_search import search_agent as search_module
+        monkeypatch.setattr(search_module.settings, "local_search_only", True)
+        
+        agent = search_module.WebSearchAgent(max_results=1, use_cache=False, local_index=index)
+        results = agent.search_brand_relationship("Apple", "Samsung", "consumer_electronics")
+        
+        assert [r.url for r in results] == ["https://www.b.com/2"]
+    
+    def test_local_miss_falls_back_to_web(self, index, monkeypatch):
+        """Test that network providers answer only the queries the local index misses."""
+        from src.web_search import search_agent as search_module
+        from src.models import WebSearchResult
+        monkeypatch.setattr(search_module.settings, "local_search_only", False)
+        monkeypatch.setattr(search_module.settings, "search_mode", "single")
+        monkeypatch.setattr(search_module, "TAVILY_AVAILABLE", True)
+        monkeypatch.setattr(search_module.settings, "tavily_api_key", "test")
+        
+        agent = search_module.WebSearchAgent(max_results=1, use_cache=False, local_index=index)
+        web_queries = []
+        agent._tavily_search = lambda query: web_queries.append(query) or [
+            WebSearchResult(title="t", snippet="s", url="https://web.com/1", source="web.com")
+        ]
+        
+        assert [name for name, _ in agent._providers()][:2] == ["local", "tavily"]
+        hit = agent.search_brand_relationship("Apple", "Samsung", "consumer_electronics")
+        assert [r.url for r in hit] == ["https://www.b.com/2"] and web_queries == []
+        
+        miss = agent.search_brand_relationship("Nokia", "Ericsson", "telecom")
+        assert [r.url for r in miss] == ["https://web.com/1"]
+        assert len(web_queries) == 1
+
+
+class TestCitationExtractor:
+    """Test citation post-processing that needs no LLM call."""
+    
+    def test_enrich_with_brands(self):
+        """Test that domain-guessed sources are attributed to extracted brands."""
+        from src.agents.citation_extractor import CitationExtractorAgent
+        from src.models import CitationExtractionOutput
+        
+        agent = CitationExtractorAgent.__new__(CitationExtractorAgent)
+        output = CitationExtractionOutput(citations=[
+            Citation(source="Unknown", text="t", citation_type=CitationType.OTHER, url="https://tesla.com/x"),
+            Citation(source="Rivian", text="r", citation_type=CitationType.OTHER, url="https://rivian.com/news"),
+            Citation(source="Reuters", text="r", citation_type=CitationType.ARTICLE, url="https://rivian.com/press"),
+            Citation(source="Bloomberg", text="b", citation_type=CitationType.ARTICLE)
+        ], confidence=0.9)
+        
+        output = agent.enrich_with_brands(output, ["Tesla", "RIVIAN"])
+        
+        assert [c.source for c in output.citations] == [
+            "Tesla", "RIVIAN", "Reuters", "Bloomberg"
+        ]
+    
+    def test_enrich_requires_exact_domain_match(self):
+        """Test that brands only match the registered domain, never a substring of it."""
+        from src.agents.citation_extractor import CitationExtractorAgent
+        from src.models import CitationExtractionOutput
+        
+        urls = [
+            "https://www.theverge.com/a", "https://metacritic.com/b", "https://shop.tesla.com/c",
+            "https://news.bbc.co.uk/d", "https://www.general-motors.com/e", "https://booking.com/f",
+            "https://apple.example.com/g",
+        ]
+        agent = CitationExtractorAgent.__new__(CitationExtractorAgent)
+        output = CitationExtractionOutput(citations=[
+            Citation(source="Unknown", text="t", citation_type=CitationType.OTHER, url=url) for url in urls
+        ], confidence=0.9)
+        
+        brands = ["GE", "Meta", "Tesla", "BBC", "General Motors", "Booking.com", "Apple"]
+        output = agent.enrich_with_brands(output, brands)
+        
+        assert [c.source for c in output.citations] == [
+            "Unknown", "Unknown", "Tesla", "BBC", "General Motors", "Booking.com", "Unknown"
+        ]
+
+
+class TestGraphOperations:
+    """Test graph operations against a recording client."""
+    
+    def test_store_relationships_single_transaction(self):
+        """Test that a list of relationships is written with one UNWIND query."""
+        from src.graphrag.graph_operations import GraphOperations
+        from src.graphrag.neo4j_client import Neo4jClient
+        
+        class RecordingClient(Neo4jClient):
+            def __init__(self):
+                self.writes = []
+            
+            def execute_write(self, query, parameters=None):
+                self.writes.append((query, parameters))
+                return []
+        
+        graph_ops = GraphOperations.__new__(GraphOperations)
+        graph_ops.client = RecordingClient()
+        graph_ops.cache = None
+        relationships = [
+            Relationship(
+                source="Tesla", target=target, relationship_type=RelationshipType.COMPETITOR,
+                category="automotive", relationship_context="ev_market", confidence=0.9,
+                evidence="e", source_type=SourceType.WEB_SEARCH
+            )
+            for target in ["Rivian", "Lucid"]
+        ]
+        
+        assert graph_ops.store_relationships(relationships)
+        assert len(graph_ops.client.writes) == 1
+        query, params = graph_ops.client.writes[0]
+        assert "UNWIND $rows" in query
+        assert [row["target"] for row in params["rows"]] == ["Rivian", "Lucid"]
+        assert params["rows"][0]["properties"]["source_type"] == "web_search"
+
+    def test_check_schema_reports_scans(self):
+        """Test that hot queries planned with scans are reported."""
+        from src.graphrag.neo4j_client import Neo4jClient
+
+        class PlanningClient(Neo4jClient):
+            def __init__(self):
+                pass
+
+            def missing_indexes(self):
+                return ["relationship_category_context"]
+
+            def explain(self, query, parameters=None):
+                if "DISTINCT b.name" in query:
+                    return {"operatorType": "ProduceResults@neo4j", "children": [
+                        {"operatorType": "Distinct@neo4j", "children": [
+                            {"operatorType": "DirectedRelationshipTypeScan@neo4j", "children": []}
+                        ]}
+                    ]}
+                return {"operatorType": "ProduceResults@neo4j", "children": [
+                    {"operatorType": "NodeUniqueIndexSeek@neo4j", "children": []}
+                ]}
+
+        report = PlanningClient().check_schema()
+
+        assert report["missing_indexes"] == ["relationship_category_context"]
+        assert report["scans"] == {"brands_by_category": ["DirectedRelationshipTypeScan"]}
+
+
+class TestEmbeddedGraph:
+    """Test GraphOperations on the embedded graph backend."""
+    
+    @pytest.fixture
+    def graph_ops(self, tmp_path):
+        from src.graphrag.graph_operations import GraphOperations
+        from src.graphrag.embedded_graph import EmbeddedGraph
+        from src.graphrag.relationship_cache import RelationshipCache
+        
+        graph_ops = GraphOperations.__new__(GraphOperations)
+        graph_ops.client = EmbeddedGraph(str(tmp_path / "graph.jsonl"))
+        graph_ops.cache = RelationshipCache()
+        yield graph_ops
+        graph_ops.client.close()
+    
+    @staticmethod
+    def _relationship(target, category="automotive", context="ev_market", rel_type=RelationshipType.COMPETITOR):
+        return Relationship(
+            source="Tesla", target=target, relationship_type=rel_type,
+            category=category, relationship_context=context, confidence=0.9,
+            evidence="e", source_type=SourceType.WEB_SEARCH
+        )
+    
+    def test_lookups(self, graph_ops):
+        """Test relationship lookups by context, category and latest."""
+        graph_ops.store_relationships([
+            self._relationship("Rivian"),
+            self._relationship("Rivian", context="charging", rel_type=RelationshipType.PARTNER),
+            self._relationship("Panasonic", category="energy", context="batteries", rel_type=RelationshipType.SUPPLIER),
+        ])
+        
+        exact = graph_ops.get_relationship("Tesla", "Rivian", "automotive", "ev_market")
+        assert exact["relationship_type"] == "competitor"
+        assert exact["properties"]["confidence"] == 0.9
+        assert graph_ops.get_relationship("Tesla", "Rivian", "automotive")["relationship_context"] == "charging"
+        assert graph_ops.get_relationship("Tesla", "Rivian")["relationship_type"] == "partner"
+        assert graph_ops.get_relationship("Rivian", "Tesla") is None
+        
+        targets = graph_ops.get_relationships_for_targets("Tesla", ["Rivian", "Panasonic", "Lucid"], "automotive")
+        assert list(targets) == ["Rivian"]
+        assert graph_ops.get_brands_by_category("energy") == ["Tesla", "Panasonic"]
+        assert {r["target"] for r in graph_ops.get_all_relationships_for_brand("Panasonic")} == {"Tesla"}
+        assert graph_ops.find_brand("TESLA") == "Tesla"
+        assert graph_ops.client.get_categories() == ["automotive", "energy"]
+        assert graph_ops.client.get_stats() == {"brands": 3, "relationships": 3}
+        assert len(graph_ops.get_graph_data("automotive")["edges"]) == 2
+    
+    def test_upsert_replaces_edge(self, graph_ops):
+        """Test that (category, context) identifies an edge, as in Neo4j."""
+        graph_ops.create_relationship("Tesla", "Rivian", "competitor", "automotive", "ev_market")
+        graph_ops.create_relationship("Tesla", "Rivian", "partner", "automotive", "ev_market")
+        
+        assert graph_ops.client.get_stats()["relationships"] == 1
+        assert graph_ops.get_relationship("Tesla", "Rivian")["relationship_type"] == "partner"
+    
+    def test_export_pages(self, graph_ops):
+        """Test keyset pagination with filters, and that rewritten edges move past the cursor."""
+        graph_ops.store_relationships([self._relationship(target) for target in ["A", "B", "C", "D", "E"]])
+        graph_ops.store_relationships([self._relationship("F", category="energy")])
+        
+        first = graph_ops.export_relationships(limit=2, category="automotive")
+        assert [e["target"] for e in first["edges"]] == ["A", "B"]
+        
+        graph_ops.create_relationship("Tesla", "A", "partner", "automotive", "ev_market")
+        rest = list(graph_ops.iter_relationships(batch_size=2, category="automotive"))
+        second = graph_ops.export_relationships(cursor=first["next_cursor"], limit=10, category="automotive")
+        
+        assert [e["target"] for e in rest] == ["B", "C", "D", "E", "A"]
+        assert [e["target"] for e in second["edges"]] == ["C", "D", "E", "A"]
+        assert second["next_cursor"] is None
+        assert second["edges"][-1]["relationship_type"] == "partner"
+        
+        since = rest[-1]["updated_at"]
+        assert [e["target"] for e in graph_ops.iter_relationships(updated_after=since)] == ["A"]
+        assert [e["target"] for e in graph_ops.iter_relationships(relationship_type="partner")] == ["A"]
+        assert len(list(graph_ops.iter_relationships(min_confidence=0.95))) == 0
+        
+        with pytest.raises(ValueError):
+            graph_ops.export_relationships(cursor="not-a-cursor")
+    
+    def test_graph_data_truncation(self, graph_ops):
+        """Test that get_graph_data walks every page unless capped."""
+        graph_ops.store_relationships([self._relationship(f"Brand{i}") for i in range(5)])
+        
+        assert len(graph_ops.get_graph_data()["edges"]) == 5
+        capped = graph_ops.get_graph_data(max_edges=3)
+        assert len(capped["edges"]) == 3 and capped["truncated"]
+    
+    def test_persists_and_compacts(self, tmp_path):
+        """Test that the graph is reloaded from its file, compacted to one line per record."""
+        from src.graphrag.embedded_graph import EmbeddedGraph
+        
+        path = str(tmp_path / "graph.jsonl")
+        graph = EmbeddedGraph(path)
+        rows = [{"source": "Tesla", "target": "Rivian", "category": "automotive",
+                 "context": "ev_market", "rel_type": "competitor", "properties": {"confidence": 0.9}}]
+        graph.upsert_relationships(rows)
+        graph.upsert_relationships(rows)
+        graph.close()
+        
+        with open(path) as f:
+            assert len(f.readlines()) == 3
+        reopened = EmbeddedGraph(path)
+        assert reopened.get_relationships("Tesla", "Rivian")[0]["properties"]["confidence"] == 0.9
+        assert reopened.find_brand("rivian") == "Rivian"
+        reopened.close()
+    
+    def test_rewrite_with_same_timestamp_exports_once(self, monkeypatch):
+        """Test that an edge rewritten within one clock tick is exported once."""
+        from src.graphrag import embedded_graph
+        monkeypatch.setattr(embedded_graph, "_now", lambda: "2026-01-01T00:00:00.000000+00:00")
+        
+        graph = embedded_graph.EmbeddedGraph(None)
+        rows = [{"source": "Tesla", "target": "Rivian", "category": "automotive",
+                 "context": "ev_market", "rel_type": "competitor", "properties": {"confidence": 0.9}}]
+        graph.upsert_relationships(rows)
+        graph.upsert_relationships(rows)
+        
+        exported, _ = graph.export_relationships()
+        assert len(exported) == graph.get_stats()["relationships"] == 1
+    
+    def test_rewrites_compact_while_open(self, tmp_path, monkeypatch):
+        """Test that re-upserting an edge keeps the open log and timeline bounded."""
+        from src.graphrag import embedded_graph
+        monkeypatch.setattr(embedded_graph, "_COMPACT_MIN_RECORDS", 4)
+        
+        path = str(tmp_path / "graph.jsonl")
+        graph = embedded_graph.EmbeddedGraph(path)
+        rows = [{"source": "Tesla", "target": "Rivian", "category": "automotive",
+                 "context": "ev_market", "rel_type": "competitor", "properties": {"confidence": 0.9}}]
+        for _ in range(50):
+            graph.upsert_relationships(rows)
+        
+        with open(path) as f:
+            assert len(f.readlines()) <= embedded_graph._COMPACT_FACTOR * 4
+        assert len(graph._timeline) == 1
+        rows_out, _ = graph.export_relationships()
+        assert [row["target"] for row in rows_out] == ["Rivian"]
+        graph.close()
+        assert embedded_graph.EmbeddedGraph(path).get_stats() == {"brands": 2, "relationships": 1}
+
+
+class TestGraphViews:
+    """Test aggregated visualization views over a graph snapshot."""
+    
+    @pytest.fixture
+    def snapshot(self):
+        from src.graphrag.graph_operations import GraphOperations
+        from src.graphrag.embedded_graph import EmbeddedGraph
+        from src.graphrag.graph_views import GraphSnapshot
+        
+        graph_ops = GraphOperations.__new__(GraphOperations)
+        graph_ops.client = EmbeddedGraph(None)
+        graph_ops.cache = None
+        graph_ops.client.upsert_relationships([
+            {"source": source, "target": target, "category": category, "context": context,
+             "rel_type": rel_type, "properties": {"confidence": 0.9}}
+            for source, target, category, context, rel_type in [
+                ("Tesla", "Rivian", "automotive", "ev_market", "competitor"),
+                ("Tesla", "Rivian", "automotive", "trucks", "competitor"),
+                ("Tesla", "Lucid", "automotive", "ev_market", "competitor"),
+                ("Tesla", "Panasonic", "energy", "batteries", "supplier"),
+                ("Panasonic", "Sony", "electronics", "tvs", "competitor"),
+                ("Sony", "Apple", "electronics", "phones", "supplier"),
+            ]
+        ])
+        return GraphSnapshot.build(graph_ops, batch_size=2)
+    
+    def test_top_brands_bundles_edges(self, snapshot):
+        """Test top brands by degree with parallel edges bundled."""
+        from src.graphrag.graph_views import build_view
+        
+        view = build_view(snapshot, view="top_brands", top_k=2)
+        assert {node["id"] for node in view["nodes"]} == {"Tesla", "Rivian"}
+        assert view["nodes"][0] == {"id": "Tesla", "label": "Tesla", "degree": 4}
+        assert view["edges"] == [{"source": "Tesla", "target": "Rivian", "type": "competitor",
+                                  "category": "automotive", "count": 2}]
+        assert view["truncated"]
+        assert (view["total_nodes"], view["total_edges"]) == (6, 6)
+    
+    def test_auto_picks_raw_when_within_budget(self, snapshot):
+        """Test auto returns the raw graph only when it fits the budget."""
+        from src.graphrag.graph_views import build_view
+        
+        assert build_view(snapshot, max_nodes=10, max_edges=10)["view"] == "raw"
+        view = build_view(snapshot, max_nodes=3, max_edges=10)
+        assert view["view"] == "top_brands"
+        assert len(view["nodes"]) == 3
+        
+        raw = build_view(snapshot, view="raw", max_nodes=10, max_edges=2)
+        assert len(raw["edges"]) == 2 and raw["truncated"]
+    
+    def test_ego_network(self, snapshot):
+        """Test k-hop neighborhoods in either direction, optionally per category."""
+        from src.graphrag.graph_views import build_view
+        
+        one_hop = build_view(snapshot, view="ego", brand="Sony")
+        assert {node["id"] for node in one_hop["nodes"]} == {"Sony", "Panasonic", "Apple"}
+        two_hops = build_view(snapshot, view="ego", brand="Sony", hops=2)
+        assert "Tesla" in {node["id"] for node in two_hops["nodes"]}
+        assert len(two_hops["edges"]) == 3
+        
+        filtered = build_view(snapshot, view="ego", brand="Sony", hops=2, category="electronics")
+        assert {node["id"] for node in filtered["nodes"]} == {"Sony", "Panasonic", "Apple"}
+        # Panasonic has energy edges, but is only reachable from Sony through electronics
+        energy = build_view(snapshot, view="ego", brand="Sony", hops=2, category="energy")
+        assert [node["id"] for node in energy["nodes"]] == ["Sony"]
+        assert build_view(snapshot, view="ego", brand="Nokia")["nodes"] == []
+        with pytest.raises(ValueError):
+            build_view(snapshot, view="ego")
+    
+    def test_categories_view(self, snapshot):
+        """Test categories collapsed to nodes joined by shared brands."""
+        from src.graphrag.graph_views import build_view
+        
+        view = build_view(snapshot, view="categories")
+        nodes = {node["label"]: node for node in view["nodes"]}
+        assert nodes["automotive"]["brands"] == 3
+        assert nodes["automotive"]["relationships"] == 3
+        pairs = {(edge["source"], edge["target"]): edge["count"] for edge in view["edges"]}
+        assert pairs == {
+            ("category:automotive", "category:energy"): 1,
+            ("category:electronics", "category:energy"): 1,
+        }
+        with pytest.raises(ValueError):
+            build_view(snapshot, view="sunburst")
+    
+    def test_stale_snapshot_served_during_refresh(self, monkeypatch):
+        """Test that a stale snapshot is served while one background rebuild runs."""
+        import threading
+        import time
+        import numpy as np
+        from src.graphrag import graph_views
+        
+        release = threading.Event()
+        builds = []
+        
+        def build(graph_ops):
+            builds.append(threading.current_thread().name)
+            if len(builds) > 1:
+                release.wait(5)
+            empty = np.array([], dtype=np.int64)
+            return graph_views.GraphSnapshot([], empty, empty, empty, empty, [], [])
+        
+        monkeypatch.setattr(graph_views.GraphSnapshot, "build", staticmethod(build))
+        monkeypatch.setattr(graph_views, "_snapshot", None)
+        first = graph_views.get_graph_snapshot(None, max_age=0)
+        
+        assert graph_views.get_graph_snapshot(None, max_age=0) is first
+        assert graph_views.get_graph_snapshot(None, max_age=0) is first
+        release.set()
+        for _ in range(100):
+            if not graph_views._snapshot_refreshing:
+                break
+            time.sleep(0.01)
+        
+        assert builds[1:] == ["graph-snapshot"]
+        assert graph_views.get_graph_snapshot(None, max_age=3600) is not first
+
+
+class TestGraphLayout:
+    """Test precomputed visualization layouts."""
+    
+    GRAPH = {
+        "nodes": [{"id": name, "label": name} for name in ["Tesla", "Rivian", "Lucid", "Sony", "Apple"]],
+        "edges": [
+            {"source": "Tesla", "target": "Rivian", "type": "competitor", "category": "automotive"},
+            {"source": "Tesla", "target": "Lucid", "type": "competitor", "category": "automotive"},
+            {"source": "Rivian", "target": "Lucid", "type": "competitor", "category": "automotive"},
+            {"source": "Sony", "target": "Apple", "type": "supplier", "category": "electronics"},
+            {"source": "Lucid", "target": "Sony", "type": "neutral", "category": "automotive"},
+        ]
+    }
+    
+    @pytest.mark.parametrize("method", ["force", "spectral"])
+    def test_compute_layout(self, method):
+        """Test every node gets a distinct, bounded position."""
+        from src.graphrag.graph_layout import compute_layout
+        
+        layout = compute_layout(self.GRAPH, method, scale=100)
+        assert set(layout) == {node["id"] for node in self.GRAPH["nodes"]}
+        assert len(set(layout.values())) == 5
+        assert max(abs(c) for xy in layout.values() for c in xy) == pytest.approx(100, abs=0.01)
+        with pytest.raises(ValueError):
+            compute_layout(self.GRAPH, "circular")
+    
+    def test_layout_cached_per_graph_version(self, tmp_path, monkeypatch):
+        """Test unchanged graphs reuse the cached layout and changed graphs don't."""
+        from src.graphrag import graph_layout
+        
+        calls = []
+        compute = graph_layout.compute_layout
+        monkeypatch.setattr(graph_layout, "compute_layout", lambda *args: calls.append(args) or compute(*args))
+        
+        first = graph_layout.get_layout(self.GRAPH, cache_dir=str(tmp_path))
+        assert graph_layout.get_layout(self.GRAPH, cache_dir=str(tmp_path)) == first
+        assert len(calls) == 1
+        
+        changed = {"nodes": self.GRAPH["nodes"], "edges": self.GRAPH["edges"][:-1]}
+        graph_layout.get_layout(changed, cache_dir=str(tmp_path))
+        graph_layout.get_layout(self.GRAPH, method="spectral", cache_dir=str(tmp_path))
+        assert len(calls) == 3
+    
+    def test_layout_cache_pruned(self, tmp_path, monkeypatch):
+        """Test that only the most recently used layouts are kept."""
+        import os
+        from src.graphrag import graph_layout
+        monkeypatch.setattr(graph_layout.settings, "layout_cache_max_files", 2)
+        
+        graphs = [{"nodes": self.GRAPH["nodes"], "edges": self.GRAPH["edges"][:i]} for i in range(1, 4)]
+        for i, graph in enumerate(graphs):
+            graph_layout.get_layout(graph, cache_dir=str(tmp_path))
+            os.utime(tmp_path / f"{graph_layout.graph_version(graph, 'force', 50)}.json", (i, i))
+        
+        kept = {name[:-len(".json")] for name in os.listdir(tmp_path)}
+        assert kept == {graph_layout.graph_version(graph, "force", 50) for graph in graphs[1:]}
+    
+    def test_large_spectral_layout(self, monkeypatch):
+        """Test that graphs too large to decompose densely go sparse, or force without scipy."""
+        from src.graphrag import graph_layout
+        monkeypatch.setattr(graph_layout, "_SPECTRAL_DENSE_MAX_NODES", 10)
+        ring = {
+            "nodes": [{"id": str(i)} for i in range(50)],
+            "edges": [{"source": str(i), "target": str((i + 1) % 50)} for i in range(50)]
+        }
+        
+        if graph_layout.SCIPY_AVAILABLE:
+            layout = graph_layout.compute_layout(ring, "spectral")
+            assert len(set(layout.values())) == 50
+        monkeypatch.setattr(graph_layout, "SCIPY_AVAILABLE", False)
+        assert graph_layout.compute_layout(ring, "spectral") == graph_layout.compute_layout(ring, "force")
+
+
+class TestRelationshipCache:
+    """Test the read-through cache of graph relationship lookups."""
+    
+    @pytest.fixture
+    def graph_ops(self):
+        from src.graphrag.graph_operations import GraphOperations
+        from src.graphrag.embedded_graph import EmbeddedGraph
+        from src.graphrag.relationship_cache import RelationshipCache
+        
+        class CountingGraph(EmbeddedGraph):
+            def __init__(self):
+                super().__init__()
+                self.reads = []
+            
+            def get_relationships(self, source, target, category=None, context=None):
+                self.reads.append(target)
+                return super().get_relationships(source, target, category, context)
+            
+            def get_relationships_for_targets(self, source, targets, category=None):
+                self.reads.extend(targets)
+                return super().get_relationships_for_targets(source, targets, category)
+        
+        graph_ops = GraphOperations.__new__(GraphOperations)
+        graph_ops.client = CountingGraph()
+        graph_ops.cache = RelationshipCache(max_entries=100)
+        return graph_ops
+    
+    def test_negative_results_cached_until_write(self, graph_ops):
+        """Test that misses are cached and a write through GraphOperations invalidates them."""
+        assert graph_ops.get_relationship("Tesla", "Rivian", "automotive") is None
+        assert graph_ops.get_relationship("Tesla", "Rivian", "automotive") is None
+        assert graph_ops.client.reads == ["Rivian"]
+        
+        graph_ops.create_relationship("Tesla", "Rivian", "competitor", "automotive", "ev_market")
+        
+        assert graph_ops.get_relationship("Tesla", "Rivian", "automotive")["relationship_type"] == "competitor"
+        assert graph_ops.get_relationship("Tesla", "Rivian")["relationship_type"] == "competitor"
+        assert graph_ops.client.reads == ["Rivian", "Rivian", "Rivian"]
+    
+    def test_targets_lookup_only_queries_misses(self, graph_ops):
+        """Test that the batched lookup shares entries with get_relationship."""
+        graph_ops.create_relationship("Tesla", "Rivian", "competitor", "automotive", "ev_market")
+        graph_ops.get_relationship("Tesla", "Rivian", "automotive")
+        
+        found = graph_ops.get_relationships_for_targets("Tesla", ["Rivian", "Lucid"], "automotive")
+        found_again = graph_ops.get_relationships_for_targets("Tesla", ["Rivian", "Lucid"], "automotive")
+        
+        assert list(found) == list(found_again) == ["Rivian"]
+        assert graph_ops.client.reads == ["Rivian", "Lucid"]
+    
+    def test_ttl_and_lru(self):
+        """Test expiry of negative entries and LRU eviction."""
+        import time
+        from src.graphrag.relationship_cache import RelationshipCache, MISSING
+        
+        cache = RelationshipCache(max_entries=2, ttl_seconds=0, negative_ttl_seconds=0.05)
+        cache.put(("a", "b", None, None), None)
+        cache.put(("a", "c", None, None), {"relationship_type": "partner"})
+        assert cache.get(("a", "b", None, None)) is None
+        time.sleep(0.1)
+        assert cache.get(("a", "b", None, None)) is MISSING
+        
+        cache.put(("a", "d", None, None), {})
+        cache.put(("a", "e", None, None), {})
+        assert cache.get(("a", "c", None, None)) is MISSING
+        assert len(cache) == 2
+
+
+class TestBatchInput:
+    """Test batch CLI input loading."""
+    
+    def test_jsonl_records(self, tmp_path):
+        """Test that JSONL records keep their own subject brand and id."""
+        from main import iter_batch_records
+        
+        source = tmp_path / "docs.jsonl"
+        source.write_text(
+            '{"id": "a", "text": "Tesla and Rivian", "subject_brand": "Rivian"}\n'
+            '\n'
+            '{"text": "Apple and Samsung"}\n'
+        )
+        
+        records = list(iter_batch_records(str(source), subject_brand="Tesla"))
+        
+        assert [(r["id"], r["subject_brand"]) for r in records] == [("a", "Rivian"), ("3", "Tesla")]
+    
+    def test_directory_records(self, tmp_path):
+        """Test that a directory yields its text files in order."""
+        from main import iter_batch_records
+        
+        (tmp_path / "b.txt").write_text("second")
+        (tmp_path / "a.txt").write_text("first")
+        (tmp_path / "notes.json").write_text("{}")
+        
+        records = list(iter_batch_records(str(tmp_path), subject_brand="Tesla"))
+        
+        assert [r["text"] for r in records] == ["first", "second"]
+    
+    def test_jsonl_files_in_glob_and_directory(self, tmp_path):
+        """Test that JSONL files matched by a glob or in a directory are read as records."""
+        from main import iter_batch_records
+        
+        (tmp_path / "a.jsonl").write_text('{"id": "a1", "text": "Tesla"}\n{"text": "Rivian"}\n')
+        (tmp_path / "b.jsonl").write_text('{"text": "Apple", "subject_brand": "Apple"}\n')
+        
+        by_glob = list(iter_batch_records(str(tmp_path / "*.jsonl"), subject_brand="Tesla"))
+        by_directory = list(iter_batch_records(str(tmp_path), subject_brand="Tesla"))
+        
+        assert [(r["id"], r["text"], r["subject_brand"]) for r in by_glob] == [
+            ("a1", "Tesla", "Tesla"),
+            (f"{tmp_path / 'a.jsonl'}:2", "Rivian", "Tesla"),
+            (f"{tmp_path / 'b.jsonl'}:1", "Apple", "Apple"),
+        ]
+        assert by_directory == by_glob
+    
+    def test_bad_records_become_error_lines(self, tmp_path, monkeypatch):
+        """Test that malformed or text-less lines fail alone instead of aborting the batch."""
+        import argparse
+        import main
+        
+        class Pipeline:
+            def __init__(self, log_level=None):
+                pass
+            
+            def analyze(self, text, subject_brand=None):
+                from types import SimpleNamespace
+                return SimpleNamespace(model_dump=lambda: {"text": text})
+        
+        source = tmp_path / "docs.jsonl"
+        source.write_text(
+            '{"id": "a", "text": "Tesla and Rivian"}\n'
+            '{"id": "b", "text": \n'
+            '{"id": "c"}\n'
+            '["not", "an", "object"]\n'
+            '{"id": "e", "text": "Apple and Samsung"}\n'
+        )
+        output = tmp_path / "out.jsonl"
+        monkeypatch.setattr(main, "BrandAnalysisPipeline", Pipeline)
+        main.analyze_batch_command(argparse.Namespace(
+            input=str(source), output=str(output), subject_brand="Tesla", workers=2, log_level="INFO"
+        ))
+        
+        lines = {line["id"]: line for line in map(json.loads, output.read_text().splitlines())}
+        assert {i: line["status"] for i, line in lines.items()} == {
+            "a": "ok", "2": "error", "3": "error", "4": "error", "e": "ok"
+        }
+        assert "line 3" in lines["3"]["error"] and "no text" in lines["3"]["error"]
+    
+    def test_workers_must_be_positive(self):
+        """Test that --workers below 1 is rejected."""
+        import argparse
+        from main import _positive_int
+        
+        assert _positive_int("2") == 2
+        with pytest.raises(argparse.ArgumentTypeError):
+            _positive_int("0")
+
+
+class TestNeo4jClient:
+    """Test session reuse in the Neo4j client against a fake driver."""
+    
+    @pytest.fixture
+    def client(self):
+        import threading
+        from src.graphrag.neo4j_client import Neo4jClient
+        
+        class FakeTransaction:
+            def __init__(self, log):
+                self.log = log
+            
+            def run(self, query, parameters=None):
+                self.log.append(("tx", query))
+                return []
+            
+            def commit(self):
+                self.log.append(("commit", None))
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc):
+                if exc[0] is not None:
+                    self.log.append(("rollback", None))
+        
+        class FakeSession:
+            def __init__(self, log):
+                self.log = log
+            
+            def run(self, query, parameters=None):
+                self.log.append(("run", query))
+                return []
+            
+            def execute_write(self, fn):
+                return fn(FakeTransaction(self.log))
+            
+            def execute_read(self, fn):
+                self.log.append(("read", None))
+                return fn(FakeTransaction(self.log))
+            
+            def begin_transaction(self):
+                return FakeTransaction(self.log)
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc):
+                pass
+        
+        class FakeDriver:
+            def __init__(self):
+                self.log = []
+                self.sessions = []
+            
+            def session(self, **config):
+                self.sessions.append(config)
+                return FakeSession(self.log)
+        
+        client = Neo4jClient.__new__(Neo4jClient)
+        client.driver = FakeDriver()
+        client._local = threading.local()
+        return client
+    
+    def test_session_block_reuses_one_session(self, client):
+        """Test that statements inside session() share a single session."""
+        with client.session():
+            client.execute_query("RETURN 1")
+            client.execute_write("CREATE (n)")
+            client.execute_query("RETURN 2")
+        client.execute_query("RETURN 3")
+        
+        assert len(client.driver.sessions) == 2
+        assert client.driver.sessions[0]["fetch_size"] > 0
+    
+    def test_reads_use_read_access_mode(self, client):
+        """Test that execute_read runs a managed transaction in READ mode."""
+        from neo4j import READ_ACCESS
+        
+        client.execute_read("MATCH (n) RETURN n")
+        
+        assert client.driver.sessions[0]["default_access_mode"] == READ_ACCESS
+        assert client.driver.log == [("read", None), ("tx", "MATCH (n) RETURN n")]
+    
+    def test_transaction_commits_or_rolls_back(self, client):
+        """Test that statements join the explicit transaction."""
+        with client.transaction():
+            client.execute_write("CREATE (a)")
+            client.execute_query("MATCH (a) RETURN a")
+        
+        with pytest.raises(RuntimeError):
+            with client.transaction():
+                client.execute_write("CREATE (b)")
+                raise RuntimeError("abort")
+        
+        assert client.driver.log == [
+            ("tx", "CREATE (a)"), ("tx", "MATCH (a) RETURN a"), ("commit", None),
+            ("tx", "CREATE (b)"), ("rollback", None)
+        ]
+
+    def test_export_uses_keyset_cursor(self, client):
+        """Test that export pages resume after the last (updated_at, elementId)."""
+        from datetime import datetime, timezone
+        
+        calls = []
+        def execute_read(query, parameters=None):
+            calls.append((query, parameters))
+            return [
+                {"id": f"5:x:{i}", "source": "Tesla", "target": f"B{i}", "relationship_type": "partner",
+                 "category": "automotive", "relationship_context": "ev", "confidence": 0.9,
+                 "updated_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+                for i in range(parameters["limit"])
+            ]
+        client.execute_read = execute_read
+        
+        edges, cursor = client.export_relationships(limit=2, relationship_type="partner")
+        client.export_relationships(cursor=cursor, limit=2)
+        
+        assert "id" not in edges[0] and edges[0]["updated_at"].startswith("2024-01-01T00:00:00")
+        assert "r.relationship_type = $relationship_type" in calls[0][0]
+        assert "$after_id" not in calls[0][0]
+        assert "elementId(r) > $after_id" in calls[1][0]
+        assert calls[1][1]["after_id"] == "5:x:1"
+    
+    def test_missing_indexes(self, client):
+        """Test that indexes absent or not yet online are reported."""
+        from src.graphrag.neo4j_client import SCHEMA_INDEXES
+
+        names = [name for name, _ in SCHEMA_INDEXES]
+        rows = [{"name": name, "state": "ONLINE"} for name in names[1:]]
+        rows[0]["state"] = "POPULATING"
+        client.execute_query = lambda query, parameters=None: rows
+
+        assert client.missing_indexes() == names[:2]
+
+
+class TestAsyncPipeline:
+    """Test AsyncBrandAnalysisPipeline.analyze with stubbed agents."""
+    
+    @staticmethod
+    def _make_pipeline(relationship_error=None, citation_gate=None):
+        import asyncio
+        from types import SimpleNamespace
+        from src.pipeline import AsyncBrandAnalysisPipeline
+        from src.models import (
+            BrandExtractionOutput, CategoryOutput, CitationExtractionOutput, RelationshipOutput
+        )
+        
+        calls = {"stored": [], "citations": [], "cancelled": False}
+        relationship = Relationship(
+            source="Tesla", target="Rivian", relationship_type=RelationshipType.COMPETITOR,
+            category="automotive", relationship_context="ev_market", confidence=0.9,
+            evidence="e", source_type=SourceType.LLM_INFERENCE
+        )
+        
+        async def brands(text):
+            return BrandExtractionOutput(brands=[Brand(name="Rivian")], confidence=0.9)
+        
+        async def categories(text, subject_brand):
+            return CategoryOutput(primary_category="automotive", confidence=0.9)
+        
+        async def citations(text, extracted_brands=None):
+            calls["citations"].append(extracted_brands)
+            try:
+                if citation_gate is not None:
+                    await citation_gate.wait()
+            except asyncio.CancelledError:
+                calls["cancelled"] = True
+                raise
+            return CitationExtractionOutput(citations=[], confidence=0.8)
+        
+        async def relationships(brands, category, text_context, subject_brand):
+            if relationship_error is not None:
+                raise relationship_error
+            return RelationshipOutput(relationships=[relationship], new_relationships=[relationship])
+        
+        async def store_relationships(new):
+            calls["stored"].append(new)
+        
+        pipeline = AsyncBrandAnalysisPipeline.__new__(AsyncBrandAnalysisPipeline)
+        pipeline.subject_brand = None
+        pipeline.brand_extractor = SimpleNamespace(arun=brands)
+        pipeline.category_agent = SimpleNamespace(arun=categories)
+        pipeline.citation_extractor = SimpleNamespace(
+            arun=citations, enrich_with_brands=lambda output, brand_names: output
+        )
+        pipeline.relationship_agent = SimpleNamespace(arun=relationships)
+        pipeline.graph_ops = SimpleNamespace(store_relationships=store_relationships)
+        return pipeline, calls
+    
+    def test_analyze_end_to_end(self):
+        """Test that the stages combine into one result and one graph write."""
+        import asyncio
+        
+        pipeline, calls = self._make_pipeline()
+        result = asyncio.run(pipeline.analyze("Tesla competes with Rivian.", subject_brand="Tesla"))
+        
+        assert result.subject_brand == "Tesla"
+        assert result.category == "automotive"
+        assert [r.target for r in result.relationships] == ["Rivian"]
+        assert calls["citations"] == [None]
+        assert len(calls["stored"]) == 1 and calls["stored"][0][0].target == "Rivian"
+        with pytest.raises(ValueError):
+            asyncio.run(pipeline.analyze("text"))
+    
+    def test_failed_stage_cancels_citation_task(self):
+        """Test that a relationship failure doesn't leave citation extraction running."""
+        import asyncio
+        
+        async def analyze():
+            pipeline, calls = self._make_pipeline(
+                relationship_error=RuntimeError("graph down"), citation_gate=asyncio.Event()
+            )
+            with pytest.raises(RuntimeError):
+                await pipeline.analyze("text", subject_brand="Tesla")
+            await asyncio.sleep(0)
+            return calls
+        
+        calls = asyncio.run(analyze())
+        assert calls["cancelled"]
+        assert calls["stored"] == []
+
+
+class TestAPI:
+    """Test the API service with stubbed pipeline and graph (lifespan not run)."""
+    
+    class StubPipeline:
+        """Sync pipeline recording the thread each analysis runs on."""
+        
+        def __init__(self):
+            self.threads = []
+        
+        def analyze(self, text, subject_brand=None):
+            import threading
+            from types import SimpleNamespace
+            self.threads.append(threading.current_thread().name)
+            return SimpleNamespace(model_dump=lambda: {"subject_brand": subject_brand})
+    
+    @pytest.fixture
+    def api(self, monkeypatch):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        import api
+        
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+        monkeypatch.setattr(api.app.state, "pipeline", self.StubPipeline(), raising=False)
+        monkeypatch.setattr(api.app.state, "analysis_executor", executor, raising=False)
+        monkeypatch.setattr(api.app.state, "analysis_slots", asyncio.Semaphore(1), raising=False)
+        yield api
+        executor.shutdown(wait=True)
+    
+    def test_sync_analysis_runs_on_executor(self, api):
+        """Test that the sync pipeline runs on the analysis pool, not the event loop."""
+        from fastapi.testclient import TestClient
+        
+        response = TestClient(api.app).post("/analyze", json={"text": "t", "subject_brand": "Tesla"})
+        
+        assert response.json() == {"subject_brand": "Tesla"}
+        assert api.app.state.pipeline.threads[0].startswith("analysis")
+    
+    def test_pipeline_built_after_failed_startup(self, api, monkeypatch):
+        """Test that /analyze retries building a pipeline that failed at startup."""
+        import asyncio
+        from fastapi.testclient import TestClient
+        
+        pipeline = api.app.state.pipeline
+        builds = []
+        
+        def build():
+            builds.append(1)
+            if len(builds) == 1:
+                raise RuntimeError("graph down")
+            return pipeline
+        
+        monkeypatch.setattr(api.app.state, "pipeline", None)
+        monkeypatch.setattr(api.app.state, "pipeline_lock", asyncio.Lock(), raising=False)
+        monkeypatch.setattr(api, "_build_pipeline", build)
+        client = TestClient(api.app)
+        
+        assert client.post("/analyze", json={"text": "t", "subject_brand": "Tesla"}).status_code == 503
+        assert client.post("/analyze", json={"text": "t", "subject_brand": "Tesla"}).json() == {"subject_brand": "Tesla"}
+        assert client.post("/analyze", json={"text": "t", "subject_brand": "Tesla"}).status_code == 200
+        assert len(builds) == 2
+    
+    def test_saturated_slots_return_429(self, api, monkeypatch):
+        """Test that requests beyond the worker and queue slots are rejected."""
+        import asyncio
+        from fastapi.testclient import TestClient
+        
+        monkeypatch.setattr(api.app.state, "analysis_slots", asyncio.Semaphore(0))
+        response = TestClient(api.app).post("/analyze", json={"text": "t", "subject_brand": "Tesla"})
+        
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "5"
+        assert api.app.state.pipeline.threads == []
+    
+    def test_graph_endpoints_off_event_loop(self, api, monkeypatch):
+        """Test that /health, /stats and /categories query the graph in worker threads."""
+        import asyncio
+        from fastapi.testclient import TestClient
+        
+        on_loop = []
+        
+        class Graph:
+            def get_stats(self):
+                on_loop.append(self._loop_running())
+                return {"brands": 2, "relationships": 1}
+            
+            def get_categories(self):
+                on_loop.append(self._loop_running())
+                return ["automotive"]
+            
+            @staticmethod
+            def _loop_running():
+                try:
+                    asyncio.get_running_loop()
+                    return True
+                except RuntimeError:
+                    return False
+        
+        monkeypatch.setattr(api, "get_neo4j_client", Graph)
+        for getter in ("get_llm_cache", "get_search_cache", "get_relationship_cache"):
+            monkeypatch.setattr(api, getter, lambda: None)
+        client = TestClient(api.app)
+        
+        assert client.get("/health").json()["graph_stats"]["brands"] == 2
+        assert client.get("/stats").json() == {"brands": 2, "relationships": 1}
+        assert client.get("/categories").json() == {"categories": ["automotive"]}
+        assert on_loop == [False, False, False]
+    
+    def test_visualize_budgets_capped(self, api, monkeypatch):
+        """Test that /visualize budgets can shrink but not exceed the configured ones."""
+        from fastapi.testclient import TestClient
+        from src.graphrag import graph_operations, graph_views
+        
+        budgets = []
+        monkeypatch.setattr(graph_views, "get_graph_snapshot", lambda graph_ops: None)
+        monkeypatch.setattr(graph_operations, "GraphOperations", lambda: None)
+        monkeypatch.setattr(graph_views, "build_view", lambda snapshot, **kwargs: budgets.append(
+            (kwargs["max_nodes"], kwargs["max_edges"])) or {"nodes": [], "edges": []})
+        monkeypatch.setattr(api.settings, "visualize_max_nodes", 100)
+        monkeypatch.setattr(api.settings, "visualize_max_edges", 200)
+        client = TestClient(api.app)
+        
+        client.post("/visualize", json={"max_nodes": 10**9, "max_edges": 10**9})
+        client.post("/visualize", json={"max_nodes": 5})
+        assert budgets == [(100, 200), (5, 200)]
+
+
 class TestPipelineIntegration:
     """Integration tests for the pipeline."""
     